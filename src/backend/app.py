@@ -1,31 +1,202 @@
 
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, request, jsonify, g, stream_with_context
 from flask_cors import CORS
 import os
+import io
+import time
+import zipfile
 import tempfile
-import docx2txt
-import spacy
+import threading
+import hashlib
+import importlib.metadata
 import re
 import json
-from pdfminer.high_level import extract_text
 from collections import Counter
 import string
 from datetime import datetime
 import numpy as np
+from functools import partial
+from lexicon import Lexicon
+from context import AnalysisContext
+from workers import iter_in_worker, run_in_worker, start_worker_pool
+from extraction import MIN_TEXT_LENGTH, TIERS, extract_document, extract_text_from_file, mime_type_for
+from jobs import JobQueue, JobWorkers
+from cache import ResultCache
+from matching import JobSkillCache, match_jobs
+from search import SEARCH_FIELDS, CandidateIndex, QueryError
+from embeddings import VectorStore, job_embedding, resume_embedding, vector_width
+from metrics import (IN_FLIGHT, PROMETHEUS_CONTENT_TYPE, REQUEST_SECONDS, REQUESTS, STAGE_SECONDS,
+                     call_with_stages, current_timer, iter_with_stages, render_metrics, start_stages, stop_stages,
+                     timed_stage)
+from timeouts import AnalyzerTimeout, cpu_time_limit
+from encoding import (COMPRESSIBLE_MIMETYPES, MSGPACK_MIMETYPES, FastJSONProvider, available_encodings, compress,
+                      msgpack_available, pack_msgpack)
+from profiling import PROFILE_MODES, collapsed_stacks, merge_profiles, profile_call, profiling_allowed, render_profile
+import lexicon
+import context
+import sections
+import extraction
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)
 
-# Load more advanced spaCy model for better accuracy
-try:
-    nlp = spacy.load("en_core_web_lg")  # Larger model with word vectors
-except:
-    # Fallback to smaller model if large one not available
-    nlp = spacy.load("en_core_web_sm")
-    print("Warning: Using smaller spaCy model. For better results, install en_core_web_lg")
+# spaCy pipeline settings, overridable per deployment
+# RESUME_SENTENCE_SEGMENTER: "senter" (statistical, default), "sentencizer" (rule-based)
+# or "parser" (dependency parser, the slowest and most accurate)
+SENTENCE_SEGMENTER = os.environ.get("RESUME_SENTENCE_SEGMENTER", "senter")
+NER_ENABLED = os.environ.get("RESUME_NLP_NER", "1") != "0"
 
-UPLOAD_FOLDER = tempfile.gettempdir()
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Components that produce each annotation the analyzers can ask for.
+# Token flags such as is_alpha and is_stop are lexical and need no component.
+ANNOTATION_PIPES = {
+    "ents": ["ner"],
+    "sents": {
+        "senter": ["senter"],
+        "sentencizer": ["sentencizer"],
+        "parser": ["tok2vec", "parser"],
+    }[SENTENCE_SEGMENTER],
+}
+
+# Annotations each analyzer reads from the spaCy doc
+ANALYZER_ANNOTATIONS = {
+    "contact_info": {"ents"},
+    "experience": set(),
+    "education": {"sents"},
+    "projects": set(),
+    "skills": set(),
+    "interests": {"sents"},
+    "growth_potential": {"sents"},
+    "writing_quality": {"sents"},
+    "location": {"ents"},
+}
+
+# spaCy models to load, the first one installed wins
+SPACY_MODELS = ("en_core_web_lg", "en_core_web_sm")
+
+def installed_model():
+    """(name, version) of the model load_nlp loads, found without importing spaCy; (None, None) if none is installed"""
+    for name in SPACY_MODELS:
+        try:
+            return name, importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    return None, None
+
+def load_nlp():
+    """Load the spaCy model with only the components the analyzers use"""
+    # Imported here: importing spaCy alone takes seconds, which would otherwise
+    # be spent before the server can answer health checks
+    import spacy
+    
+    needed = set(ANNOTATION_PIPES["sents"])
+    if NER_ENABLED:
+        needed.update(ANNOTATION_PIPES["ents"])
+    exclude = [pipe for pipe in ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner"]
+               if pipe not in needed]
+    
+    # Load more advanced spaCy model for better accuracy; the same one installed_model names
+    name = installed_model()[0] or SPACY_MODELS[0]
+    model = spacy.load(name, exclude=exclude)
+    if name != SPACY_MODELS[0]:
+        print(f"Warning: Using smaller spaCy model. For better results, install {SPACY_MODELS[0]}")
+    
+    if SENTENCE_SEGMENTER == "senter" and "senter" in model.component_names:
+        # Shipped disabled because the parser normally sets sentence boundaries
+        if "senter" in model.disabled:
+            model.enable_pipe("senter")
+    elif SENTENCE_SEGMENTER != "parser":
+        # Rule-based segmentation, also used when the model ships no senter
+        model.add_pipe("sentencizer", first=True)
+        ANNOTATION_PIPES["sents"] = ["sentencizer"]
+    
+    return model
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """The spaCy pipeline, loaded on first use"""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                _nlp = load_nlp()
+    return _nlp
+
+def required_annotations(analyzers, use_ner=None):
+    """Union of the annotations needed by the given analyzers"""
+    if use_ner is None:
+        use_ner = NER_ENABLED
+    annotations = set()
+    for name in analyzers:
+        annotations |= ANALYZER_ANNOTATIONS[name]
+    if not use_ner:
+        annotations.discard("ents")
+    return annotations
+
+def _pipes_to_disable(annotations):
+    needed = {pipe for annotation in annotations for pipe in ANNOTATION_PIPES[annotation]}
+    return [pipe for pipe in get_nlp().pipe_names if pipe not in needed]
+
+def parse_doc(text, annotations):
+    """Run only the pipeline components that produce the requested annotations"""
+    return get_nlp()(text, disable=_pipes_to_disable(annotations))
+
+def parse_docs(texts, annotations, batch_size=32, n_process=1):
+    """Parse many texts with nlp.pipe, running the same components as parse_doc"""
+    return get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process,
+                    disable=_pipes_to_disable(annotations))
+
+# Uploads up to this size stay in memory; larger ones spill to an anonymous temporary file
+UPLOAD_SPOOL_BYTES = int(os.environ.get("RESUME_UPLOAD_SPOOL_BYTES", str(10 * 1024 * 1024)))
+
+class ResumeRequest(Request):
+    """Request that buffers uploaded files in memory up to UPLOAD_SPOOL_BYTES"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Werkzeug's default writes anything over 500 KB to a temporary file
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+
+app.request_class = ResumeRequest
+
+# Limits and defaults for /api/parse-resumes
+BATCH_MAX_FILES = int(os.environ.get("RESUME_BATCH_MAX_FILES", "500"))
+BATCH_MAX_ARCHIVE_BYTES = int(os.environ.get("RESUME_BATCH_MAX_ARCHIVE_BYTES", str(200 * 1024 * 1024)))
+BATCH_SIZE = int(os.environ.get("RESUME_BATCH_SIZE", "32"))
+BATCH_MAX_PROCESSES = int(os.environ.get("RESUME_BATCH_MAX_PROCESSES", str(os.cpu_count() or 1)))
+
+# Persistent state (job queue, caches, indexes) lives under the data directory
+DATA_DIR = os.environ.get("RESUME_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+JOBS_DB = os.environ.get("RESUME_JOBS_DB", os.path.join(DATA_DIR, "jobs.sqlite3"))
+JOB_WORKERS = int(os.environ.get("RESUME_JOB_WORKERS", "2"))
+RESULT_CACHE_ENTRIES = int(os.environ.get("RESUME_CACHE_ENTRIES", "256"))
+# Results hold resume text and contact details, so they are only kept on disk when a path is set
+RESULT_CACHE_DB = os.environ.get("RESUME_CACHE_DB", "")
+RESULT_CACHE_DB_ENTRIES = int(os.environ.get("RESUME_CACHE_DB_ENTRIES", "100000"))
+JOB_SKILL_CACHE_ENTRIES = int(os.environ.get("RESUME_JOB_SKILL_CACHE_ENTRIES", "10000"))
+MATCH_MAX_JOBS = int(os.environ.get("RESUME_MATCH_MAX_JOBS", "10000"))
+# Candidate search store; empty (the default) disables /api/search and indexing
+SEARCH_DB = os.environ.get("RESUME_SEARCH_DB", "")
+SEARCH_MAX_RESULTS = int(os.environ.get("RESUME_SEARCH_MAX_RESULTS", "1000"))
+# Resume embedding store for /api/similar; empty (the default) disables it.
+# Needs a model with word vectors, such as en_core_web_lg
+EMBEDDINGS_DIR = os.environ.get("RESUME_EMBEDDINGS_DIR", "")
+# Corpus size from which /api/similar searches a cluster index instead of every row; 0 never does
+SIMILAR_APPROXIMATE_MIN_ROWS = int(os.environ.get("RESUME_SIMILAR_APPROXIMATE_MIN_ROWS", "50000"))
+SIMILAR_MAX_RESULTS = int(os.environ.get("RESUME_SIMILAR_MAX_RESULTS", "100"))
+# Parse result fields a resume embedding is computed from
+EMBEDDING_FIELDS = ("skills_data", "projects", "raw_text")
+# CPU seconds each analyzer may use on one resume before its result is replaced by
+# an empty one (see DEGRADED_RESULTS); 0 disables the limit. Only a main thread can
+# enforce it, so with RESUME_WORKERS every endpoint analyzes in the worker processes.
+# Without RESUME_WORKERS (the default) requests and jobs analyze on their own threads
+# with no limit at all; serve() logs that at startup
+ANALYZER_CPU_SECONDS = float(os.environ.get("RESUME_ANALYZER_CPU_SECONDS", "2"))
+# Responses of at least this many bytes are compressed when the client accepts it;
+# level 1 is fastest, 9 smallest, 0 turns compression off
+COMPRESS_MIN_BYTES = int(os.environ.get("RESUME_COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_LEVEL = int(os.environ.get("RESUME_COMPRESS_LEVEL", "5"))
 
 # Comprehensive lists for enhanced analysis
 SKILLS = [
@@ -96,6 +267,18 @@ PASSION_INDICATORS = [
     "open source", "hackathon", "competition", "award", "achievement"
 ]
 
+# Sentence context for interests: side projects and work the candidate owned
+PROJECT_INDICATORS = [
+    "personal project", "side project", "hobby project", "contributed to",
+    "open source", "github", "portfolio", "blog", "wrote", "created", "developed",
+    "built", "designed", "implemented", "volunteer"
+]
+
+OWNERSHIP_INDICATORS = ["led", "managed", "spearheaded", "initiated", "founded", "created", "started"]
+
+# Sentences about goals, for growth potential
+FUTURE_INDICATORS = ["goal", "aim", "aspire", "future", "plan", "intend", "looking to", "seeking"]
+
 GROWTH_INDICATORS = [
     "growth", "learn", "develop", "improve", "progress", "advance", "achieve",
     "goal", "aspire", "ambition", "further", "challenge", "opportunity", 
@@ -139,32 +322,87 @@ OUTDATED_TECH = {
     "os": ["windows xp", "windows vista", "windows 7", "windows server 2003"]
 }
 
-def extract_text_from_pdf(pdf_file):
-    """Extract text from PDF with improved handling of formatting"""
-    try:
-        text = extract_text(pdf_file)
-        # Clean up text - remove excessive whitespace while preserving paragraph breaks
-        text = re.sub(r'\s+', ' ', text)  # Replace multiple whitespace with single space
-        text = re.sub(r'\n\s*\n', '\n\n', text)  # Preserve paragraph breaks
-        return text
-    except Exception as e:
-        print(f"Error extracting text from PDF: {e}")
-        return ""
+# Soft skills looked for in addition to the soft skills in SKILLS
+SOFT_SKILLS = [
+    "communication", "teamwork", "leadership", "problem solving", "critical thinking", 
+    "time management", "project management", "adaptability", "creativity", "interpersonal",
+    "collaboration", "presentation", "negotiation", "conflict resolution", "mentoring",
+    "decision making", "strategic thinking", "customer service", "emotional intelligence",
+    "self-motivated", "detail-oriented", "analytical thinking", "initiative", "persuasion",
+    "training", "team building", "client relations", "prioritization", "public speaking"
+]
 
-def extract_text_from_docx(docx_file):
-    """Extract text from DOCX with improved handling of formatting"""
-    try:
-        text = docx2txt.process(docx_file)
-        # Clean up text while preserving structure
-        text = re.sub(r'\s+', ' ', text)  # Replace multiple whitespace with single space
-        text = re.sub(r'\n\s*\n', '\n\n', text)  # Preserve paragraph breaks
-        return text
-    except Exception as e:
-        print(f"Error extracting text from DOCX: {e}")
-        return ""
+# Every word-bounded lexicon compiled once, so a resume is scanned in one pass
+LEXICON = Lexicon(
+    SKILLS + ROLES + PASSION_INDICATORS + GROWTH_INDICATORS + WEAK_PHRASES +
+    STRONG_ACTION_VERBS + GENERIC_TERMS + SOFT_SKILLS +
+    [tech for techs in OUTDATED_TECH.values() for tech in techs]
+)
+
+# Plain substring matching of skills, used where the analyzers check "skill in text"
+SKILL_SUBSTRINGS = Lexicon(SKILLS, word_boundaries=False)
+# Plain substring matching of the terms the analyzers look for sentence by sentence
+SENTENCE_LEXICON = Lexicon(
+    SKILLS + PASSION_INDICATORS + PROJECT_INDICATORS + OWNERSHIP_INDICATORS + FUTURE_INDICATORS +
+    STRONG_ACTION_VERBS,
+    word_boundaries=False
+)
+# Skills of job descriptions, found with the same lexicon as the resume's skills
+job_skill_cache = JobSkillCache(LEXICON, SKILLS, max_entries=JOB_SKILL_CACHE_ENTRIES)
 
-def extract_contact_info(text, doc):
+# Qualifier that keeps an outdated technology from being flagged, anchored at the match
+MIGRATION_CONTEXT = re.compile(r'(migrated|replaced|upgraded|moved) (from|away from)? \Z')
+
+# Patterns below are written to run in linear time: a pattern with an unbounded
+# repeat is anchored (a literal, a line start or a lookbehind that only lets the
+# first position of a run start a match) or bounded, so no input makes the
+# engine rescan the same run from every position in it.
+
+def _on_one_line(text, first, then):
+    """Whether re.search(first + '.*' + then, text) matches, in one pass over text
+    
+    "." stops at line ends, so it is enough to look for then after the first
+    match of first on each line, rather than after every one of them.
+    """
+    first = re.compile(first)
+    then = re.compile(then)
+    pos = 0
+    while True:
+        match = first.search(text, pos)
+        if match is None:
+            return False
+        line_end = text.find('\n', match.end())
+        if line_end == -1:
+            line_end = len(text)
+        if then.search(text, match.end(), line_end):
+            return True
+        pos = line_end + 1
+
+CAPITALIZED_WORDS = re.compile(r'[A-Z][a-z]+(?: [A-Z][a-z]+)*')
+REGION_AFTER_COMMA = re.compile(r',\s*[A-Za-z]')
+
+def _city_and_region(text):
+    r"""The city of the first "City, State ZIP" in text, or None
+    
+    Same result as re.search(r'([A-Z][a-z]+(?: [A-Z][a-z]+)*),\s*(?:[A-Z]{2}|[A-Za-z]+)\s*\d*', text).group(1),
+    but every run of capitalized words is read once: if the run is not followed
+    by a comma, neither is the rest of it, so the search resumes after the run.
+    """
+    pos = 0
+    while True:
+        match = CAPITALIZED_WORDS.search(text, pos)
+        if match is None:
+            return None
+        if REGION_AFTER_COMMA.match(text, match.end()):
+            return match.group()
+        pos = match.end()
+
+# Role statements kept per pattern; enough for any real resume, and they bound the scoring work
+ROLE_STATEMENT_LIMIT = 50
+
+def extract_contact_info(ctx):
     """Extract name, email, phone, and LinkedIn profile with improved accuracy"""
+    text = ctx.text
     contact_info = {
         "name": None,
         "email": None,
@@ -173,7 +411,8 @@ def extract_contact_info(text, doc):
     }
     
     # Extract email with validation
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    # Bounded by the longest valid local part, domain and top-level domain
+    email_pattern = r'\b[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Z|a-z]{2,63}\b'
     email_matches = re.findall(email_pattern, text)
     if email_matches:
         # Use the first match that's likely to be a real email (has proper domain)
@@ -207,14 +446,14 @@ def extract_contact_info(text, doc):
     ]
     
     for pattern in linkedin_patterns:
-        linkedin_matches = re.findall(pattern, text.lower())
+        linkedin_matches = re.findall(pattern, ctx.lower)
         if linkedin_matches:
             contact_info["linkedin"] = linkedin_matches[0]
             break
     
     # Improved name extraction using NER and heuristics
     # First try named entity recognition
-    person_entities = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
+    person_entities = ctx.entities("PERSON")
     
     # Filter by likely names (2-3 words, proper capitalization)
     likely_names = [name for name in person_entities if 
@@ -225,7 +464,7 @@ def extract_contact_info(text, doc):
         contact_info["name"] = likely_names[0]  # Use the first likely name
     else:
         # Fallback: look at the beginning of the document for possible name
-        lines = text.split('\n')
+        lines = ctx.lines
         for i in range(min(5, len(lines))):
             line = lines[i].strip()
             # Look for a line that's likely to be a name (short, properly capitalized)
@@ -237,8 +476,9 @@ def extract_contact_info(text, doc):
     
     return contact_info
 
-def analyze_experience(text, doc):
+def analyze_experience(ctx):
     """Extract years of experience and analyze work history with improved accuracy"""
+    text = ctx.text
     experience_data = {
         "years": None,
         "positions": []
@@ -246,22 +486,23 @@ def analyze_experience(text, doc):
     
     # Enhanced pattern recognition for years of experience
     experience_patterns = [
-        r'(\d+)(?:\+)?\s+years?\s+(?:of\s+)?experience',
+        r'(?<!\d)(\d+)(?:\+)?\s+years?\s+(?:of\s+)?experience',
         r'experience\s+(?:of\s+)?(\d+)(?:\+)?\s+years?',
         r'worked\s+(?:for\s+)?(\d+)(?:\+)?\s+years?',
-        r'(\d+)(?:\+)?\s+years?\s+(?:in|at|with)',
+        r'(?<!\d)(\d+)(?:\+)?\s+years?\s+(?:in|at|with)',
         r'career\s+(?:of|spanning)\s+(\d+)(?:\+)?\s+years?'
     ]
     
     years = []
     for pattern in experience_patterns:
-        matches = re.findall(pattern, text.lower())
+        matches = re.findall(pattern, ctx.lower)
         years.extend([int(y) for y in matches if y.isdigit()])
     
     # Calculate experience based on work history if explicit years not found
     if not years:
         # Look for date ranges
-        date_ranges = re.findall(r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{4})\s*(?:-|–|to)\s*((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{4}|present|current|now)', text, re.IGNORECASE)
+        # At most six more letters: the longest month name is "Sep" + "tember"
+        date_ranges = re.findall(r'((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]{0,6}\.?\s+\d{4})\s*(?:-|–|to)\s*((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]{0,6}\.?\s+\d{4}|present|current|now)', text, re.IGNORECASE)
         
         total_months = 0
         current_year = datetime.now().year
@@ -302,13 +543,12 @@ def analyze_experience(text, doc):
     # Look for job titles based on known roles
     positions = []
     
-    # Method 1: NER for JOB_TITLE if available
-    org_entities = [ent.text for ent in doc.ents if ent.label_ in ["ORG"]]
-    
-    # Method 2: Pattern-based matching for job titles
+    # Method 2: Pattern-based matching for job titles. A seniority prefix such as
+    # "Senior" or "Head of" needs no pattern of its own, [A-Z][A-Za-z\s] covers it;
+    # titles are looked for within the 50 characters kept below
     job_patterns = [
-        r'(?:^|\n)((?:Senior|Junior|Lead|Principal|Staff|Chief|Head of|Director of|VP of)?\s*[A-Z][A-Za-z\s]+(?:Developer|Engineer|Designer|Architect|Manager|Analyst|Scientist|Specialist|Consultant))',
-        r'(?:as|at|with)\s+(?:a|an)\s+((?:Senior|Junior|Lead|Principal)?\s*[A-Z][A-Za-z\s]+(?:Developer|Engineer|Designer|Architect|Manager))'
+        r'(?:^|\n)([^\S\n]*[A-Z][A-Za-z\s]{1,48}(?:Developer|Engineer|Designer|Architect|Manager|Analyst|Scientist|Specialist|Consultant))',
+        r'(?:as|at|with)\s+(?:a|an)\s+([A-Z][A-Za-z\s]{1,48}(?:Developer|Engineer|Designer|Architect|Manager))'
     ]
     
     for pattern in job_patterns:
@@ -316,14 +556,13 @@ def analyze_experience(text, doc):
         positions.extend([m.strip() for m in matches if 3 < len(m) < 50])
     
     # Method 3: Look for position titles at the beginning of bullet points
-    bullet_points = re.findall(r'(?:^|\n)(?:•|-|\*|\d+\.)\s*([A-Z][A-Za-z\s]+(?:Developer|Engineer|Designer|Manager|Analyst|Specialist))(?:at|,|\s+\(|\s+with)', text)
+    bullet_points = re.findall(r'(?:^|\n)(?:•|-|\*|\d+\.)\s*([A-Z][A-Za-z\s]{1,48}(?:Developer|Engineer|Designer|Manager|Analyst|Specialist))(?:at|,|\s+\(|\s+with)', text)
     positions.extend([bp.strip() for bp in bullet_points if 3 < len(bp) < 50])
     
     # Method 4: Look for known roles from our list
-    for role in ROLES:
-        if re.search(r'\b' + re.escape(role) + r'\b', text.lower()):
-            capitalized_role = ' '.join(word.capitalize() for word in role.split())
-            positions.append(capitalized_role)
+    for role in ctx.hits.found(ROLES):
+        capitalized_role = ' '.join(word.capitalize() for word in role.split())
+        positions.append(capitalized_role)
     
     # Filter and deduplicate positions
     positions = list(set(positions))
@@ -336,7 +575,7 @@ def analyze_experience(text, doc):
     
     return experience_data
 
-def analyze_education(text, doc):
+def analyze_education(ctx):
     """Extract and analyze education information with improved accuracy"""
     education = []
     
@@ -357,33 +596,16 @@ def analyze_education(text, doc):
         "b.tech", "m.tech", "b.e.", "m.e.", "b.s.", "m.s.", "b.a.", "m.a."
     ]
     
-    # Improved education section detection
-    edu_section = None
-    
-    # Try to find education section
-    section_headers = re.findall(r'(?:^|\n)(education|academic background|academic qualifications|educational qualifications?)(?::|\n)', text, re.IGNORECASE)
-    
-    if section_headers:
-        # Find the start and end of education section
-        start_match = re.search(r'(?:^|\n)(education|academic background|academic qualifications|educational qualifications?)(?::|\n)', text, re.IGNORECASE)
-        if start_match:
-            start_idx = start_match.start()
-            
-            # Look for the next section header
-            next_section = re.search(r'(?:^|\n)(experience|work experience|employment|skills|projects|certifications|activities|interests|languages|references)(?::|\n)', text[start_idx:], re.IGNORECASE)
-            
-            if next_section:
-                end_idx = start_idx + next_section.start()
-                edu_section = text[start_idx:end_idx]
-            else:
-                edu_section = text[start_idx:]
+    # Education section from the shared section index
+    edu_span = ctx.section("education")
     
     # If education section found, analyze it first
-    if edu_section:
-        paragraphs = edu_section.split('\n\n')
+    if edu_span:
+        paragraphs = ctx.paragraphs_in(*edu_span)
         
         for para in paragraphs:
-            if any(keyword in para.lower() for keyword in edu_keywords):
+            para_lower = para.lower()
+            if any(keyword in para_lower for keyword in edu_keywords):
                 # Clean and format
                 clean_text = para.strip().replace('\n', ' ')
                 
@@ -395,15 +617,12 @@ def analyze_education(text, doc):
                 if clean_text not in [e.get("text") for e in education]:
                     education_item = {
                         "text": clean_text,
-                        "quality_score": calculate_education_quality(clean_text, doc)
+                        "quality_score": calculate_education_quality(clean_text)
                     }
                     education.append(education_item)
     else:
         # Fallback: look for education info throughout the document
-        sentences = [sent.text for sent in doc.sents]
-        
-        for sent in sentences:
-            sent_text = sent.lower()
+        for sent, sent_text in zip(ctx.sentence_texts, ctx.sentence_texts_lower):
             if any(keyword in sent_text for keyword in edu_keywords):
                 # Check if sentence contains both institution and degree info
                 has_institution = any(inst in sent_text for inst in institutions)
@@ -415,15 +634,16 @@ def analyze_education(text, doc):
                     if len(clean_text) >= 10 and clean_text not in [e.get("text") for e in education]:
                         education_item = {
                             "text": clean_text,
-                            "quality_score": calculate_education_quality(clean_text, doc)
+                            "quality_score": calculate_education_quality(clean_text)
                         }
                         education.append(education_item)
     
     return education
 
-def calculate_education_quality(edu_text, doc):
+def calculate_education_quality(edu_text):
     """Calculate a more accurate quality score for education"""
     quality_score = 5  # Base score
+    edu_lower = edu_text.lower()
     
     # Enhanced quality factors
     prestigious = ["ivy", "league", "top", "prestigious", "renowned", "leading", "ranked", "tier", "accredited"]
@@ -438,23 +658,23 @@ def calculate_education_quality(edu_text, doc):
     prestigious_schools = ["harvard", "stanford", "mit", "yale", "princeton", "berkeley", "oxford", "cambridge", "caltech", "chicago", "imperial", "eth zurich", "mcgill"]
     
     # Adjust score based on keywords
-    if any(word in edu_text.lower() for word in prestigious):
+    if any(word in edu_lower for word in prestigious):
         quality_score += 1
     
-    if any(school in edu_text.lower() for school in prestigious_schools):
+    if any(school in edu_lower for school in prestigious_schools):
         quality_score += 2
     
-    if any(word in edu_text.lower() for word in tech_focus):
+    if any(word in edu_lower for word in tech_focus):
         quality_score += 1
     
-    if any(word in edu_text.lower() for word in advanced):
+    if any(word in edu_lower for word in advanced):
         quality_score += 1.5
         
-    if any(word in edu_text.lower() for word in honors):
+    if any(word in edu_lower for word in honors):
         quality_score += 1
     
     # Check for GPA (if high)
-    gpa_match = re.search(gpa_pattern, edu_text.lower())
+    gpa_match = re.search(gpa_pattern, edu_lower)
     if gpa_match:
         gpa_str = gpa_match.group(1)
         try:
@@ -476,13 +696,13 @@ def calculate_education_quality(edu_text, doc):
             pass  # If GPA conversion fails, ignore
     
     # Analyze relevance to technical fields
-    if any(skill.lower() in edu_text.lower() for skill in SKILLS):
+    if any(skill in edu_lower for skill in SKILLS):
         quality_score += 1
         
     # Cap at 10
     return min(10, quality_score)
 
-def extract_projects(text, doc):
+def extract_projects(ctx):
     """Extract project information with improved accuracy"""
     projects = []
     
@@ -492,27 +712,12 @@ def extract_projects(text, doc):
         "academic projects", "professional projects", "side projects", "portfolio"
     ]
     
-    # Identify project section
-    project_section = None
-    
-    # Try to find project section
-    section_match = re.search(r'(?:^|\n)(projects|selected projects|personal projects|academic projects|professional projects|side projects|portfolio)(?::|\n)', text, re.IGNORECASE)
-    
-    if section_match:
-        start_idx = section_match.start()
-        
-        # Look for the next section header
-        next_section = re.search(r'(?:^|\n)(experience|education|skills|certifications|activities|interests|languages|references)(?::|\n)', text[start_idx:], re.IGNORECASE)
-        
-        if next_section:
-            end_idx = start_idx + next_section.start()
-            project_section = text[start_idx:end_idx]
-        else:
-            project_section = text[start_idx:]
+    # Project section from the shared section index
+    project_span = ctx.section("projects")
     
     # If project section found
-    if project_section:
-        lines = project_section.split('\n')
+    if project_span:
+        lines = ctx.lines_in(*project_span)
         in_project = False
         current_project = {"title": None, "description": ""}
         
@@ -529,7 +734,7 @@ def extract_projects(text, doc):
                 continue
                 
             # Skip section headers
-            if any(marker.lower() == line.lower() for marker in project_markers):
+            if line.lower() in project_markers:
                 continue
                 
             # Check if this is a new project title (first line after section header or blank line)
@@ -548,15 +753,13 @@ def extract_projects(text, doc):
     else:
         # Fallback: try to find projects throughout the document
         # Look for paragraphs that might be projects
-        paragraphs = text.split('\n\n')
-        
-        for para in paragraphs:
+        for para, para_lower in zip(ctx.paragraphs, ctx.paragraphs_lower):
             lines = para.split('\n')
             if 2 <= len(lines) <= 10:  # Projects typically have a title and a few lines of description
                 first_line = lines[0].strip()
                 
                 # Project titles often contain tech keywords, are capitalized, and might contain "project"
-                if (any(skill.lower() in para.lower() for skill in SKILLS) and 
+                if (any(skill in para_lower for skill in SKILLS) and 
                     any(word[0].isupper() for word in first_line.split()) and
                     len(first_line) < 100):
                     
@@ -613,7 +816,8 @@ def calculate_project_complexity(project):
     ]
     
     # Tech stack breadth
-    tech_stack_size = sum(1 for skill in SKILLS if skill.lower() in project["description"].lower())
+    description_skills = SKILL_SUBSTRINGS.scan(project["description"].lower())
+    tech_stack_size = sum(1 for skill in SKILLS if skill in description_skills)
     
     # Adjust score based on indicators and tech stack
     full_text = (project["title"] + " " + project["description"]).lower()
@@ -627,7 +831,7 @@ def calculate_project_complexity(project):
     complexity_score += min(2, tech_stack_size * 0.4)
     
     # Check for quantifiable metrics
-    metrics = re.findall(r'(\d+[%+]|\d+\s*%|\$\d+|\d+\s*users|\d+\s*clients|\d+\s*transactions)', full_text)
+    metrics = re.findall(r'((?<!\d)\d+[%+]|(?<!\d)\d+\s*%|\$\d+|(?<!\d)\d+\s*users|(?<!\d)\d+\s*clients|(?<!\d)\d+\s*transactions)', full_text)
     complexity_score += min(1, len(metrics) * 0.5)
     
     # Check for project challenges
@@ -652,7 +856,7 @@ def calculate_project_complexity(project):
     # Cap at 10
     return min(10, complexity_score)
 
-def analyze_skills(text, doc):
+def analyze_skills(ctx):
     """Extract and analyze skills with improved accuracy"""
     skill_data = {
         "technical": [],
@@ -660,44 +864,33 @@ def analyze_skills(text, doc):
         "outdated": []
     }
     
-    # Potential skill section
-    skills_section = None
+    text_lower = ctx.lower
+    hits = ctx.hits
     
-    # Try to find skills section
-    section_match = re.search(r'(?:^|\n)(skills|technical skills|core competencies|expertise|technologies|tech stack)(?::|\n)', text, re.IGNORECASE)
-    
-    if section_match:
-        start_idx = section_match.start()
-        
-        # Look for the next section header
-        next_section = re.search(r'(?:^|\n)(experience|education|projects|certifications|activities|interests|languages|references)(?::|\n)', text[start_idx:], re.IGNORECASE)
-        
-        if next_section:
-            end_idx = start_idx + next_section.start()
-            skills_section = text[start_idx:end_idx]
-        else:
-            skills_section = text[start_idx:]
+    # Skill hits inside the skills section, if there is one
+    section_hits = None
+    skills_span = ctx.section("skills")
+    if skills_span:
+        section_hits = hits.within(*skills_span)
     
     # Technical skills extraction - improved with confidence scores
     technical_skills = []
     technical_confidence = {}
     
     # First check skills section if available
-    if skills_section:
-        for skill in SKILLS:
-            if re.search(r'\b' + re.escape(skill) + r'\b', skills_section.lower()):
-                technical_skills.append(skill)
-                # Higher confidence for skills listed in skills section
-                technical_confidence[skill] = 0.8
+    if section_hits:
+        for skill in section_hits.found(SKILLS):
+            technical_skills.append(skill)
+            # Higher confidence for skills listed in skills section
+            technical_confidence[skill] = 0.8
     
     # Then check entire document
-    for skill in SKILLS:
-        if skill not in technical_confidence and re.search(r'\b' + re.escape(skill) + r'\b', text.lower()):
+    for skill in hits.found(SKILLS):
+        if skill not in technical_confidence:
             technical_skills.append(skill)
             
             # Calculate confidence based on frequency and context
-            matches = re.findall(r'\b' + re.escape(skill) + r'\b', text.lower())
-            frequency = len(matches)
+            frequency = hits.count(skill)
             
             # Check context - skills near "experience with" or similar phrases have higher confidence
             context_score = 0
@@ -712,7 +905,7 @@ def analyze_skills(text, doc):
             ]
             
             for context in skill_contexts:
-                if context in text.lower():
+                if context in text_lower:
                     context_score += 0.2
             
             # Confidence score based on frequency and context
@@ -723,8 +916,9 @@ def analyze_skills(text, doc):
     for category, techs in OUTDATED_TECH.items():
         for tech in techs:
             # Only flag if it appears without qualifiers like "migrated from X" or "replaced X"
-            plain_match = re.search(r'\b' + re.escape(tech) + r'\b', text.lower())
-            migration_context = re.search(r'(migrated|replaced|upgraded|moved) (from|away from)? \b' + re.escape(tech) + r'\b', text.lower())
+            plain_match = tech in hits
+            migration_context = any(MIGRATION_CONTEXT.search(text_lower, max(0, start - 25), start)
+                                    for start in hits.offsets(tech))
             
             if plain_match and not migration_context:
                 outdated.append(tech)
@@ -733,44 +927,27 @@ def analyze_skills(text, doc):
                     technical_confidence[tech] *= 0.5
     
     # Soft skills extraction with improved accuracy
-    # More comprehensive soft skills list
-    soft_skills = [
-        "communication", "teamwork", "leadership", "problem solving", "critical thinking", 
-        "time management", "project management", "adaptability", "creativity", "interpersonal",
-        "collaboration", "presentation", "negotiation", "conflict resolution", "mentoring",
-        "decision making", "strategic thinking", "customer service", "emotional intelligence",
-        "self-motivated", "detail-oriented", "analytical thinking", "initiative", "persuasion",
-        "training", "team building", "client relations", "prioritization", "public speaking"
-    ]
-    
     found_soft_skills = []
     soft_skill_confidence = {}
     
-    for skill in soft_skills:
-        if re.search(r'\b' + re.escape(skill) + r'\b', text.lower()):
-            found_soft_skills.append(skill)
-            
-            # Calculate confidence for soft skill
-            matches = re.findall(r'\b' + re.escape(skill) + r'\b', text.lower())
-            frequency = len(matches)
-            
-            # Look for evidence/examples of the skill
-            evidence_patterns = [
-                f"{skill}.*example",
-                f"demonstrated {skill}",
-                f"{skill}.*team",
-                f"{skill}.*project",
-                f"{skill}.*client",
-                f"{skill}.*result"
-            ]
-            
-            evidence_score = 0
-            for pattern in evidence_patterns:
-                if re.search(pattern, text.lower()):
-                    evidence_score += 0.2
+    for skill in hits.found(SOFT_SKILLS):
+        found_soft_skills.append(skill)
+        
+        # Calculate confidence for soft skill
+        frequency = hits.count(skill)
             
-            # Confidence score based on frequency and evidence
-            soft_skill_confidence[skill] = min(0.8, 0.4 + (frequency * 0.1) + evidence_score)
+        # Look for evidence/examples of the skill: a word after it on the same line
+        evidence_words = ["example", "team", "project", "client", "result"]
+        
+        evidence_score = 0
+        if f"demonstrated {skill}" in text_lower:
+            evidence_score += 0.2
+        for word in evidence_words:
+            if _on_one_line(text_lower, re.escape(skill), word):
+                evidence_score += 0.2
+        
+        # Confidence score based on frequency and evidence
+        soft_skill_confidence[skill] = min(0.8, 0.4 + (frequency * 0.1) + evidence_score)
     
     # Sort technical skills by confidence and take top ones
     sorted_technical = sorted([(skill, technical_confidence.get(skill, 0)) 
@@ -811,22 +988,38 @@ def analyze_skills(text, doc):
     final_balance = max(1, min(10, balance_score))
     
     skill_data["technical"] = technical_final
+    # Every technical skill found, not only the top ones; job matching weighs skills by it
+    skill_data["technical_confidence"] = {skill: round(conf, 3) for skill, conf in sorted_technical}
     skill_data["soft"] = soft_final
     skill_data["outdated"] = outdated
     skill_data["balance_score"] = final_balance
     
     return skill_data
 
-def analyze_interests(text, doc):
+def _add_skill_scores(scores, incidence, weight, rows=None):
+    """Add weight to each skill's score for every text it occurs in, of the rows selected if given
+    
+    Skills new to scores are added in the order a loop over the texts, then
+    over SKILLS, would meet them.
+    """
+    matrix = incidence.matrix if rows is None else incidence.matrix[rows]
+    skills = matrix[:, incidence.columns(SKILLS)]
+    counts = skills.sum(axis=0)
+    # np.nonzero walks the matrix row by row, so the first occurrence of each column is its first text
+    columns, first = np.unique(np.nonzero(skills)[1], return_index=True)
+    for column in columns[np.argsort(first, kind='stable')]:
+        skill = SKILLS[column]
+        scores[skill] = scores.get(skill, 0) + weight * int(counts[column])
+
+def analyze_interests(ctx):
     """Analyze interests and passion areas with improved accuracy"""
     interest_score = {}
+    hits = ctx.hits
     
     # Enhanced analysis using word vectors and contextual clues
     # Count explicit mentions of skills
-    for skill in SKILLS:
-        count = len(re.findall(r'\b' + re.escape(skill) + r'\b', text.lower()))
-        if count > 0:
-            interest_score[skill] = count
+    for skill in hits.found(SKILLS):
+        interest_score[skill] = hits.count(skill)
     
     # Look for phrases indicating passion
     passion_contexts = [
@@ -838,54 +1031,19 @@ def analyze_interests(text, doc):
         r'excited by ([\w\s]+)'
     ]
     
-    for pattern in passion_contexts:
-        matches = re.findall(pattern, text.lower())
-        for match in matches:
-            # Check if any skill is within the passionate context
-            for skill in SKILLS:
-                if skill in match:
-                    interest_score[skill] = interest_score.get(skill, 0) + 3
+    matches = [match for pattern in passion_contexts for match in re.findall(pattern, ctx.lower)]
+    # Check if any skill is within the passionate context
+    _add_skill_scores(interest_score, SKILL_SUBSTRINGS.incidence(matches), 3)
     
+    sentence_terms = ctx.sentence_terms
     # Check for passion indicators near skills
-    for sentence in doc.sents:
-        sentence_text = sentence.text.lower()
-        has_passion = any(indicator in sentence_text for indicator in PASSION_INDICATORS)
-        
-        if has_passion:
-            for skill in SKILLS:
-                if skill in sentence_text:
-                    interest_score[skill] = interest_score.get(skill, 0) + 2
-    
-    # Look for personal projects or side activities
-    project_indicators = [
-        "personal project", "side project", "hobby project", "contributed to",
-        "open source", "github", "portfolio", "blog", "wrote", "created", "developed",
-        "built", "designed", "implemented", "volunteer"
-    ]
-    
-    # Find sentences with project indicators
-    project_sentences = []
-    for sentence in doc.sents:
-        if any(indicator in sentence.text.lower() for indicator in project_indicators):
-            project_sentences.append(sentence.text.lower())
+    _add_skill_scores(interest_score, sentence_terms, 2, sentence_terms.any_of(PASSION_INDICATORS))
     
-    # Check for skills in project contexts
-    for sentence in project_sentences:
-        for skill in SKILLS:
-            if skill in sentence:
-                interest_score[skill] = interest_score.get(skill, 0) + 3
+    # Check for skills in sentences about personal projects or side activities
+    _add_skill_scores(interest_score, sentence_terms, 3, sentence_terms.any_of(PROJECT_INDICATORS))
     
     # Consider skills mentioned in leadership or ownership contexts
-    ownership_indicators = ["led", "managed", "spearheaded", "initiated", "founded", "created", "started"]
-    
-    for sentence in doc.sents:
-        sentence_text = sentence.text.lower()
-        has_ownership = any(indicator in sentence_text for indicator in ownership_indicators)
-        
-        if has_ownership:
-            for skill in SKILLS:
-                if skill in sentence_text:
-                    interest_score[skill] = interest_score.get(skill, 0) + 1
+    _add_skill_scores(interest_score, sentence_terms, 1, sentence_terms.any_of(OWNERSHIP_INDICATORS))
     
     # Normalize scores to 1-10 scale
     max_score = max(interest_score.values()) if interest_score else 1
@@ -898,20 +1056,21 @@ def analyze_interests(text, doc):
     sorted_interests = sorted(normalized_interests.items(), key=lambda x: x[1], reverse=True)
     return [{"skill": skill, "score": score} for skill, score in sorted_interests[:5]]
 
-def analyze_growth_potential(text, doc):
+def analyze_growth_potential(ctx):
     """Analyze growth potential with improved accuracy"""
     growth_score = 0
     growth_areas = []
+    hits = ctx.hits
+    text_lower = ctx.lower
     
     # Check for growth indicators with weighted scoring
-    for indicator in GROWTH_INDICATORS:
-        count = len(re.findall(r'\b' + re.escape(indicator) + r'\b', text.lower()))
-        if count > 0:
-            growth_score += min(3, count * 0.5)  # Cap contribution from any single indicator
-            
-            # Only add unique indicators
-            if indicator not in growth_areas:
-                growth_areas.append(indicator)
+    for indicator in hits.found(GROWTH_INDICATORS):
+        count = hits.count(indicator)
+        growth_score += min(3, count * 0.5)  # Cap contribution from any single indicator
+        
+        # Only add unique indicators
+        if indicator not in growth_areas:
+            growth_areas.append(indicator)
     
     # Check for learning patterns with contextual analysis
     learning_patterns = [
@@ -926,7 +1085,7 @@ def analyze_growth_potential(text, doc):
     ]
     
     for pattern in learning_patterns:
-        if re.search(pattern, text.lower()):
+        if re.search(pattern, text_lower):
             growth_score += 1
     
     # Check for career progression indicators
@@ -941,7 +1100,7 @@ def analyze_growth_potential(text, doc):
     ]
     
     for indicator in progression_indicators:
-        if re.search(indicator, text.lower()):
+        if re.search(indicator, text_lower):
             growth_score += 1
             if "career progression" not in growth_areas:
                 growth_areas.append("career progression")
@@ -958,22 +1117,17 @@ def analyze_growth_potential(text, doc):
         r'agile'
     ]
     
-    adaptability_count = sum(1 for indicator in adaptability_indicators if re.search(indicator, text.lower()))
+    adaptability_count = sum(1 for indicator in adaptability_indicators if re.search(indicator, text_lower))
     if adaptability_count > 0:
         growth_score += min(2, adaptability_count)
         if "adaptability" not in growth_areas:
             growth_areas.append("adaptability")
     
     # Look for sentences discussing future goals
-    future_indicators = ["goal", "aim", "aspire", "future", "plan", "intend", "looking to", "seeking"]
-    
-    for sentence in doc.sents:
-        sentence_text = sentence.text.lower()
-        if any(indicator in sentence_text for indicator in future_indicators):
-            growth_score += 1
-            if "future-oriented" not in growth_areas:
-                growth_areas.append("future-oriented")
-            break
+    if ctx.sentence_terms.any_of(FUTURE_INDICATORS).any():
+        growth_score += 1
+        if "future-oriented" not in growth_areas:
+            growth_areas.append("future-oriented")
     
     # Normalize score and select top growth areas
     final_growth_score = min(10, max(1, int(growth_score)))
@@ -995,52 +1149,53 @@ def analyze_growth_potential(text, doc):
         "indicators": prioritized_areas[:3]  # Top 3 growth indicators
     }
 
-def analyze_writing_quality(text, doc):
+def analyze_writing_quality(ctx):
     """Analyze the writing quality with improved accuracy"""
     quality_score = 7  # Start with a baseline score
+    hits = ctx.hits
+    text_lower = ctx.lower
     
     # Check for weak phrases
-    weak_phrase_count = sum(1 for phrase in WEAK_PHRASES if re.search(r'\b' + re.escape(phrase) + r'\b', text.lower()))
+    weak_phrase_count = len(hits.found(WEAK_PHRASES))
     
     # Check for strong action verbs
-    action_verb_count = sum(1 for verb in STRONG_ACTION_VERBS if re.search(r'\b' + re.escape(verb) + r'\b', text.lower()))
+    action_verb_count = len(hits.found(STRONG_ACTION_VERBS))
     
     # Check for quantifiable achievements with improved detection
     quantifiable_patterns = [
-        r'\d+%',
-        r'increased .* by',
-        r'decreased .* by',
-        r'reduced .* by',
-        r'improved .* by',
-        r'generated .*\$[\d,]+',
-        r'saved .*\$[\d,]+',
+        r'(?<!\d)\d+%',
         r'[\$€£][\d,]+',
-        r'\d+ users',
-        r'\d+ clients',
-        r'\d+ projects',
-        r'\d+ team members',
+        r'(?<!\d)\d+ users',
+        r'(?<!\d)\d+ clients',
+        r'(?<!\d)\d+ projects',
+        r'(?<!\d)\d+ team members',
         r'top \d+%'
     ]
+    # A verb and, later on the same line, what it was measured by
+    quantifiable_phrases = [
+        ('increased ', ' by'),
+        ('decreased ', ' by'),
+        ('reduced ', ' by'),
+        ('improved ', ' by'),
+        ('generated ', r'\$[\d,]+'),
+        ('saved ', r'\$[\d,]+')
+    ]
     
-    quantifiable_count = sum(1 for pattern in quantifiable_patterns if re.search(pattern, text.lower()))
+    quantifiable_count = sum(1 for pattern in quantifiable_patterns if re.search(pattern, text_lower)) + \
+        sum(1 for first, then in quantifiable_phrases if _on_one_line(text_lower, first, then))
     
     # Check for generic terms
-    generic_count = sum(1 for term in GENERIC_TERMS if re.search(r'\b' + re.escape(term) + r'\b', text.lower()))
+    generic_count = len(hits.found(GENERIC_TERMS))
     
     # Advanced analysis
     
     # Check for active voice vs passive voice
-    sentences = list(doc.sents)
-    passive_count = 0
-    active_count = 0
-    
-    for sent in sentences:
-        sent_text = sent.text.lower()
-        # Simple passive voice detection (can be improved)
-        if re.search(r'\b(was|were|been|be|is|are)\b.*\b(by)\b', sent_text):
-            passive_count += 1
-        elif any(verb in sent_text for verb in STRONG_ACTION_VERBS):
-            active_count += 1
+    # Simple passive voice detection (can be improved)
+    passive = np.array([bool(_on_one_line(sent_text, r'\b(?:was|were|been|be|is|are)\b', r'\bby\b'))
+                        for sent_text in ctx.sentence_texts_lower], dtype=bool)
+    active = ctx.sentence_terms.any_of(STRONG_ACTION_VERBS) & ~passive
+    passive_count = int(passive.sum())
+    active_count = int(active.sum())
     
     # Calculate active/passive ratio
     if passive_count + active_count > 0:
@@ -1049,8 +1204,8 @@ def analyze_writing_quality(text, doc):
         quality_score += (active_ratio - 0.5) * 2  # +1 point for 100% active, -1 for 0% active
     
     # Check for consistency in tense
-    past_tense_verbs = re.findall(r'\b(ed|created|developed|managed|led|implemented|designed)\b', text.lower())
-    present_tense_verbs = re.findall(r'\b(ing|create|develop|manage|lead|implement|design)s?\b', text.lower())
+    past_tense_verbs = re.findall(r'\b(ed|created|developed|managed|led|implemented|designed)\b', text_lower)
+    present_tense_verbs = re.findall(r'\b(ing|create|develop|manage|lead|implement|design)s?\b', text_lower)
     
     # Most resumes should use past tense consistently
     if len(past_tense_verbs) + len(present_tense_verbs) > 0:
@@ -1061,8 +1216,7 @@ def analyze_writing_quality(text, doc):
             quality_score -= 1
     
     # Check for redundancy or repetition
-    words = [token.text.lower() for token in doc if token.is_alpha and not token.is_stop]
-    word_counts = Counter(words)
+    word_counts = Counter(ctx.content_words)
     
     # Find words repeated too frequently
     repetitive_words = [word for word, count in word_counts.items() if count > 5 and word not in ["experience", "project", "skill"]]
@@ -1290,70 +1444,32 @@ def calculate_ats_score(parsed_data):
     
     return scoring
 
-def extract_info(text):
-    """Main function to extract and analyze resume data with improved accuracy"""
-    # Clean the text for better processing
-    clean_text = text.replace('\r', '\n')
-    clean_text = re.sub(r'\n{3,}', '\n\n', clean_text)  # Normalize line breaks
-    
-    # Preserve raw text for reference
-    raw_text = clean_text
-    
-    # Create spaCy doc
-    doc = nlp(clean_text.lower())
-    
-    # Contact information
-    contact_info = extract_contact_info(clean_text, doc)
-    
-    # Experience analysis
-    experience = analyze_experience(clean_text, doc)
-    
-    # Education analysis
-    education = analyze_education(clean_text, doc)
-    
-    # Project analysis
-    projects = extract_projects(clean_text, doc)
-    
-    # Skills analysis
-    skills_data = analyze_skills(clean_text, doc)
-    skills = skills_data.get("technical", [])
-    
-    # Interests analysis
-    interests = analyze_interests(clean_text, doc)
-    
-    # Growth potential analysis
-    growth = analyze_growth_potential(clean_text, doc)
-    
-    # Writing quality analysis
-    writing_quality = analyze_writing_quality(clean_text, doc)
-    
-    # Location and role extraction with improved accuracy
-    
-    # Extract role
+def extract_role(ctx, skills_data):
+    """Most likely target role: stated outright, a known role title, or guessed from the skills"""
     found_role = None
     role_candidates = []
     
-    # First look for explicit role statements
+    # First look for explicit role statements. The second pattern only starts at the
+    # start of a run of words: had a match started later in the run, it would have
+    # started at the run's start as well
     role_patterns = [
-        r'(seeking|looking for|interested in) (?:a|an) ([\w\s]+) (?:position|role|opportunity)',
-        r'([\w\s]+) (?:professional|specialist|engineer|developer|designer)'
+        r'(seeking|looking for|interested in) (?:a|an) ([\w\s]{1,60}) (?:position|role|opportunity)',
+        r'(?<![\w\s])([\w\s]+) (?:professional|specialist|engineer|developer|designer)'
     ]
     
     for pattern in role_patterns:
-        matches = re.findall(pattern, clean_text.lower())
+        matches = re.findall(pattern, ctx.lower)[:ROLE_STATEMENT_LIMIT]
         if matches:
             for match in matches:
                 candidate = match[1] if len(match) > 1 else match[0]
                 role_candidates.append(candidate)
     
     # Then check for known roles
-    for role in ROLES:
-        if re.search(r'\b' + re.escape(role) + r'\b', clean_text.lower()):
-            role_candidates.append(role)
+    role_candidates.extend(ctx.hits.found(ROLES))
     
     # Score candidates by frequency and position in document
     role_scores = {}
-    lines = clean_text.lower().split('\n')
+    lines = ctx.lines_lower
     
     for i, line in enumerate(lines[:10]):  # Check early in document (header/summary)
         for candidate in role_candidates:
@@ -1361,8 +1477,12 @@ def extract_info(text):
                 role_scores[candidate] = role_scores.get(candidate, 0) + (10 - i)  # Higher score if appears earlier
     
     # Also score by frequency throughout document
+    hits = ctx.hits
     for candidate in role_candidates:
-        count = len(re.findall(r'\b' + re.escape(candidate) + r'\b', clean_text.lower()))
+        if candidate in hits:
+            count = hits.count(candidate)
+        else:
+            count = len(re.findall(r'\b' + re.escape(candidate) + r'\b', ctx.lower))
         role_scores[candidate] = role_scores.get(candidate, 0) + count
     
     # Select highest scoring role
@@ -1382,27 +1502,26 @@ def extract_info(text):
         else:
             found_role = "software engineer"  # Default role
     
-    # Extract location with improved accuracy
+    return found_role
+
+def extract_location(ctx):
+    """Location from an explicit pattern, else a GPE entity near the top, else Remote"""
     location = None
     
-    # First try explicit location patterns
-    location_patterns = [
-        r'(?:based in|located in|from|location: |location) ([A-Z][a-z]+(?: [A-Z][a-z]+)*)',
-        r'([A-Z][a-z]+(?: [A-Z][a-z]+)*),\s*(?:[A-Z]{2}|[A-Za-z]+)\s*\d*'  # City, State ZIP
-    ]
-    
-    for pattern in location_patterns:
-        location_match = re.search(pattern, clean_text)
-        if location_match:
-            location = location_match.group(1)
-            break
+    # First try an explicit location, then "City, State ZIP"
+    location_match = re.search(r'(?:based in|located in|from|location: |location) ([A-Z][a-z]+(?: [A-Z][a-z]+)*)',
+                               ctx.text)
+    if location_match:
+        location = location_match.group(1)
+    else:
+        location = _city_and_region(ctx.text)
     
     # If no matches, try named entity recognition for GPE (Geopolitical Entity)
     if not location:
-        locations = [ent.text for ent in doc.ents if ent.label_ == "GPE"]
+        locations = ctx.entities("GPE")
         if locations:
             # Prefer locations that appear early in the document (header)
-            first_20_lines = ' '.join(clean_text.split('\n')[:20]).lower()
+            first_20_lines = ' '.join(ctx.lines_lower[:20])
             for loc in locations:
                 if loc.lower() in first_20_lines:
                     location = loc
@@ -1416,73 +1535,979 @@ def extract_info(text):
     if not location:
         location = "Remote"
     
-    # Store everything in the parsed data
-    parsed_data = {
-        "contact_info": contact_info,
-        "skills": skills,
-        "skills_data": skills_data,
-        "role": found_role,
-        "location": location,
-        "experience": experience,
-        "experience_years": experience.get("years"),
-        "education": education,
-        "projects": projects,
-        "interests": interests,
-        "growth_potential": growth,
-        "writing_quality": writing_quality,
-        "raw_text": raw_text
-    }
-    
-    # Generate suggestions
-    suggestions = generate_resume_suggestions(parsed_data)
-    parsed_data["resume_suggestions"] = suggestions
-    
-    # Calculate ATS score
-    ats_score = calculate_ats_score(parsed_data)
-    parsed_data["ats_score"] = ats_score
+    return location
+
+def clean_resume_text(text):
+    """Normalize line breaks before analysis"""
+    clean_text = text.replace('\r', '\n')
+    return re.sub(r'\n{3,}', '\n\n', clean_text)
+
+# Every field extract_info can return: the function computing it from the context and
+# the fields computed so far, the fields it reads, and the name of its Server-Timing stage
+ANALYSIS_FIELDS = {
+    "contact_info": (lambda ctx, data: extract_contact_info(ctx), [], "contact_info"),
+    "skills": (lambda ctx, data: data["skills_data"].get("technical", []), ["skills_data"], None),
+    "skills_data": (lambda ctx, data: analyze_skills(ctx), [], "skills"),
+    "role": (lambda ctx, data: extract_role(ctx, data["skills_data"]), ["skills_data"], "role"),
+    "location": (lambda ctx, data: extract_location(ctx), [], "location"),
+    "experience": (lambda ctx, data: analyze_experience(ctx), [], "experience"),
+    "experience_years": (lambda ctx, data: data["experience"].get("years"), ["experience"], None),
+    "education": (lambda ctx, data: analyze_education(ctx), [], "education"),
+    "projects": (lambda ctx, data: extract_projects(ctx), [], "projects"),
+    "interests": (lambda ctx, data: analyze_interests(ctx), [], "interests"),
+    "growth_potential": (lambda ctx, data: analyze_growth_potential(ctx), [], "growth_potential"),
+    "writing_quality": (lambda ctx, data: analyze_writing_quality(ctx), [], "writing_quality"),
+    "raw_text": (lambda ctx, data: ctx.text, [], None),
+    "resume_suggestions": (lambda ctx, data: generate_resume_suggestions(data),
+                           ["writing_quality", "raw_text", "skills_data", "role", "projects", "education"],
+                           "suggestions"),
+    "ats_score": (lambda ctx, data: calculate_ats_score(data),
+                  ["contact_info", "skills_data", "experience", "education", "projects", "writing_quality"],
+                  "ats_score"),
+}
+
+# What an analyzer that ran out of CPU time contributes instead of its result
+DEGRADED_RESULTS = {
+    "contact_info": lambda: {"name": None, "email": None, "phone": None, "linkedin": None},
+    "skills_data": lambda: {"technical": [], "soft": [], "outdated": [], "technical_confidence": {}, "balance_score": 1},
+    "role": lambda: None,
+    "location": lambda: None,
+    "experience": lambda: {"years": None, "positions": []},
+    "education": lambda: [],
+    "projects": lambda: [],
+    "interests": lambda: [],
+    "growth_potential": lambda: {"score": 1, "indicators": []},
+    "writing_quality": lambda: {"score": 1, "weak_phrases_found": 0, "action_verbs_found": 0,
+                                "quantifiable_achievements": 0, "generic_terms_found": 0},
+}
+
+# Fields whose analyzer reads annotations from the spaCy doc, keyed as in ANALYZER_ANNOTATIONS
+FIELD_ANALYZERS = {
+    "contact_info": "contact_info",
+    "skills_data": "skills",
+    "location": "location",
+    "experience": "experience",
+    "education": "education",
+    "projects": "projects",
+    "interests": "interests",
+    "growth_potential": "growth_potential",
+    "writing_quality": "writing_quality",
+}
+
+def resolve_fields(fields=None):
+    """The requested fields plus everything they depend on, in an order that computes dependencies first
+    
+    All fields when fields is None. Raises ValueError for unknown field names.
+    """
+    if fields is None:
+        fields = list(ANALYSIS_FIELDS)
+    unknown = [field for field in fields if field not in ANALYSIS_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(ANALYSIS_FIELDS)}.")
+    
+    order = []
+    def visit(field):
+        if field in order:
+            return
+        for dependency in ANALYSIS_FIELDS[field][1]:
+            visit(dependency)
+        order.append(field)
+    for field in fields:
+        visit(field)
+    return order
+
+def _needs_doc(field, use_ner=None):
+    """Whether computing a field reads the spaCy doc, itself or through a dependency
+    
+    Only annotations the analysis will actually use count: without NER,
+    contact_info and location read no entities and so need no doc.
+    """
+    analyzer = FIELD_ANALYZERS.get(field)
+    return (analyzer is not None and bool(required_annotations([analyzer], use_ner))) or \
+        any(_needs_doc(dependency, use_ner) for dependency in ANALYSIS_FIELDS[field][1])
+
+def iter_extract_info(text, use_ner=None, doc=None, fields=None):
+    """Compute the fields of extract_info one by one, yielding (field, value) as each requested one is ready
+    
+    Fields that need no spaCy annotations come first, so skills and experience
+    are ready before the parse has even run. Arguments as for extract_info.
+    Analyzers that run out of CPU time get their DEGRADED_RESULTS value, and a
+    last ("degraded", [fields]) pair names them.
+    """
+    # Clean the text for better processing
+    clean_text = clean_resume_text(text)
+    needed = resolve_fields(fields)
+    # A stable partition keeps dependencies first: nothing a doc-free field depends on needs the doc
+    needs_doc = {field: _needs_doc(field, use_ner) for field in needed}
+    needed = [field for field in needed if not needs_doc[field]] + [field for field in needed if needs_doc[field]]
+    requested = set(needed if fields is None else fields)
+    
+    # Context shared by every analyzer; the spaCy doc is parsed from the lowercased text
+    # with only the components the selected analyzers need
+    analyzers = [FIELD_ANALYZERS[field] for field in needed if field in FIELD_ANALYZERS]
+    annotations = required_annotations(analyzers, use_ner)
+    ctx = AnalysisContext(clean_text, LEXICON, nlp=partial(parse_doc, annotations=annotations), doc=doc,
+                          sentence_lexicon=SENTENCE_LEXICON, ner="ents" in annotations)
+    
+    data = {}
+    degraded = []
+    for field in needed:
+        # The shared views are built when first needed, so that their cost is timed on its own
+        if field in FIELD_ANALYZERS:
+            if "hits" not in ctx.__dict__:
+                with timed_stage("lexicon"):
+                    ctx.hits
+            if needs_doc[field] and "doc" not in ctx.__dict__:
+                with timed_stage("nlp"):
+                    ctx.doc
+        
+        compute, _, stage = ANALYSIS_FIELDS[field]
+        if stage is None:
+            data[field] = compute(ctx, data)
+        else:
+            with timed_stage(stage):
+                try:
+                    with cpu_time_limit(ANALYZER_CPU_SECONDS if field in DEGRADED_RESULTS else 0):
+                        data[field] = compute(ctx, data)
+                except AnalyzerTimeout:
+                    app.logger.warning("Analyzer for %s ran out of CPU time on a %d-character resume",
+                                       field, len(clean_text))
+                    data[field] = DEGRADED_RESULTS[field]()
+                    degraded.append(field)
+        if field in requested:
+            yield field, data[field]
+    if degraded:
+        yield "degraded", degraded
+
+def extract_info(text, use_ner=None, doc=None, fields=None):
+    """Main function to extract and analyze resume data with improved accuracy
+    
+    use_ner overrides the deployment's RESUME_NLP_NER setting for this resume;
+    without NER the name and location fall back to the text heuristics.
+    doc is an optional spaCy doc already parsed from clean_resume_text(text).lower().
+    fields limits the analysis to those fields (see ANALYSIS_FIELDS) and what they
+    depend on; only the requested fields are returned. A "degraded" list names
+    the fields whose analyzer ran out of CPU time, if any did.
+    """
+    info = dict(iter_extract_info(text, use_ner=use_ner, doc=doc, fields=fields))
+    result = {field: info[field] for field in ANALYSIS_FIELDS if field in info}
+    if "degraded" in info:
+        result["degraded"] = info["degraded"]
+    return result
+
+def extract_info_batch(texts, use_ner=None, batch_size=32, n_process=1, fields=None):
+    """Analyze many resumes, parsing them together with nlp.pipe
+    
+    Yields an (info, error) pair per text, in input order.
+    """
+    clean_texts = [clean_resume_text(text) for text in texts]
+    analyzers = [FIELD_ANALYZERS[field] for field in resolve_fields(fields) if field in FIELD_ANALYZERS]
+    annotations = required_annotations(analyzers, use_ner)
+    if annotations:
+        docs = parse_docs((text.lower() for text in clean_texts), annotations,
+                          batch_size=batch_size, n_process=n_process)
+    else:
+        # None of the analyzers reads the doc, so nothing is parsed
+        docs = [None] * len(clean_texts)
     
-    return parsed_data
+    for clean_text, doc in zip(clean_texts, docs):
+        try:
+            yield extract_info(clean_text, use_ner=use_ner, doc=doc, fields=fields), None
+        except Exception as e:
+            print(f"Error analyzing resume: {str(e)}")
+            yield None, str(e)
+
+def iter_batch_uploads(files):
+    """Yield (filename, file object) for every uploaded resume, expanding .zip archives"""
+    archive_bytes = 0
+    for file in files:
+        if not file.filename:
+            continue
+        if not file.filename.lower().endswith('.zip'):
+            yield file.filename, file.stream
+            continue
+        
+        with zipfile.ZipFile(file.stream) as archive:
+            for member in archive.infolist():
+                name = member.filename
+                if member.is_dir() or name.startswith('__MACOSX/') or os.path.basename(name).startswith('.'):
+                    continue
+                archive_bytes += member.file_size
+                if archive_bytes > BATCH_MAX_ARCHIVE_BYTES:
+                    raise ValueError("Archive contents exceed the maximum allowed size")
+                yield name, io.BytesIO(archive.read(member))
+
+def process_parse_job(filename, payload, options):
+    """Job handler: extract and analyze one uploaded resume"""
+    if not wait_until_ready():
+        raise RuntimeError(f"The analysis model failed to load: {_startup['error']}")
+    timer = start_stages()
+    try:
+        with timer.stage("extract"):
+            text = extract_text_from_file(filename, io.BytesIO(payload), tier=options.get("tier"))
+        if text is None:
+            raise ValueError("Unsupported file format. Please upload a PDF or DOCX file.")
+        if len(text) < MIN_TEXT_LENGTH:
+            raise ValueError("Could not extract sufficient text from the file. Please check if the file is valid.")
+        info, stages = run_in_worker(call_with_stages, extract_info, text, use_ner=options.get("ner"),
+                                     fields=options.get("fields"))
+        timer.extend(stages)
+        index_result(result_cache.key(payload, parse_options(options.get("ner"), options.get("tier"),
+                                                             options.get("fields"))), filename, info)
+        return info
+    finally:
+        record_stages(timer)
+        stop_stages()
+
+_job_workers = None
+_job_workers_lock = threading.Lock()
+
+def get_job_workers():
+    """Open the job queue and start draining it on first use"""
+    global _job_workers
+    with _job_workers_lock:
+        if _job_workers is None:
+            os.makedirs(os.path.dirname(JOBS_DB), exist_ok=True)
+            workers = JobWorkers(JobQueue(JOBS_DB), process_parse_job, num_workers=JOB_WORKERS)
+            workers.start()
+            _job_workers = workers
+    return _job_workers
+
+def compute_analysis_version():
+    """Hash of the lexicons, the extraction, analysis and scoring code and the spaCy setup
+    
+    Part of every result cache key, so a deploy that changes any of them
+    invalidates the results computed before it. The spaCy setup is the model
+    and its version, and the sentence segmenter.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([SKILLS, ROLES, PASSION_INDICATORS, GROWTH_INDICATORS, WEAK_PHRASES,
+                              STRONG_ACTION_VERBS, GENERIC_TERMS, OUTDATED_TECH, SOFT_SKILLS]).encode())
+    for module_file in (__file__, lexicon.__file__, context.__file__, sections.__file__, extraction.__file__):
+        with open(module_file, 'rb') as f:
+            digest.update(f.read())
+    digest.update(json.dumps([installed_model(), SENTENCE_SEGMENTER]).encode())
+    return digest.hexdigest()[:16]
+
+ANALYSIS_VERSION = compute_analysis_version()
+
+def _open_result_cache():
+    if RESULT_CACHE_DB:
+        os.makedirs(os.path.dirname(os.path.abspath(RESULT_CACHE_DB)), exist_ok=True)
+    return ResultCache(ANALYSIS_VERSION, max_entries=RESULT_CACHE_ENTRIES, disk_path=RESULT_CACHE_DB or None,
+                       max_disk_entries=RESULT_CACHE_DB_ENTRIES)
+
+result_cache = _open_result_cache()
+
+def parse_options(use_ner, tier, fields):
+    """Options that change a parse result, as part of its cache key
+    
+    Defaults are resolved first, so that a result computed under one
+    deployment default is not returned under another.
+    """
+    return {"ner": NER_ENABLED if use_ner is None else use_ner, "tier": tier or extraction.DEFAULT_TIER,
+            "fields": sorted(fields) if fields else None}
+
+# Opened by the model loader, since reading a large store takes a while
+candidate_index = None
+
+def _open_candidate_index():
+    global candidate_index
+    if SEARCH_DB and candidate_index is None:
+        os.makedirs(os.path.dirname(os.path.abspath(SEARCH_DB)), exist_ok=True)
+        candidate_index = CandidateIndex(SEARCH_DB)
+
+vector_store = None
+
+def _open_vector_store():
+    global vector_store
+    if not EMBEDDINGS_DIR or vector_store is not None:
+        return
+    width = vector_width(get_nlp().vocab)
+    if width == 0:
+        print("Resume embeddings are disabled: the spaCy model has no word vectors")
+        return
+    vector_store = VectorStore(EMBEDDINGS_DIR, width, approximate_min_rows=SIMILAR_APPROXIMATE_MIN_ROWS)
+    # Built while loading, so that no search waits for it
+    vector_store.build_cluster_index()
+
+def indexing_enabled():
+    return candidate_index is not None or vector_store is not None
+
+def index_result(parse_id, filename, info):
+    """Add a parse result to the search index and the embedding store, where enabled and complete enough"""
+    if candidate_index is not None and all(field in info for field in SEARCH_FIELDS):
+        try:
+            candidate_index.add(parse_id, filename, info)
+        except Exception as e:
+            print(f"Error indexing resume: {str(e)}")
+    if vector_store is not None and all(field in info for field in EMBEDDING_FIELDS):
+        try:
+            vector = resume_embedding(get_nlp().vocab, info)
+            if vector is not None:
+                vector_store.add(parse_id, filename, vector)
+        except Exception as e:
+            print(f"Error storing resume embedding: {str(e)}")
+
+def record_stages(timer):
+    for stage, seconds in timer.stages:
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.metrics_endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    g.stage_timer = start_stages()
+    IN_FLIGHT.inc(endpoint=g.metrics_endpoint)
+
+@app.after_request
+def add_server_timing(response):
+    timer = g.get("stage_timer")
+    if timer is not None and timer.stages:
+        response.headers["Server-Timing"] = timer.server_timing()
+    REQUESTS.inc(endpoint=g.get("metrics_endpoint", "unmatched"), status=response.status_code)
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Compress the body with the best coding the client accepts, brotli over gzip"""
+    if (COMPRESS_LEVEL <= 0 or response.direct_passthrough or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES or "Content-Encoding" in response.headers):
+        return response
+    response.vary.add("Accept-Encoding")
+    coding = request.accept_encodings.best_match(available_encodings())
+    if coding is None or response.content_length is None or response.content_length < COMPRESS_MIN_BYTES:
+        return response
+    with timed_stage("compress"):
+        response.set_data(compress(response.get_data(), coding, COMPRESS_LEVEL))
+    response.headers["Content-Encoding"] = coding
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    if "request_start" not in g:
+        return
+    REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, endpoint=g.metrics_endpoint)
+    IN_FLIGHT.dec(endpoint=g.metrics_endpoint)
+    timer = stop_stages()
+    if timer is not None:
+        record_stages(timer)
+
+
+def requested_fields():
+    """Field names from the request's comma-separated ?fields=, or None for all fields"""
+    value = request.args.get('fields')
+    if not value:
+        return None
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    # Raises ValueError for unknown names
+    resolve_fields(fields)
+    return fields or None
+
+# Response views: "full" returns every field, "compact" leaves out raw_text, the bulk of
+# most responses, and links to it instead when the result is cached
+RESPONSE_VIEWS = ("full", "compact")
+
+def requested_view():
+    """The request's ?view=, "full" by default; raises ValueError for unknown views"""
+    view = request.args.get('view', 'full')
+    if view not in RESPONSE_VIEWS:
+        raise ValueError(f"Unknown view. Use one of: {', '.join(RESPONSE_VIEWS)}.")
+    return view
+
+def raw_text_url(parse_id):
+    return f"/api/results/{parse_id}/raw_text"
+
+def apply_view(info, view, parse_id=None):
+    """info as the view returns it; parse_id links a compact result to its cached raw_text"""
+    if view == "full" or "raw_text" not in info:
+        return info
+    info = {field: value for field, value in info.items() if field != "raw_text"}
+    if parse_id is not None:
+        info["raw_text_url"] = raw_text_url(parse_id)
+    return info
+
+RESPONSE_FORMATS = ("json", "msgpack")
+
+class FormatUnavailable(ValueError):
+    """A known response format this server cannot produce; answered with a 406"""
+
+def requested_format():
+    """The request's ?format=, else "msgpack" if the Accept header prefers it, else "json"
+    
+    Raises ValueError for unknown formats, and FormatUnavailable for msgpack when
+    it is not installed.
+    """
+    response_format = request.args.get('format')
+    if response_format is None:
+        best = request.accept_mimetypes.best_match(("application/json",) + MSGPACK_MIMETYPES)
+        return "msgpack" if msgpack_available() and best in MSGPACK_MIMETYPES else "json"
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown format. Use one of: {', '.join(RESPONSE_FORMATS)}.")
+    if response_format == "msgpack" and not msgpack_available():
+        raise FormatUnavailable("MessagePack responses need the msgpack package on the server.")
+    return response_format
+
+def respond(data, response_format="json"):
+    """data serialized in the requested format"""
+    with timed_stage("serialize"):
+        if response_format == "msgpack":
+            return Response(pack_msgpack(data), mimetype=MSGPACK_MIMETYPES[0])
+        return jsonify(data)
 
 @app.route('/api/parse-resume', methods=['POST'])
 def parse_resume():
-    if 'file' not in request.files:
+    if not models_ready():
+        return not_ready_response()
+    
+    with timed_stage("upload"):
+        files = request.files
+    if 'file' not in files:
         return jsonify({"error": "No file part"}), 400
     
-    file = request.files['file']
+    file = files['file']
     if file.filename == '':
         return jsonify({"error": "No selected file"}), 400
     
     if file:
+        if mime_type_for(file.filename, file.mimetype) is None:
+            return jsonify({"error": "Unsupported file format. Please upload a PDF or DOCX file."}), 400
+        
+        tier = request.args.get('tier')
+        if tier is not None and tier not in TIERS:
+            return jsonify({"error": f"Unknown extraction tier. Use one of: {', '.join(TIERS)}."}), 400
+        
+        try:
+            fields = requested_fields()
+            view = requested_view()
+            response_format = requested_format()
+        except FormatUnavailable as e:
+            return jsonify({"error": str(e)}), 406
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        # Opt-in profiling of this request, for holders of the profiling token
+        profile_mode = request.args.get('profile') or request.headers.get('X-Profile')
+        if profile_mode:
+            if not profiling_allowed(request.headers.get('X-Profile-Token')):
+                return jsonify({"error": "Profiling is not enabled for this request."}), 403
+            if profile_mode not in PROFILE_MODES:
+                return jsonify({"error": f"Unknown profile mode. Use one of: {', '.join(PROFILE_MODES)}."}), 400
+        
         try:
-            filename = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-            file.save(filename)
+            # Identical uploads are answered from the result cache, unless the request is profiled
+            use_ner = request.args.get('ner', '1') != '0' and NER_ENABLED
+            with timed_stage("cache"):
+                cache_key = result_cache.key(file.stream, parse_options(use_ner, tier, fields))
+                cached = None if profile_mode else result_cache.get(cache_key)
+            if cached is not None:
+                cached["parse_id"] = cache_key
+                return respond(apply_view(cached, view, cache_key), response_format)
             
-            text = ""
-            if filename.lower().endswith('.pdf'):
-                text = extract_text_from_pdf(filename)
-            elif filename.lower().endswith('.docx'):
-                text = extract_text_from_docx(filename)
-            else:
-                os.remove(filename)  # Clean up the file
-                return jsonify({"error": "Unsupported file format. Please upload a PDF or DOCX file."}), 400
+            # The upload buffer goes straight to the extractor, nothing is written to disk
+            with timed_stage("extract"):
+                document, extraction_profile = profile_call(profile_mode, extract_document, file.filename, file.stream,
+                                                            tier=tier, content_type=file.mimetype)
+            text = document["text"]
             
-            if not text or len(text) < 100:
-                os.remove(filename)
+            if not text or len(text) < MIN_TEXT_LENGTH:
                 return jsonify({"error": "Could not extract sufficient text from the file. Please check if the file is valid."}), 400
             
-            info = extract_info(text)
-            os.remove(filename)  # Clean up the file
+            # Stages timed (and profiles taken) in a worker process come back with the result
+            (info, stages), analysis_profile = run_in_worker(profile_call, profile_mode, call_with_stages,
+                                                             extract_info, text, use_ner=use_ner, fields=fields)
+            g.stage_timer.extend(stages)
+            # A degraded result is not kept: the next upload gets another try
+            if "degraded" not in info:
+                result_cache.put(cache_key, info)
+            index_result(cache_key, file.filename, info)
             
-            return jsonify(info)
+            if profile_mode:
+                profile = merge_profiles(extraction_profile, analysis_profile)
+                if request.args.get('profile_format') == 'collapsed':
+                    return collapsed_stacks(profile) + "\n", 200, {"Content-Type": "text/plain; charset=utf-8"}
+                info["profile"] = render_profile(profile, profile_mode, top=request.args.get('profile_top', 25, type=int))
+            
+            # Tier, page counts and per-page timings of this extraction; not part of the cached result
+            info["extraction"] = {key: value for key, value in document.items() if key != "text"}
+            # Lets /api/match reuse this result
+            info["parse_id"] = cache_key
+            return respond(apply_view(info, view, None if "degraded" in info else cache_key), response_format)
         except Exception as e:
             print(f"Error processing file: {str(e)}")
-            try:
-                os.remove(filename)  # Try to clean up the file
-            except:
-                pass
-                
             return jsonify({"error": f"Error processing resume: {str(e)}"}), 500
 
+# Streamed parse results: one event per line, or Server-Sent Events
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+def stream_event(stream_format, event, data):
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {app.json.dumps(data)}\n\n"
+    return app.json.dumps({"event": event, "data": data}) + "\n"
+
+@app.route('/api/parse-resume/stream', methods=['POST'])
+def parse_resume_stream():
+    """/api/parse-resume, sending each field as soon as it is computed
+    
+    Like /api/parse-resume, analysis runs in the worker pool when there is one,
+    where the analyzer CPU limits apply; the worker sends each field back as
+    soon as it is ready.
+    """
+    if not models_ready():
+        return not_ready_response()
+    
+    file = request.files.get('file')
+    if file is None or file.filename == '':
+        return jsonify({"error": "No file part"}), 400
+    if mime_type_for(file.filename, file.mimetype) is None:
+        return jsonify({"error": "Unsupported file format. Please upload a PDF or DOCX file."}), 400
+    
+    tier = request.args.get('tier')
+    if tier is not None and tier not in TIERS:
+        return jsonify({"error": f"Unknown extraction tier. Use one of: {', '.join(TIERS)}."}), 400
+    try:
+        fields = requested_fields()
+        view = requested_view()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    stream_format = request.args.get('format') or (
+        "sse" if "text/event-stream" in request.headers.get("Accept", "") else "ndjson")
+    if stream_format not in STREAM_FORMATS:
+        return jsonify({"error": f"Unknown stream format. Use one of: {', '.join(STREAM_FORMATS)}."}), 400
+    use_ner = request.args.get('ner', '1') != '0' and NER_ENABLED
+    
+    def events():
+        try:
+            with timed_stage("cache"):
+                cache_key = result_cache.key(file.stream, parse_options(use_ner, tier, fields))
+                cached = result_cache.get(cache_key)
+            if cached is not None:
+                for field, value in apply_view(cached, view, cache_key).items():
+                    yield stream_event(stream_format, field, value)
+                yield stream_event(stream_format, "done", {"parse_id": cache_key, "cached": True})
+                return
+            
+            with timed_stage("extract"):
+                document = extract_document(file.filename, file.stream, tier=tier, content_type=file.mimetype)
+            text = document["text"]
+            if not text or len(text) < MIN_TEXT_LENGTH:
+                yield stream_event(stream_format, "error", {"error": "Could not extract sufficient text from the file. Please check if the file is valid."})
+                return
+            yield stream_event(stream_format, "extraction", {key: value for key, value in document.items() if key != "text"})
+            
+            info = {}
+            for kind, item in iter_in_worker(iter_with_stages, iter_extract_info, text, use_ner=use_ner,
+                                             fields=fields):
+                if kind == "stages":
+                    timer = current_timer()
+                    if timer is not None:
+                        timer.extend(item)
+                    continue
+                field, value = item
+                info[field] = value
+                if view == "full" or field != "raw_text":
+                    yield stream_event(stream_format, field, value)
+            if "degraded" not in info:
+                result_cache.put(cache_key, {field: info[field] for field in ANALYSIS_FIELDS if field in info})
+                if view == "compact" and "raw_text" in info:
+                    yield stream_event(stream_format, "raw_text_url", raw_text_url(cache_key))
+            index_result(cache_key, file.filename, info)
+            yield stream_event(stream_format, "done", {"parse_id": cache_key, "cached": False})
+        except Exception as e:
+            print(f"Error processing file: {str(e)}")
+            yield stream_event(stream_format, "error", {"error": f"Error processing resume: {str(e)}"})
+    
+    # Proxies must pass each event on as it is written
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(events()), mimetype=STREAM_FORMATS[stream_format], headers=headers)
+
+@app.route('/api/parse-resumes', methods=['POST'])
+def parse_resumes():
+    if not models_ready():
+        return not_ready_response()
+    
+    files = request.files.getlist('files')
+    if not files:
+        return jsonify({"error": "No files part"}), 400
+    
+    try:
+        batch_size = max(1, int(request.args.get('batch_size', BATCH_SIZE)))
+        n_process = max(1, min(int(request.args.get('n_process', 1)), BATCH_MAX_PROCESSES))
+    except ValueError:
+        return jsonify({"error": "batch_size and n_process must be integers"}), 400
+    use_ner = request.args.get('ner', '1') != '0' and NER_ENABLED
+    tier = request.args.get('tier')
+    if tier is not None and tier not in TIERS:
+        return jsonify({"error": f"Unknown extraction tier. Use one of: {', '.join(TIERS)}."}), 400
+    try:
+        fields = requested_fields()
+        view = requested_view()
+        response_format = requested_format()
+    except FormatUnavailable as e:
+        return jsonify({"error": str(e)}), 406
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # One entry per file in upload order; texts are analyzed together afterwards
+    results = []
+    texts = []
+    text_slots = []
+    parse_ids = []
+    try:
+        for filename, fileobj in iter_batch_uploads(files):
+            if len(results) >= BATCH_MAX_FILES:
+                return jsonify({"error": f"Too many files. The maximum per request is {BATCH_MAX_FILES}."}), 400
+            
+            if indexing_enabled():
+                parse_ids.append(result_cache.key(fileobj, parse_options(use_ner, tier, fields)))
+            text = extract_text_from_file(filename, fileobj, tier=tier)
+            if text is None:
+                results.append({"filename": filename, "error": "Unsupported file format. Please upload a PDF or DOCX file."})
+            elif len(text) < MIN_TEXT_LENGTH:
+                results.append({"filename": filename, "error": "Could not extract sufficient text from the file. Please check if the file is valid."})
+            else:
+                results.append({"filename": filename})
+                texts.append(text)
+                text_slots.append(len(results) - 1)
+    except (zipfile.BadZipFile, ValueError) as e:
+        return jsonify({"error": f"Invalid archive: {str(e)}"}), 400
+    
+    # In a worker process when there is a pool, where the analyzer CPU limits apply
+    analyzed = iter_in_worker(extract_info_batch, texts, use_ner=use_ner, batch_size=batch_size,
+                              n_process=n_process, fields=fields)
+    for slot, (info, error) in zip(text_slots, analyzed):
+        if error:
+            results[slot]["error"] = f"Error processing resume: {error}"
+        else:
+            results[slot]["result"] = apply_view(info, view)
+            if parse_ids:
+                index_result(parse_ids[slot], results[slot]["filename"], info)
+    
+    failed = sum(1 for result in results if "error" in result)
+    return respond({
+        "results": results,
+        "processed": len(results) - failed,
+        "failed": failed
+    }, response_format)
+
+def _match_request():
+    """(resume source, job descriptions, top) from a JSON or multipart /api/match request"""
+    if request.is_json:
+        body = request.get_json()
+        jobs = body.get("jobs") or []
+        source = {"parse_id": body.get("parse_id"), "text": body.get("resume_text")}
+        top = body.get("top")
+    else:
+        jobs = json.loads(request.form.get("jobs", "[]"))
+        jobs.extend(request.form.getlist("job_description"))
+        source = {"parse_id": request.form.get("parse_id"), "text": request.form.get("resume_text"),
+                  "file": request.files.get("file")}
+        top = request.form.get("top", type=int)
+    
+    # Each job is a description string or an object with an optional id and a description
+    jobs = [job if isinstance(job, dict) else {"description": job} for job in jobs]
+    if any(not isinstance(job.get("description"), str) for job in jobs):
+        raise ValueError("Every job needs a description string.")
+    if top is not None and (not isinstance(top, int) or top < 1):
+        raise ValueError("top must be a positive integer.")
+    return source, jobs, top
+
+@app.route('/api/match', methods=['POST'])
+def match_resume():
+    try:
+        source, jobs, top = _match_request()
+    except (ValueError, AttributeError) as e:
+        return jsonify({"error": f"Invalid match request: {str(e)}"}), 400
+    if not jobs:
+        return jsonify({"error": "No job descriptions given"}), 400
+    if len(jobs) > MATCH_MAX_JOBS:
+        return jsonify({"error": f"Too many job descriptions. The maximum per request is {MATCH_MAX_JOBS}."}), 400
+    
+    # The resume's skills: from an earlier parse, or analyzed here (skills only)
+    if source["parse_id"]:
+        parsed = result_cache.get(source["parse_id"])
+        if parsed is None or "technical_confidence" not in parsed.get("skills_data", {}):
+            return jsonify({"error": "Unknown or expired parse_id. Parse the resume again."}), 404
+        skills_data = parsed["skills_data"]
+    else:
+        if not models_ready():
+            return not_ready_response()
+        text = source["text"]
+        file = source.get("file")
+        if not text and file:
+            if mime_type_for(file.filename, file.mimetype) is None:
+                return jsonify({"error": "Unsupported file format. Please upload a PDF or DOCX file."}), 400
+            with timed_stage("extract"):
+                text = extract_text_from_file(file.filename, file.stream)
+        if not text or len(text) < MIN_TEXT_LENGTH:
+            return jsonify({"error": "Provide a parse_id, a resume file or resume_text with enough text."}), 400
+        info, stages = run_in_worker(call_with_stages, extract_info, text, fields=["skills_data"])
+        g.stage_timer.extend(stages)
+        skills_data = info["skills_data"]
+    
+    with timed_stage("match"):
+        matches = match_jobs(skills_data, [job["description"] for job in jobs], job_skill_cache, top=top)
+    for match in matches:
+        job_id = jobs[match["index"]].get("id")
+        if job_id is not None:
+            match["id"] = job_id
+    
+    return jsonify({
+        "matches": matches,
+        # The best match, in the shape the results page renders
+        "job_match": matches[0] if matches else None,
+        "resume_skills": skills_data.get("technical", [])
+    })
+
+@app.route('/api/search', methods=['GET'])
+def search_candidates():
+    if candidate_index is None:
+        if SEARCH_DB and not models_ready():
+            return not_ready_response()
+        return jsonify({"error": "Search is not enabled. Set RESUME_SEARCH_DB to enable it."}), 404
+    
+    top = max(1, min(request.args.get('top', 20, type=int), SEARCH_MAX_RESULTS))
+    start = time.perf_counter()
+    try:
+        result = candidate_index.search(
+            request.args.get('q', ''),
+            min_experience=request.args.get('min_experience', type=int),
+            max_experience=request.args.get('max_experience', type=int),
+            min_ats=request.args.get('min_ats', type=int),
+            top=top
+        )
+    except QueryError as e:
+        return jsonify({"error": f"Invalid query: {str(e)}"}), 400
+    result["took_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return jsonify(result)
+
+@app.route('/api/similar', methods=['POST'])
+def similar_resumes():
+    if vector_store is None:
+        if EMBEDDINGS_DIR and not models_ready():
+            return not_ready_response()
+        return jsonify({"error": "Similarity search is not enabled. Set RESUME_EMBEDDINGS_DIR and use a model "
+                                 "with word vectors to enable it."}), 404
+    
+    body = request.get_json(silent=True) or {}
+    top = body.get("top", 10)
+    if not isinstance(top, int) or top < 1:
+        return jsonify({"error": "top must be a positive integer."}), 400
+    top = min(top, SIMILAR_MAX_RESULTS)
+    
+    # The query vector: a stored resume, a resume analyzed here or a job description
+    parse_id = body.get("parse_id")
+    with timed_stage("embed"):
+        if parse_id:
+            query = vector_store.vector(parse_id)
+            if query is None:
+                parsed = result_cache.get(parse_id)
+                if parsed is None or not all(field in parsed for field in EMBEDDING_FIELDS):
+                    return jsonify({"error": "Unknown or expired parse_id. Parse the resume again."}), 404
+                query = resume_embedding(get_nlp().vocab, parsed)
+        elif isinstance(body.get("resume_text"), str):
+            if len(body["resume_text"]) < MIN_TEXT_LENGTH:
+                return jsonify({"error": "resume_text is too short to compare."}), 400
+            info, stages = run_in_worker(call_with_stages, extract_info, body["resume_text"],
+                                         fields=list(EMBEDDING_FIELDS))
+            g.stage_timer.extend(stages)
+            query = resume_embedding(get_nlp().vocab, info)
+        elif isinstance(body.get("job_description"), str):
+            columns = job_skill_cache.columns(body["job_description"])
+            query = job_embedding(get_nlp().vocab, body["job_description"],
+                                  [job_skill_cache.skills[column] for column in columns])
+        else:
+            return jsonify({"error": "Provide a parse_id, resume_text or job_description."}), 400
+    if query is None:
+        return jsonify({"error": "The input has no words the model has vectors for."}), 400
+    
+    with timed_stage("similar"):
+        matches = vector_store.search(query, top=top, exclude=parse_id, exact=bool(body.get("exact")))
+    results = []
+    for match_parse_id, filename, score in matches:
+        result = {"parse_id": match_parse_id, "filename": filename, "score": round(score, 4)}
+        candidate = candidate_index.get(match_parse_id) if candidate_index is not None else None
+        if candidate is not None:
+            result.update({field: candidate[field] for field in SEARCH_FIELDS})
+        results.append(result)
+    return jsonify({"results": results, "corpus_size": len(vector_store)})
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    if 'file' not in request.files:
+        return jsonify({"error": "No file part"}), 400
+    
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No selected file"}), 400
+    
+    if mime_type_for(file.filename) is None:
+        return jsonify({"error": "Unsupported file format. Please upload a PDF or DOCX file."}), 400
+    
+    tier = request.args.get('tier')
+    if tier is not None and tier not in TIERS:
+        return jsonify({"error": f"Unknown extraction tier. Use one of: {', '.join(TIERS)}."}), 400
+    try:
+        fields = requested_fields()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    job_workers = get_job_workers()
+    options = {"ner": request.args.get('ner', '1') != '0' and NER_ENABLED, "tier": tier, "fields": fields}
+    job_id = job_workers.queue.enqueue(file.filename, file.read(), options)
+    job_workers.notify()
+    
+    response = jsonify({"job_id": job_id, "status": "queued"})
+    response.headers["Location"] = f"/api/jobs/{job_id}"
+    return response, 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        view = requested_view()
+        response_format = requested_format()
+    except FormatUnavailable as e:
+        return jsonify({"error": str(e)}), 406
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job = get_job_workers().queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if "result" in job:
+        job["result"] = apply_view(job["result"], view)
+    return respond(job, response_format)
+
+@app.route('/api/results/<parse_id>/raw_text', methods=['GET'])
+def result_raw_text(parse_id):
+    """The raw_text of a cached parse result, as plain text"""
+    cached = result_cache.get(parse_id)
+    if cached is None or "raw_text" not in cached:
+        return jsonify({"error": "No cached result with raw_text for this parse_id."}), 404
+    return cached["raw_text"], 200, {"Content-Type": "text/plain; charset=utf-8"}
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    stats = result_cache.stats()
+    stats["job_skills"] = job_skill_cache.stats()
+    return jsonify(stats)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return render_metrics(), 200, {"Content-Type": PROMETHEUS_CONTENT_TYPE}
+
+# The model is loaded and warmed up in the background, so the server answers
+# health checks while it starts; /readyz reports when resumes can be parsed
+SAMPLE_RESUME_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples", "sample_resume.txt")
+
+_startup = {"state": "not_started", "error": None, "load_seconds": None, "warmup_seconds": None}
+_startup_lock = threading.Lock()
+_startup_done = threading.Event()
+
+def warm_up():
+    """Parse the bundled sample resume, paying spaCy's and the regex caches' lazy setup up front"""
+    with open(SAMPLE_RESUME_PATH, encoding='utf-8') as f:
+        extract_info(f.read())
+
+def load_and_warm_up(workers=0):
+    """Load the model, warm it up and, with workers > 0, fork the worker pool from the warm process
+    
+    Forking copies only the calling thread, so with workers > 0 this must run
+    before any other thread starts; see load_in_foreground.
+    """
+    try:
+        start = time.perf_counter()
+        get_nlp()
+        _open_candidate_index()
+        _open_vector_store()
+        _startup["load_seconds"] = round(time.perf_counter() - start, 3)
+        
+        start = time.perf_counter()
+        warm_up()
+        _startup["warmup_seconds"] = round(time.perf_counter() - start, 3)
+        
+        if workers > 0:
+            start_worker_pool(workers)
+        _startup["state"] = "ready"
+    except Exception as e:
+        print(f"Error loading the analysis model: {str(e)}")
+        _startup["state"] = "failed"
+        _startup["error"] = str(e)
+    finally:
+        _startup_done.set()
+
+def _begin_loading():
+    with _startup_lock:
+        if _startup["state"] != "not_started":
+            return False
+        _startup["state"] = "loading"
+        return True
+
+def start_background_loading():
+    """Load and warm up the model in a thread of its own, so the server can answer probes meanwhile"""
+    if _begin_loading():
+        threading.Thread(target=load_and_warm_up, name="model-loader", daemon=True).start()
+
+def load_in_foreground(workers=0):
+    """Load, warm up and fork the worker pool in this thread; True if the model is ready"""
+    if _begin_loading():
+        load_and_warm_up(workers)
+    return wait_until_ready()
+
+def models_ready():
+    return _startup["state"] == "ready"
+
+def wait_until_ready(timeout=None):
+    """Block until startup has finished; True if the model is ready"""
+    _startup_done.wait(timeout)
+    return models_ready()
+
+def not_ready_response():
+    response = jsonify({"error": "The service is starting. Please retry shortly.", "status": _startup["state"]})
+    response.headers["Retry-After"] = "5"
+    return response, 503
+
+@app.before_request
+def start_loading_on_first_request():
+    # `flask run` and WSGI servers import the app without calling serve(), and importing
+    # it must not load anything; their first request, usually a probe, starts loading
+    if _startup["state"] == "not_started":
+        start_background_loading()
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    if models_ready():
+        return jsonify({"status": "ready", "load_seconds": _startup["load_seconds"],
+                        "warmup_seconds": _startup["warmup_seconds"]})
+    return jsonify({"status": _startup["state"], "error": _startup["error"]}), 503
+
+def serve(host="127.0.0.1", port=5000, workers=0):
+    """Serve the API, optionally dispatching analysis to pre-forked workers
+    
+    With workers > 0 the analysis processes are forked once the model and
+    lexicons are loaded and warm, so they share that memory copy-on-write.
+    The fork happens before the server and the job threads start, so none of
+    their locks can be copied into a worker while held; the server listens
+    once the pool is up.
+    """
+    if workers > 0:
+        if not load_in_foreground(workers):
+            raise SystemExit(f"The analysis model failed to load: {_startup['error']}")
+        # Resume jobs left over from a previous run right away
+        get_job_workers()
+        app.run(host=host, port=port, threaded=True)
+    else:
+        if ANALYZER_CPU_SECONDS > 0:
+            app.logger.warning("RESUME_ANALYZER_CPU_SECONDS is not enforced without RESUME_WORKERS: "
+                               "requests and jobs analyze on threads, which cannot handle the timer signal")
+        start_background_loading()
+        app.run(host=host, port=port, debug=True)
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    serve(host=os.environ.get("RESUME_HOST", "127.0.0.1"),
+          port=int(os.environ.get("RESUME_PORT", "5000")),
+          workers=int(os.environ.get("RESUME_WORKERS", "0")))
 
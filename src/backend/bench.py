@@ -0,0 +1,421 @@
+"""Micro-benchmarks of the resume analyzers over a synthetic corpus.
+
+The corpus is generated from a fixed seed, so every run sees the same texts
+and no files or network access are needed. Each analyzer is timed on its own,
+against a context whose spaCy doc is already parsed, and the spaCy parse and
+the full extract_info are timed separately.
+
+    python bench.py                       # run and print the report
+    python bench.py --save-baseline       # store the results as the baseline
+    python bench.py --check               # fail if a p50 regressed past the threshold
+    python bench.py --fuzz                # fail if an analyzer grows super-linearly on adversarial input
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import app
+from context import AnalysisContext
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DEFAULT_THRESHOLD = 0.25
+SEED = 1234
+
+FIRST_NAMES = ["Alice", "Rahul", "Maria", "Chen", "Fatima", "James", "Olga", "Kwame"]
+LAST_NAMES = ["Johnson", "Sharma", "Garcia", "Wei", "Khan", "Smith", "Ivanova", "Mensah"]
+CITIES = ["San Francisco, CA 94105", "Austin, TX", "Bangalore, India", "Berlin, Germany", "Toronto, ON"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Hooli"]
+TITLES = ["Software Engineer", "Senior Backend Developer", "Data Scientist", "Frontend Developer",
+          "DevOps Engineer", "Machine Learning Engineer", "Full Stack Developer"]
+DEGREES = ["Bachelor of Science in Computer Science", "Master of Science in Data Science",
+           "B.Tech in Information Technology", "MBA", "PhD in Machine Learning"]
+SCHOOLS = ["Stanford University", "IIT Delhi", "University of Toronto", "MIT", "TU Munich"]
+TECH = ["python", "java", "javascript", "typescript", "react", "node", "django", "flask", "aws",
+        "docker", "kubernetes", "sql", "postgresql", "mongodb", "tensorflow", "pytorch", "git",
+        "graphql", "redis", "kafka", "spark", "html", "css", "jquery", "angular", "go", "rust"]
+VERBS = ["Led", "Built", "Designed", "Implemented", "Optimized", "Migrated", "Launched",
+         "Automated", "Mentored", "Reduced", "Improved", "Was responsible for", "Helped with"]
+OBJECTS = ["a real-time analytics pipeline", "the payments service", "an internal design system",
+           "CI/CD workflows", "a recommendation engine", "the legacy monolith", "data ingestion jobs",
+           "customer-facing dashboards", "a microservices architecture", "onboarding documentation"]
+OUTCOMES = ["reducing latency by {n}%", "serving {n}k daily users", "cutting costs by {n}%",
+            "improving test coverage to {n}%", "for a team of {n} engineers", "ahead of schedule"]
+INTERESTS = ["open source", "hackathons", "rock climbing", "chess", "teaching", "photography",
+             "continuous learning", "writing technical blogs", "robotics", "volunteering"]
+
+
+def _bullet(rng):
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(5, 90))
+    tech = ", ".join(rng.sample(TECH, rng.randint(1, 3)))
+    return f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {tech}, {outcome}."
+
+
+def _job(rng, year):
+    lines = [f"{rng.choice(TITLES)} at {rng.choice(COMPANIES)}",
+             f"{rng.choice(['Jan', 'Mar', 'Jun', 'Sep'])} {year} - {rng.choice(['Present', str(year + rng.randint(1, 3))])}"]
+    lines.extend(_bullet(rng) for _ in range(rng.randint(3, 6)))
+    return "\n".join(lines)
+
+
+def _project(rng):
+    name = f"{rng.choice(['Open', 'Smart', 'Quick', 'Deep'])}{rng.choice(['Tracker', 'Search', 'Chat', 'Vision'])}"
+    tech = ", ".join(rng.sample(TECH, 3))
+    return (f"{name}\nA {rng.choice(['web', 'mobile', 'distributed', 'machine learning'])} application "
+            f"built with {tech}. {_bullet(rng)[2:]}\nGitHub: github.com/{name.lower()}")
+
+
+def generate_resume(pages, seed=SEED):
+    """A realistic resume of roughly the given number of pages"""
+    rng = random.Random(f"{seed}:{pages}")
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    parts = [
+        name,
+        rng.choice(TITLES),
+        f"{name.split()[0].lower()}@example.com | +1 (555) {rng.randint(100, 999)}-{rng.randint(1000, 9999)} | {rng.choice(CITIES)}",
+        f"linkedin.com/in/{name.replace(' ', '').lower()} | github.com/{name.split()[1].lower()}",
+        "",
+        "Summary",
+        f"Passionate {rng.choice(TITLES).lower()} with {rng.randint(2, 15)} years of experience. "
+        f"Eager to learn and always seeking new challenges. {_bullet(rng)[2:]}",
+        "",
+        "Experience",
+    ]
+    jobs = max(2, 4 * pages)
+    for i in range(jobs):
+        parts.append(_job(rng, 2023 - 2 * i))
+        parts.append("")
+    parts.append("Education")
+    for _ in range(max(1, pages // 3)):
+        parts.append(f"{rng.choice(DEGREES)}\n{rng.choice(SCHOOLS)}, {rng.randint(2005, 2020)}\nGPA: 3.{rng.randint(0, 9)}/4.0")
+    parts.extend(["", "Projects"])
+    parts.extend(_project(rng) for _ in range(2 * pages))
+    parts.extend(["", "Skills", "Technical Skills: " + ", ".join(rng.sample(TECH, 12)),
+                  "Soft skills: communication, leadership, teamwork, problem solving",
+                  "", "Certifications", "AWS Certified Solutions Architect",
+                  "", "Interests", ", ".join(rng.sample(INTERESTS, 4))])
+    return "\n".join(parts)
+
+
+def generate_pathological(kind, seed=SEED):
+    """Inputs that stress the regexes and text splitting rather than look like resumes"""
+    rng = random.Random(f"{seed}:{kind}")
+    if kind == "no_newlines":
+        return " ".join(generate_resume(3, seed).split())
+    if kind == "header_storm":
+        headers = ["Experience", "Skills", "Education", "Projects", "Interests"]
+        return "\n".join(rng.choice(headers) + ":" for _ in range(5000))
+    if kind == "long_tokens":
+        return "\n".join("".join(rng.choice("abcdefghij") for _ in range(2000)) for _ in range(30))
+    if kind == "symbol_noise":
+        return "".join(rng.choice("@.-_:/|()+ 0123456789\n") for _ in range(60000))
+    raise ValueError(f"Unknown pathological input: {kind}")
+
+
+# Repeated, each of these once sent some pattern super-linear; fuzz inputs are
+# made of one of them, or of random runs of all of them
+ADVERSARIAL_FRAGMENTS = {
+    "title_case": "Alpha Beta Gamma Delta ",
+    "digits": "1234567890",
+    "evidence": "communication leadership ",
+    "increased": "increased saved generated ",
+    "passive": "it is what was ",
+    "email_local": "a.b",
+    "as_a": "as a Big ",
+    "months": "marjan",
+    "seeking": "seeking a x ",
+    "role_words": "lorem ipsum data team ",
+    "whitespace_lines": "\n \n ",
+    "spaces": "as a      ",
+    "long_token": "abcdefghij",
+}
+# Growth past this exponent (time ~ size ** exponent) from the smallest to the largest size fails --fuzz
+FUZZ_MAX_EXPONENT = 1.5
+# Times below this many ms at the largest size are too noisy to take an exponent from
+FUZZ_MIN_MS = 10.0
+
+
+def generate_adversarial(kind, size, seed=SEED):
+    """size characters of a repeated fragment, or of random runs of fragments for kind "mixed" """
+    if kind == "mixed":
+        rng = random.Random(f"{seed}:{size}")
+        fragments = list(ADVERSARIAL_FRAGMENTS.values())
+        pieces = []
+        length = 0
+        while length < size:
+            piece = rng.choice(fragments) * rng.randint(1, 64)
+            pieces.append(piece)
+            length += len(piece)
+        return "".join(pieces)[:size]
+    fragment = ADVERSARIAL_FRAGMENTS[kind]
+    return (fragment * (size // len(fragment) + 1))[:size]
+
+
+def build_corpus(seed=SEED):
+    corpus = {f"{pages}_page": generate_resume(pages, seed) for pages in (1, 3, 20)}
+    for kind in ("no_newlines", "header_storm", "long_tokens", "symbol_noise"):
+        corpus[f"pathological_{kind}"] = generate_pathological(kind, seed)
+    return corpus
+
+
+ANALYZERS = {
+    "contact_info": app.extract_contact_info,
+    "experience": app.analyze_experience,
+    "education": app.analyze_education,
+    "projects": app.extract_projects,
+    "skills": app.analyze_skills,
+    "interests": app.analyze_interests,
+    "growth_potential": app.analyze_growth_potential,
+    "writing_quality": app.analyze_writing_quality,
+    # The skills only matter when no role is found in the text
+    "role": lambda ctx: app.extract_role(ctx, {}),
+    "location": app.extract_location,
+}
+
+
+def _benchmarks(text):
+    """(name, setup) pairs; setup returns the zero-argument function to time"""
+    clean_text = app.clean_resume_text(text)
+    annotations = app.required_annotations(app.ANALYZER_ANNOTATIONS)
+    doc = app.parse_doc(clean_text.lower(), annotations)
+
+    def analyzer_setup(analyzer):
+        def setup():
+            # A fresh context per run, so views cached by an earlier run are not reused
+            ctx = AnalysisContext(clean_text, app.LEXICON, doc=doc, sentence_lexicon=app.SENTENCE_LEXICON)
+            return lambda: analyzer(ctx)
+        return setup
+
+    benchmarks = [(name, analyzer_setup(analyzer)) for name, analyzer in ANALYZERS.items()]
+    benchmarks.append(("spacy_parse", lambda: lambda: app.parse_doc(clean_text.lower(), annotations)))
+    benchmarks.append(("extract_info", lambda: lambda: app.extract_info(text)))
+    return benchmarks
+
+
+def _percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(setup, repeat, warmup=1):
+    """Timing percentiles in ms, plus the memory allocated by one traced run"""
+    for _ in range(warmup):
+        setup()()
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            fn = setup()
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    # Allocations are measured in a separate run, since tracing slows everything down
+    fn = setup()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    fn()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename") if stat.size_diff > 0)
+    allocations = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    timings.sort()
+    return {
+        "runs": repeat,
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": _percentile(timings, 0.5),
+        "p90_ms": _percentile(timings, 0.9),
+        "p99_ms": _percentile(timings, 0.99),
+        "peak_kb": peak / 1024,
+        "retained_kb": allocated / 1024,
+        "retained_blocks": allocations,
+    }
+
+
+def run(repeat=20, only=None, seed=SEED):
+    """Results keyed by "<input>/<benchmark>" """
+    # Don't time anything until the model is loaded and warm
+    if not app.load_in_foreground():
+        raise RuntimeError(f"The analysis model failed to load: {app._startup['error']}")
+    results = {}
+    for input_name, text in build_corpus(seed).items():
+        for bench_name, setup in _benchmarks(text):
+            if only and bench_name not in only:
+                continue
+            # The full pipeline on the large inputs is slow; fewer runs are enough there
+            runs = max(3, repeat // 4) if bench_name in ("extract_info", "spacy_parse") else repeat
+            results[f"{input_name}/{bench_name}"] = measure(setup, runs)
+    return results
+
+
+def _time_analyzers(text, repeat):
+    """Best of repeat runs of each analyzer on text, in ms"""
+    clean_text = app.clean_resume_text(text)
+    doc = app.parse_doc(clean_text.lower(), app.required_annotations(app.ANALYZER_ANNOTATIONS))
+    timings = {}
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for name, analyzer in ANALYZERS.items():
+            # The shared views the context builds are linear; a first untimed run
+            # builds them, so that only the analyzer itself is timed
+            ctx = AnalysisContext(clean_text, app.LEXICON, doc=doc, sentence_lexicon=app.SENTENCE_LEXICON)
+            analyzer(ctx)
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                analyzer(ctx)
+                elapsed = (time.perf_counter() - start) * 1000
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return timings
+
+
+def fuzz(max_size=64000, seeds=5, repeat=5, budget_ms=None):
+    """Time every analyzer on adversarial inputs of max_size / 4, / 2 and max_size characters
+
+    Returns (results, failures). An analyzer fails on an input when its time
+    grows faster than size ** FUZZ_MAX_EXPONENT, or when it takes longer than
+    budget_ms at max_size.
+    """
+    if not app.load_in_foreground():
+        raise RuntimeError(f"The analysis model failed to load: {app._startup['error']}")
+    sizes = [max_size // 4, max_size // 2, max_size]
+    inputs = [(kind, kind, SEED) for kind in ADVERSARIAL_FRAGMENTS]
+    inputs += [(f"mixed_{seed}", "mixed", seed) for seed in range(seeds)]
+    results = {}
+    failures = []
+    for input_name, kind, seed in inputs:
+        per_size = [_time_analyzers(generate_adversarial(kind, size, seed), repeat) for size in sizes]
+        for name in ANALYZERS:
+            times = [timings[name] for timings in per_size]
+            exponent = None
+            if times[-1] >= FUZZ_MIN_MS and times[0] > 0:
+                exponent = math.log(times[-1] / times[0]) / math.log(sizes[-1] / sizes[0])
+            key = f"{input_name}/{name}"
+            results[key] = {"sizes": sizes, "ms": times, "exponent": exponent}
+            if exponent is not None and exponent > FUZZ_MAX_EXPONENT:
+                failures.append((key, f"time grows as size ** {exponent:.2f}"))
+            if budget_ms is not None and times[-1] > budget_ms:
+                failures.append((key, f"{times[-1]:.1f} ms at {max_size} characters is over the {budget_ms:.0f} ms budget"))
+    return results, failures
+
+
+def print_fuzz_report(results):
+    sizes = next(iter(results.values()))["sizes"] if results else []
+    print(f"{'input/analyzer':40} " + " ".join(f"{str(size) + ' ms':>10}" for size in sizes) + f" {'exponent':>9}")
+    for key, result in results.items():
+        exponent = "-" if result["exponent"] is None else f"{result['exponent']:.2f}"
+        print(f"{key:40} " + " ".join(f"{ms:10.2f}" for ms in result["ms"]) + f" {exponent:>9}")
+
+
+def compare(results, baseline, threshold):
+    """Benchmarks whose p50 grew by more than threshold (a fraction) over the baseline"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None or base["p50_ms"] <= 0:
+            continue
+        change = result["p50_ms"] / base["p50_ms"] - 1
+        if change > threshold:
+            regressions.append((key, base["p50_ms"], result["p50_ms"], change))
+    return regressions
+
+
+def print_report(results):
+    print(f"{'benchmark':55} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'peak KB':>9} {'blocks':>8}")
+    for key, result in results.items():
+        print(f"{key:55} {result['p50_ms']:9.3f} {result['p90_ms']:9.3f} {result['p99_ms']:9.3f} "
+              f"{result['peak_kb']:9.1f} {result['retained_blocks']:8d}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume analyzers on a synthetic corpus")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per analyzer and input")
+    parser.add_argument("--only", nargs="+", help="benchmark names to run, e.g. skills extract_info")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to the baseline file")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed p50 slowdown as a fraction of the baseline (default 0.25)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--fuzz", action="store_true",
+                        help="time the analyzers on growing adversarial inputs instead; exit with status 1 "
+                             "on super-linear growth or a blown budget")
+    parser.add_argument("--fuzz-size", type=int, default=64000, help="largest adversarial input, in characters")
+    parser.add_argument("--fuzz-seeds", type=int, default=5, help="random mixes of the adversarial fragments")
+    parser.add_argument("--fuzz-budget-ms", type=float, default=app.ANALYZER_CPU_SECONDS * 1000 / 4,
+                        help="time any analyzer may take on the largest input (default: a quarter of the "
+                             "analyzer CPU limit)")
+    args = parser.parse_args(argv)
+
+    if args.fuzz:
+        try:
+            results, failures = fuzz(max_size=args.fuzz_size, seeds=args.fuzz_seeds,
+                                     budget_ms=args.fuzz_budget_ms or None)
+        except RuntimeError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        print_fuzz_report(results)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(results, f, indent=2)
+        for key, reason in failures:
+            print(f"FUZZ FAILURE {key}: {reason}", file=sys.stderr)
+        if failures:
+            return 1
+        print(f"Every analyzer stays within size ** {FUZZ_MAX_EXPONENT} on the adversarial inputs")
+        return 0
+
+    try:
+        results = run(repeat=args.repeat, only=args.only)
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}; run with --save-baseline first", file=sys.stderr)
+            return 1
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for key, before, after, change in regressions:
+            print(f"REGRESSION {key}: p50 {before:.3f} ms -> {after:.3f} ms (+{change:.0%})", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No p50 regression above {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Content-addressed cache of parse results: an in-memory LRU over a SQLite store."""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at);
+"""
+
+# The disk tier is trimmed back to its limit once per this many writes
+_PRUNE_EVERY = 256
+
+
+def _stream_digest(stream, chunk_size=1024 * 1024):
+    start = stream.tell()
+    sha = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        sha.update(chunk)
+    stream.seek(start)
+    return sha.hexdigest()
+
+
+class ResultCache:
+    """Two-tier cache keyed by a hash of the uploaded bytes.
+
+    Keys include the analysis version, so results computed by older lexicons
+    or scoring code are never returned; rows from other versions are dropped
+    from the disk tier when it is opened. The disk tier keeps at most
+    max_disk_entries results, dropping the oldest first. Values are kept
+    serialized, so every hit returns a fresh object that callers may modify.
+    """
+
+    def __init__(self, version, max_entries=256, disk_path=None, max_disk_entries=100000):
+        self.version = version
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+        self._writes = 0
+
+        if disk_path:
+            with self._connect() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                conn.execute("DELETE FROM results WHERE version != ?", (version,))
+                self._prune(conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.disk_path, timeout=30, isolation_level=None)
+        return closing(conn)
+
+    def key(self, upload, options=None):
+        """Cache key for an upload and the options that affect the result
+
+        upload is either bytes or a seekable binary file, which is hashed in
+        chunks and rewound to where it was.
+        """
+        if isinstance(upload, (bytes, bytearray)):
+            digest = hashlib.sha256(upload).hexdigest()
+        else:
+            digest = _stream_digest(upload)
+        suffix = json.dumps(options, sort_keys=True) if options else ""
+        return hashlib.sha256(f"{self.version}:{digest}:{suffix}".encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return json.loads(value)
+
+        if self.disk_path:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                with self._lock:
+                    self._counters["disk_hits"] += 1
+                    self._remember(key, row[0])
+                return json.loads(row[0])
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, key, result):
+        value = json.dumps(result)
+        with self._lock:
+            self._remember(key, value)
+        if self.disk_path:
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % _PRUNE_EVERY == 0
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, version, value, created_at) VALUES (?, ?, ?, ?)",
+                    (key, self.version, value, time.time())
+                )
+                if prune:
+                    self._prune(conn)
+
+    def _prune(self, conn):
+        removed = conn.execute(
+            "DELETE FROM results WHERE key IN "
+            "(SELECT key FROM results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (max(0, self.max_disk_entries),)
+        ).rowcount
+        with self._lock:
+            self._counters["disk_evictions"] += removed
+
+    def _remember(self, key, value):
+        # Caller holds the lock
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        stats["max_entries"] = self.max_entries
+        if self.disk_path:
+            stats["max_disk_entries"] = self.max_disk_entries
+        stats["version"] = self.version
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,138 @@
+"""Per-request view of a resume shared by all analyzers."""
+from bisect import bisect_right
+from functools import cached_property
+
+from sections import segment_sections
+
+
+def _split_spans(text, sep):
+    """(start, end) offsets of the pieces str.split(sep) would return"""
+    spans = []
+    pos = 0
+    while True:
+        idx = text.find(sep, pos)
+        if idx == -1:
+            spans.append((pos, len(text)))
+            return spans
+        spans.append((pos, idx))
+        pos = idx + len(sep)
+
+
+class AnalysisContext:
+    """Text, spaCy doc and lazily derived views of one resume.
+
+    Each derived view (lowercased text, sentences, lines, ...) is computed the
+    first time an analyzer asks for it and reused by every analyzer after that.
+    The doc is parsed from the lowercased text unless one is passed in.
+    sentence_lexicon is the lexicon of sentence_terms. Without ner there are
+    no named entities, and looking them up does not parse the doc.
+    """
+
+    def __init__(self, text, lexicon, nlp=None, doc=None, sentence_lexicon=None, ner=True):
+        self.text = text
+        self.lexicon = lexicon
+        self.sentence_lexicon = sentence_lexicon
+        self.nlp = nlp
+        self.ner = ner
+        if doc is not None:
+            self.doc = doc
+
+    @cached_property
+    def lower(self):
+        return self.text.lower()
+
+    @cached_property
+    def doc(self):
+        return self.nlp(self.lower)
+
+    @cached_property
+    def hits(self):
+        """Lexicon hits over the lowercased text"""
+        return self.lexicon.scan(self.lower)
+
+    @cached_property
+    def sentences(self):
+        return list(self.doc.sents)
+
+    @cached_property
+    def sentence_texts(self):
+        return [sent.text for sent in self.sentences]
+
+    @cached_property
+    def sentence_texts_lower(self):
+        return [sent_text.lower() for sent_text in self.sentence_texts]
+
+    @cached_property
+    def sentence_terms(self):
+        """Which sentence_lexicon terms occur in which lowercased sentence, see Lexicon.incidence"""
+        return self.sentence_lexicon.incidence(self.sentence_texts_lower)
+
+    @cached_property
+    def lines(self):
+        return self.text.split('\n')
+
+    @cached_property
+    def lines_lower(self):
+        return self.lower.split('\n')
+
+    @cached_property
+    def line_spans(self):
+        return _split_spans(self.text, '\n')
+
+    @cached_property
+    def paragraphs(self):
+        return self.text.split('\n\n')
+
+    @cached_property
+    def paragraph_spans(self):
+        return _split_spans(self.text, '\n\n')
+
+    @cached_property
+    def sections(self):
+        """Section name -> (start, end) offsets, see sections.segment_sections"""
+        return segment_sections(self.text)
+
+    def section(self, name):
+        """Offsets of the named section, or None if the resume has no such header"""
+        return self.sections.get(name)
+
+    def _pieces_in(self, spans, start, end):
+        first = max(0, bisect_right(spans, (start,)) - 1)
+        pieces = []
+        for piece_start, piece_end in spans[first:]:
+            if piece_start >= end:
+                break
+            if piece_end < start:
+                continue
+            pieces.append(self.text[max(piece_start, start):min(piece_end, end)])
+        return pieces
+
+    def lines_in(self, start, end):
+        """Lines of the [start, end) span, without slicing out the span itself"""
+        return self._pieces_in(self.line_spans, start, end)
+
+    def paragraphs_in(self, start, end):
+        """Paragraphs of the [start, end) span, without slicing out the span itself"""
+        return self._pieces_in(self.paragraph_spans, start, end)
+
+    @cached_property
+    def paragraphs_lower(self):
+        return [para.lower() for para in self.paragraphs]
+
+    @cached_property
+    def content_words(self):
+        """Lowercased alphabetic tokens that are not stop words"""
+        return [token.text.lower() for token in self.doc if token.is_alpha and not token.is_stop]
+
+    @cached_property
+    def entities_by_label(self):
+        by_label = {}
+        if not self.ner:
+            return by_label
+        for ent in self.doc.ents:
+            by_label.setdefault(ent.label_, []).append(ent.text)
+        return by_label
+
+    def entities(self, label):
+        """Text of the named entities with the given label, in document order"""
+        return self.entities_by_label.get(label, [])
@@ -0,0 +1,250 @@
+"""Resume embeddings from the model's word vectors, stored in a memory-mapped matrix.
+
+A resume's embedding is the weighted mean of the word vectors of its skills
+(weighted by their confidence), its project titles and descriptions and the
+opening of the resume, where the summary usually is. Embeddings are unit
+length, so a dot product is their cosine similarity. Rows are appended to a
+float32 file that is memory-mapped for search: brute force by default, or an
+inverted-file index over k-means clusters once the corpus is large.
+"""
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing
+
+import numpy as np
+
+# Characters from the start of the resume that stand in for its summary
+SUMMARY_CHARS = 600
+# Relative weights of the parts of a resume embedding
+SKILL_WEIGHT = 3.0
+PROJECT_WEIGHT = 1.0
+SUMMARY_WEIGHT = 1.0
+
+_WORD = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vectors (
+    row INTEGER PRIMARY KEY,
+    parse_id TEXT NOT NULL UNIQUE,
+    filename TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def vector_width(vocab):
+    """Width of the model's static word vectors; 0 for models that ship none"""
+    return vocab.vectors.shape[1] if vocab.vectors.shape[0] else 0
+
+
+def embed_weighted_texts(vocab, weighted_texts):
+    """Unit-length weighted mean of the word vectors of (text, weight) pairs, or None"""
+    width = vector_width(vocab)
+    total = np.zeros(width, dtype=np.float32)
+    found = False
+    for text, weight in weighted_texts:
+        words = [word for word in _WORD.findall(text.lower()) if vocab.has_vector(word)]
+        if not words or weight <= 0:
+            continue
+        # Each text counts by its weight, however many words it has
+        total += weight * np.mean([vocab.get_vector(word) for word in words], axis=0)
+        found = True
+    norm = np.linalg.norm(total)
+    if not found or norm == 0:
+        return None
+    return (total / norm).astype(np.float32)
+
+
+def resume_embedding(vocab, info):
+    """Embedding of a parse result with skills_data, projects and raw_text"""
+    confidence = info["skills_data"].get("technical_confidence", {})
+    weighted = [(skill, SKILL_WEIGHT * score) for skill, score in confidence.items()]
+    for project in info["projects"]:
+        weighted.append((f"{project.get('title') or ''} {project.get('description', '')}", PROJECT_WEIGHT))
+    weighted.append((info["raw_text"][:SUMMARY_CHARS], SUMMARY_WEIGHT))
+    return embed_weighted_texts(vocab, weighted)
+
+
+def job_embedding(vocab, description, skills):
+    """Embedding of a job description; its skills weigh like a resume's confident skills"""
+    weighted = [(skill, SKILL_WEIGHT) for skill in skills]
+    weighted.append((description, SUMMARY_WEIGHT + PROJECT_WEIGHT))
+    return embed_weighted_texts(vocab, weighted)
+
+
+class _ClusterIndex:
+    """Inverted-file index: rows grouped by their nearest k-means centroid"""
+
+    def __init__(self, matrix, iterations=8, seed=0):
+        rows = len(matrix)
+        clusters = max(1, int(np.sqrt(rows)))
+        rng = np.random.default_rng(seed)
+        sample = matrix[rng.choice(rows, size=min(rows, clusters * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=clusters, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for cluster in range(clusters):
+                members = sample[assignment == cluster]
+                if len(members):
+                    centroid = members.mean(axis=0)
+                    centroids[cluster] = centroid / (np.linalg.norm(centroid) or 1)
+
+        self.centroids = centroids
+        self.rows = rows
+        assignment = np.empty(rows, dtype=np.intp)
+        for start in range(0, rows, 65536):
+            assignment[start:start + 65536] = np.argmax(matrix[start:start + 65536] @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(clusters + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(clusters)]
+
+    def candidates(self, query, probes):
+        nearest = np.argsort(-(self.centroids @ query))[:probes]
+        return np.concatenate([self.lists[cluster] for cluster in nearest])
+
+
+class VectorStore:
+    """Embeddings appended to a float32 matrix file, with their parse ids in SQLite.
+
+    With approximate_min_rows > 0, corpora of at least that many rows are
+    searched through a cluster index. Searches never build it:
+    build_cluster_index builds it up front, and a background thread rebuilds
+    it whenever the corpus has doubled, swapping the new index in when done.
+    Rows added since the last build are always searched exactly, as is every
+    row until the first index is ready.
+    """
+
+    def __init__(self, directory, width, approximate_min_rows=0, probes=8):
+        os.makedirs(directory, exist_ok=True)
+        self.matrix_path = os.path.join(directory, "vectors.f32")
+        self.db_path = os.path.join(directory, "vectors.sqlite3")
+        self.width = width
+        self.approximate_min_rows = approximate_min_rows
+        self.probes = probes
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._cluster_index = None
+        self._rebuild_thread = None
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            stored_width = conn.execute("SELECT value FROM meta WHERE key = 'width'").fetchone()
+            if stored_width is None or int(stored_width[0]) != width:
+                # New store, or vectors from another model: start over
+                conn.execute("DELETE FROM vectors")
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('width', ?)", (str(width),))
+                open(self.matrix_path, "wb").close()
+            rows = conn.execute("SELECT row, parse_id, filename FROM vectors ORDER BY row").fetchall()
+        self._parse_ids = [parse_id for _, parse_id, _ in rows]
+        self._filenames = [filename for _, _, filename in rows]
+        self._rows_by_parse_id = {parse_id: row for row, parse_id in enumerate(self._parse_ids)}
+        # Drop a partly written last row, e.g. after a crash between the two writes
+        with open(self.matrix_path, "r+b") as f:
+            f.truncate(len(rows) * width * 4)
+
+    def _connect(self):
+        return closing(sqlite3.connect(self.db_path, timeout=30, isolation_level=None))
+
+    def __len__(self):
+        return len(self._parse_ids)
+
+    def add(self, parse_id, filename, vector):
+        """Store one embedding, overwriting the row of an earlier one with the same parse_id"""
+        data = np.asarray(vector, dtype=np.float32).tobytes()
+        with self._lock:
+            row = self._rows_by_parse_id.get(parse_id)
+            with open(self.matrix_path, "r+b") as f:
+                f.seek((len(self) if row is None else row) * self.width * 4)
+                f.write(data)
+            if row is None:
+                row = len(self)
+                with self._connect() as conn:
+                    conn.execute("INSERT INTO vectors (row, parse_id, filename) VALUES (?, ?, ?)",
+                                 (row + 1, parse_id, filename))
+                self._parse_ids.append(parse_id)
+                self._filenames.append(filename)
+                self._rows_by_parse_id[parse_id] = row
+                self._schedule_rebuild()
+            # The map is reopened on the next search to see the new rows
+            self._matrix = None
+
+    def vector(self, parse_id):
+        with self._lock:
+            row = self._rows_by_parse_id.get(parse_id)
+            return None if row is None else np.array(self._current_matrix()[row])
+
+    def _current_matrix(self):
+        # Caller holds the lock
+        if self._matrix is None and len(self):
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(len(self), self.width))
+        return self._matrix
+
+    def _index_outdated(self):
+        # Caller holds the lock
+        if not self.approximate_min_rows or len(self) < self.approximate_min_rows:
+            return False
+        return self._cluster_index is None or len(self) >= 2 * self._cluster_index.rows
+
+    def _schedule_rebuild(self):
+        # Caller holds the lock
+        if self._index_outdated() and not (self._rebuild_thread and self._rebuild_thread.is_alive()):
+            self._rebuild_thread = threading.Thread(target=self._rebuild, name="cluster-index", daemon=True)
+            self._rebuild_thread.start()
+
+    def _rebuild(self):
+        try:
+            self.build_cluster_index()
+        except Exception as e:
+            print(f"Error building the cluster index: {str(e)}")
+
+    def build_cluster_index(self):
+        """Build the cluster index over the current rows and swap it in, if the corpus is large enough for one"""
+        with self._lock:
+            if not self._index_outdated():
+                return
+            matrix = self._current_matrix()
+        # Built outside the lock, so searches and additions carry on meanwhile
+        index = _ClusterIndex(matrix)
+        with self._lock:
+            if self._cluster_index is None or index.rows > self._cluster_index.rows:
+                self._cluster_index = index
+
+    def search(self, query, top=10, exclude=None, exact=False):
+        """The top most similar rows to a unit-length query: (parse_id, filename, score) tuples"""
+        with self._lock:
+            matrix = self._current_matrix()
+            if matrix is None:
+                return []
+            rows = len(matrix)
+            candidates = None
+            index = self._cluster_index
+            if not exact and index is not None:
+                # Rows added since the index was built are searched exhaustively
+                candidates = np.concatenate([index.candidates(query, self.probes),
+                                             np.arange(index.rows, rows)])
+            parse_ids = self._parse_ids
+            filenames = self._filenames
+            excluded_row = self._rows_by_parse_id.get(exclude, -1)
+
+        if candidates is None:
+            candidates = np.arange(rows)
+            scores = matrix @ query
+        else:
+            # Sorted rows read the memory map front to back
+            candidates = np.sort(candidates)
+            scores = matrix[candidates] @ query
+        scores[candidates == excluded_row] = -np.inf
+
+        k = min(top, len(scores))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(parse_ids[candidates[i]], filenames[candidates[i]], float(scores[i]))
+                for i in best if np.isfinite(scores[i])]
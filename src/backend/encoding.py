@@ -0,0 +1,83 @@
+"""Response encoding: a faster JSON encoder, MessagePack and compression.
+
+orjson is in requirements.txt; msgpack and brotli are optional
+(requirements-optional.txt). Without orjson, JSON is written by the standard
+library encoder as before; without msgpack or brotli, those encodings are
+simply not offered.
+"""
+import gzip
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack")
+# Types worth compressing; everything else (e.g. event streams) is sent as is
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/plain", "text/html"} | set(MSGPACK_MIMETYPES)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, writing with orjson when it is installed
+
+    The output is the same JSON, except that non-ASCII characters are written
+    as UTF-8 instead of \\u escapes. Values orjson has no native encoding for
+    (dates, dataclasses, decimals) go through Flask's default() as before, and
+    anything orjson refuses, such as integers beyond 64 bits, falls back to the
+    standard library encoder.
+    """
+
+    def dumps(self, obj, **kwargs):
+        # orjson always writes compact JSON; pretty-printing (debug mode) and other
+        # explicit arguments keep the standard encoder
+        if orjson is None or any(key != "separators" or value != (",", ":") for key, value in kwargs.items()):
+            return super().dumps(obj, **kwargs)
+        option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+                  | orjson.OPT_PASSTHROUGH_DATACLASS)
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode("utf-8")
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+
+def msgpack_available():
+    return msgpack is not None
+
+
+def _msgpack_default(obj):
+    # NumPy scalars and arrays
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} cannot be packed")
+
+
+def pack_msgpack(obj):
+    return msgpack.packb(obj, default=_msgpack_default, use_bin_type=True)
+
+
+def available_encodings():
+    """Content codings this process can produce, most compact first"""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def compress(data, coding, level):
+    """data compressed with a coding from available_encodings; level runs from 1 (fastest) to 9"""
+    if coding == "br":
+        # Brotli qualities run from 0 to 11
+        return brotli.compress(data, quality=min(11, level + 1))
+    # mtime=0 keeps the output of equal bodies equal
+    return gzip.compress(data, compresslevel=level, mtime=0)
@@ -0,0 +1,321 @@
+"""Text extraction from uploaded PDF and DOCX resumes.
+
+Extractors are registered per MIME type and tier: "fast" skips the costly
+parts of layout analysis, "accurate" runs all of it, and "thorough" (PDF only)
+also reads vertical text and text inside figures. A fast extraction that
+yields too little text is retried with the accurate tier. Run
+
+    python extraction.py compare resume1.pdf resume2.docx ...
+
+to compare the throughput and text agreement of the tiers on real files.
+"""
+import argparse
+import contextlib
+import difflib
+import html
+import io
+import os
+import re
+import sys
+import time
+import zipfile
+
+import docx2txt
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+
+from metrics import EXTRACTION_ERRORS
+from workers import submit_to_workers, worker_count
+
+PDF_MIME_TYPE = "application/pdf"
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+EXTENSION_MIME_TYPES = {".pdf": PDF_MIME_TYPE, ".docx": DOCX_MIME_TYPE}
+
+TIERS = ("fast", "accurate", "thorough")
+DEFAULT_TIER = os.environ.get("RESUME_EXTRACTION_TIER", "accurate")
+
+# Less text than this is treated as a failed extraction
+MIN_TEXT_LENGTH = 100
+
+# Resumes longer than this are almost always scans or attachments; 0 means no limit
+PDF_MAX_PAGES = int(os.environ.get("RESUME_PDF_MAX_PAGES", "10"))
+# PDFs with at least this many pages are split across the worker pool, if one is running
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("RESUME_PDF_PARALLEL_MIN_PAGES", "4"))
+
+# pdfminer layout settings per tier. boxes_flow=None skips ordering text boxes
+# into a hierarchy, the most expensive step, but still groups characters into lines.
+# The accurate tier keeps pdfminer's defaults. The thorough tier also reads vertical
+# text and text inside figures, which adds text and changes its order, so it is opt-in.
+PDF_LAYOUT_PARAMS = {
+    "fast": {"boxes_flow": None},
+    "accurate": {},
+    "thorough": {"detect_vertical": True, "all_texts": True},
+}
+
+_EXTRACTORS = {}
+
+
+def register_extractor(mime_type, tier):
+    """Decorator registering fn(source) -> {"text": ..., ...} for a MIME type and tier
+
+    The source is bytes, a file path or a binary file object; see _open_source.
+    """
+    def decorator(fn):
+        _EXTRACTORS[(mime_type, tier)] = fn
+        return fn
+    return decorator
+
+
+def get_extractor(mime_type, tier):
+    return _EXTRACTORS.get((mime_type, tier))
+
+
+def mime_type_for(filename, content_type=None):
+    """MIME type of an upload, from its extension or else its declared content type"""
+    mime_type = EXTENSION_MIME_TYPES.get(os.path.splitext(filename.lower())[1])
+    if mime_type is None and any(key[0] == content_type for key in _EXTRACTORS):
+        mime_type = content_type
+    return mime_type
+
+
+def normalize_layout(text):
+    """Tidy extracted text while keeping the line and paragraph structure"""
+    text = text.replace('\r\n', '\n').replace('\r', '\n').replace('\f', '\n')
+    text = re.sub(r'[^\S\n]+', ' ', text)  # Collapse runs of spaces and tabs within a line
+    text = re.sub(r' ?\n ?', '\n', text)  # Trim spaces around line breaks
+    text = re.sub(r'\n{3,}', '\n\n', text)  # Preserve paragraph breaks
+    return text.strip()
+
+
+@contextlib.contextmanager
+def _open_source(source):
+    """A seekable binary file at the start of source: bytes, a path or a file object
+
+    A file object, such as a spooled upload, is rewound and used as is rather
+    than read into memory, and is left open for the caller.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        yield io.BytesIO(source)
+    elif isinstance(source, str):
+        with open(source, 'rb') as f:
+            yield f
+    else:
+        source.seek(0)
+        yield source
+
+
+def _extract_pdf_pages(source, page_numbers=None, max_pages=0, tier="accurate"):
+    """Extract the given pages of a PDF, returning (page number, text, seconds) per page"""
+    selected = sorted(page_numbers) if page_numbers else None
+    if selected and not max_pages:
+        # Stop reading the page tree after the last selected page
+        max_pages = selected[-1] + 1
+
+    resource_manager = PDFResourceManager(caching=True)
+    pages = []
+    with _open_source(source) as pdf:
+        for index, page in enumerate(PDFPage.get_pages(pdf, selected, maxpages=max_pages)):
+            start = time.perf_counter()
+            output = io.StringIO()
+            device = TextConverter(resource_manager, output, laparams=LAParams(**PDF_LAYOUT_PARAMS[tier]))
+            PDFPageInterpreter(resource_manager, device).process_page(page)
+            device.close()
+            pages.append((selected[index] if selected else index, output.getvalue(), time.perf_counter() - start))
+    return pages
+
+
+def count_pdf_pages(source):
+    with _open_source(source) as pdf:
+        return sum(1 for _ in PDFPage.get_pages(pdf))
+
+
+def extract_pdf(pdf_file, max_pages=None, tier="accurate"):
+    """Extract a PDF page by page, in parallel on the worker pool for long documents
+
+    Returns a dict with the normalized text, the document's page count, the
+    number of pages extracted and the extraction time of each page in ms.
+    """
+    if max_pages is None:
+        max_pages = PDF_MAX_PAGES
+    page_count = count_pdf_pages(pdf_file)
+    pages_to_extract = min(page_count, max_pages) if max_pages else page_count
+
+    workers = worker_count()
+    if workers > 1 and pages_to_extract >= PDF_PARALLEL_MIN_PAGES:
+        # Contiguous page ranges, one per worker, reassembled in page order
+        chunk_size = -(-pages_to_extract // workers)
+        # Workers need the document itself, so only this path reads it into memory
+        with _open_source(pdf_file) as pdf:
+            data = pdf.read()
+        futures = [
+            submit_to_workers(_extract_pdf_pages, data,
+                              list(range(first, min(first + chunk_size, pages_to_extract))), tier=tier)
+            for first in range(0, pages_to_extract, chunk_size)
+        ]
+        pages = [page for future in futures for page in future.result()]
+    else:
+        pages = _extract_pdf_pages(pdf_file, max_pages=pages_to_extract, tier=tier)
+
+    return {
+        "text": normalize_layout(''.join(text for _, text, _ in pages)),
+        "page_count": page_count,
+        "pages_extracted": len(pages),
+        "page_timings_ms": [round(seconds * 1000, 1) for _, _, seconds in pages]
+    }
+
+
+@register_extractor(PDF_MIME_TYPE, "fast")
+def extract_pdf_fast(source):
+    return extract_pdf(source, tier="fast")
+
+
+@register_extractor(PDF_MIME_TYPE, "accurate")
+def extract_pdf_accurate(source):
+    return extract_pdf(source, tier="accurate")
+
+
+@register_extractor(PDF_MIME_TYPE, "thorough")
+def extract_pdf_thorough(source):
+    return extract_pdf(source, tier="thorough")
+
+
+_DOCX_PARAGRAPH_END = re.compile(r'</w:p>|<w:br[^>]*/>|<w:cr/>')
+_DOCX_TAB = re.compile(r'<w:tab/>')
+_XML_TAG = re.compile(r'<[^>]+>')
+
+
+@register_extractor(DOCX_MIME_TYPE, "fast")
+def extract_docx_fast(source):
+    """Body text only: no headers, footers or text boxes outside the main story"""
+    with _open_source(source) as f, zipfile.ZipFile(f) as docx:
+        xml = docx.read('word/document.xml').decode('utf-8')
+    xml = _DOCX_TAB.sub('\t', _DOCX_PARAGRAPH_END.sub('\n', xml))
+    return {"text": normalize_layout(html.unescape(_XML_TAG.sub('', xml)))}
+
+
+@register_extractor(DOCX_MIME_TYPE, "accurate")
+def extract_docx_accurate(source):
+    with _open_source(source) as f:
+        return {"text": normalize_layout(docx2txt.process(f))}
+
+
+def _run_extractor(mime_type, tier, source):
+    extractor = get_extractor(mime_type, tier)
+    try:
+        document = extractor(source)
+    except Exception as e:
+        print(f"Error extracting text from {mime_type} ({tier}): {e}")
+        EXTRACTION_ERRORS.inc(extractor=extractor.__name__, reason="exception")
+        return {"text": ""}
+    if len(document["text"]) < MIN_TEXT_LENGTH:
+        EXTRACTION_ERRORS.inc(extractor=extractor.__name__, reason="insufficient_text")
+    return document
+
+
+def extract_document(filename, fileobj, tier=None, content_type=None):
+    """Extract text and extraction details from an uploaded file
+
+    Returns None if no extractor handles the file type; the text is empty if
+    the file could not be read. When a fast extraction yields less than
+    MIN_TEXT_LENGTH characters, the accurate tier is tried as well.
+    """
+    mime_type = mime_type_for(filename, content_type)
+    if mime_type is None:
+        return None
+    tier = tier or DEFAULT_TIER
+    if get_extractor(mime_type, tier) is None:
+        tier = "accurate"
+
+    # Extractors read the upload in place, rewinding it for the fallback
+    document = _run_extractor(mime_type, tier, fileobj)
+    document["tier"] = tier
+
+    if len(document["text"]) < MIN_TEXT_LENGTH and tier != "accurate" and get_extractor(mime_type, "accurate"):
+        document = _run_extractor(mime_type, "accurate", fileobj)
+        document["tier"] = "accurate"
+        document["fallback_from"] = tier
+
+    document["mime_type"] = mime_type
+    return document
+
+
+def extract_text_from_pdf(pdf_file):
+    """Extract text from PDF with improved handling of formatting"""
+    return extract_document("resume.pdf", pdf_file)["text"]
+
+
+def extract_text_from_docx(docx_file):
+    """Extract text from DOCX with improved handling of formatting"""
+    return extract_document("resume.docx", docx_file)["text"]
+
+
+def extract_text_from_file(filename, fileobj, tier=None):
+    """Extract text from a PDF or DOCX file object; None if the format is unsupported"""
+    document = extract_document(filename, fileobj, tier=tier)
+    return None if document is None else document["text"]
+
+
+def _tokens(text):
+    return re.findall(r'\w+', text.lower())
+
+
+def compare_tiers(filename, data, repeat=3):
+    """Time every tier on one file and measure how much its text agrees with the accurate tier"""
+    mime_type = mime_type_for(filename)
+    results = {}
+    for tier in TIERS:
+        if get_extractor(mime_type, tier) is None:
+            continue
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text = _run_extractor(mime_type, tier, data)["text"]
+            timings.append(time.perf_counter() - start)
+        results[tier] = {"seconds": min(timings), "text": text}
+
+    reference = _tokens(results["accurate"]["text"]) if "accurate" in results else []
+    for tier, result in results.items():
+        tokens = _tokens(result.pop("text"))
+        result["words"] = len(tokens)
+        result["mb_per_second"] = len(data) / result["seconds"] / 1e6 if result["seconds"] else 0.0
+        # Word sequence similarity (order-sensitive) and vocabulary overlap
+        result["sequence_agreement"] = difflib.SequenceMatcher(None, tokens, reference, autojunk=False).ratio() if reference else 0.0
+        vocabulary, reference_vocabulary = set(tokens), set(reference)
+        union = vocabulary | reference_vocabulary
+        result["vocabulary_agreement"] = len(vocabulary & reference_vocabulary) / len(union) if union else 1.0
+    return results
+
+
+def _compare_main(paths, repeat):
+    totals = {}
+    print(f"{'file':40} {'tier':9} {'ms':>9} {'MB/s':>7} {'seq':>6} {'vocab':>6}")
+    for path in paths:
+        if mime_type_for(path) is None:
+            print(f"{path}: unsupported file type", file=sys.stderr)
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        for tier, result in compare_tiers(path, data, repeat).items():
+            print(f"{os.path.basename(path)[:40]:40} {tier:9} {result['seconds'] * 1000:9.1f} "
+                  f"{result['mb_per_second']:7.2f} {result['sequence_agreement']:6.3f} {result['vocabulary_agreement']:6.3f}")
+            total = totals.setdefault(tier, {"seconds": 0.0, "files": 0, "sequence_agreement": 0.0})
+            total["seconds"] += result["seconds"]
+            total["files"] += 1
+            total["sequence_agreement"] += result["sequence_agreement"]
+
+    for tier, total in totals.items():
+        print(f"{tier}: {total['files']} files in {total['seconds']:.2f}s "
+              f"({total['files'] / total['seconds'] if total['seconds'] else 0:.1f} files/s), "
+              f"mean agreement with accurate {total['sequence_agreement'] / total['files']:.3f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Resume text extraction tools")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    compare = subcommands.add_parser("compare", help="compare extraction tiers on sample files")
+    compare.add_argument("files", nargs="+")
+    compare.add_argument("--repeat", type=int, default=3, help="runs per file and tier; the fastest is kept")
+    args = parser.parse_args()
+    _compare_main(args.files, args.repeat)
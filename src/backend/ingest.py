@@ -0,0 +1,263 @@
+"""Bulk ingestion of a directory or .zip archive of resumes into a JSONL file.
+
+    python ingest.py resumes/ -o resumes.jsonl
+    python -m ingest resumes.zip -o resumes.jsonl --workers 16 --compact
+
+Files are extracted and analyzed on a pool of worker processes forked from the
+loaded, warm process, as with RESUME_WORKERS. Every file becomes one line of
+the output, with its result or its error. A checkpoint file next to the output
+records each finished file together with the size of the output after its
+line, so a run that stops halfway, however it stops, is resumed by running the
+same command again: the output is cut back to the last checkpointed line and
+the files already done are skipped.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import app
+from extraction import MIN_TEXT_LENGTH, TIERS, extract_text_from_file, mime_type_for
+from workers import submit_to_workers, worker_pool_running
+
+
+def _supported(name):
+    return (not os.path.basename(name).startswith('.') and not name.startswith('__MACOSX/')
+            and mime_type_for(name) is not None)
+
+
+def list_sources(path):
+    """Sorted names of the PDF and DOCX files under a directory or in a .zip archive"""
+    if not os.path.isdir(path):
+        with zipfile.ZipFile(path) as archive:
+            return sorted(member.filename for member in archive.infolist()
+                          if not member.is_dir() and _supported(member.filename))
+    names = []
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [name for name in dirs if not name.startswith('.')]
+        names.extend(os.path.relpath(os.path.join(root, filename), path) for filename in files if _supported(filename))
+    return sorted(names)
+
+
+def iter_sources(path, names):
+    """(name, source) for the given names; the source is a file path, read by the worker, or an archive member's bytes"""
+    if not os.path.isdir(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in names:
+                yield name, archive.read(name)
+        return
+    for name in names:
+        yield name, os.path.join(path, name)
+
+
+def analyze_file(name, source, use_ner, tier, fields, compact):
+    """Extract and analyze one resume into its output record; runs in a worker process"""
+    record = {"file": name}
+    try:
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                data = f.read()
+        else:
+            data = source
+        # The parse_id /api/parse-resume would give the same upload
+        record["parse_id"] = app.result_cache.key(data, app.parse_options(use_ner, tier, fields))
+        text = extract_text_from_file(name, io.BytesIO(data), tier=tier)
+        if text is None:
+            record["error"] = "Unsupported file format. Please upload a PDF or DOCX file."
+        elif len(text) < MIN_TEXT_LENGTH:
+            record["error"] = "Could not extract sufficient text from the file. Please check if the file is valid."
+        else:
+            info = app.extract_info(text, use_ner=use_ner, fields=fields)
+            record["result"] = app.apply_view(info, "compact" if compact else "full")
+    except Exception as e:
+        record["error"] = f"Error processing resume: {str(e)}"
+    return record
+
+
+class Checkpoint:
+    """Files already written to the output, and the output size after each one's line"""
+
+    def __init__(self, path, output_path):
+        self.path = path
+        self.done = set()
+        self.offset = 0
+        kept = []
+        if os.path.exists(path):
+            output_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    # A line cut short by a crash is not a checkpoint
+                    if not line.endswith("\n"):
+                        break
+                    offset, name = line[:-1].split("\t", 1)
+                    # Nor is one whose output line never reached the disk
+                    if int(offset) > output_size:
+                        break
+                    self.offset = int(offset)
+                    self.done.add(name)
+                    kept.append(line)
+        elif os.path.exists(output_path) and os.path.getsize(output_path):
+            raise RuntimeError(f"{output_path} exists but has no checkpoint; "
+                               f"choose another output file or remove it")
+        # Rewritten with the kept entries only, so the dropped ones cannot come back
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            f.writelines(kept)
+        os.replace(path + ".tmp", path)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def record(self, offset, name):
+        self._file.write(f"{offset}\t{name}\n")
+        self._file.flush()
+        self.done.add(name)
+
+    def sync(self):
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class Progress:
+    """Throughput, error counts and ETA, printed every interval seconds"""
+
+    def __init__(self, total, skipped, interval):
+        self.total = total
+        self.skipped = skipped
+        self.interval = interval
+        self.done = 0
+        self.errors = 0
+        self.degraded = 0
+        self.start = time.perf_counter()
+        self._last_report = self.start
+
+    def add(self, record):
+        self.done += 1
+        if "error" in record:
+            self.errors += 1
+        elif "degraded" in record["result"]:
+            self.degraded += 1
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+            return True
+        return False
+
+    def report(self, final=False):
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        remaining = self.total - self.skipped - self.done
+        line = (f"{self.skipped + self.done}/{self.total} files, {rate:.1f} files/s, "
+                f"{self.errors} errors, {self.degraded} degraded")
+        if final:
+            line += f", {self.done} processed in {_format_duration(elapsed)}"
+        elif rate:
+            line += f", ETA {_format_duration(remaining / rate)}"
+        print(line, file=sys.stderr, flush=True)
+
+
+def ingest(path, output_path, checkpoint_path=None, workers=None, use_ner=None, tier=None, fields=None,
+           compact=False, progress_seconds=5.0):
+    """Analyze every resume under path into output_path; returns the Progress of this run"""
+    workers = workers or os.cpu_count() or 1
+    # Loaded in this thread, so that the pool is forked while no other thread runs
+    if not app.load_in_foreground(workers if workers > 1 else 0):
+        raise RuntimeError(f"The analysis model failed to load: {app._startup['error']}")
+
+    checkpoint = Checkpoint(checkpoint_path or output_path + ".checkpoint", output_path)
+    names = list_sources(path)
+    todo = [name for name in names if name not in checkpoint.done]
+    with open(output_path, 'r+b' if os.path.exists(output_path) else 'wb') as output:
+        # Drop anything written after the last checkpoint: its file is done again
+        output.truncate(checkpoint.offset)
+        output.seek(checkpoint.offset)
+        progress = Progress(len(names), len(names) - len(todo), progress_seconds)
+        if len(todo) < len(names):
+            print(f"Resuming: {len(names) - len(todo)} of {len(names)} files already done", file=sys.stderr)
+
+        def write(record):
+            output.write(app.app.json.dumps(record).encode('utf-8') + b"\n")
+            output.flush()
+            checkpoint.record(output.tell(), record["file"])
+            if "result" in record and app.indexing_enabled():
+                app.index_result(record["parse_id"], record["file"], record["result"])
+            if progress.add(record):
+                os.fsync(output.fileno())
+                checkpoint.sync()
+
+        # Enough queued work to keep every worker busy, without reading the whole archive into memory
+        max_pending = workers * 4
+        pending = set()
+        try:
+            for name, source in iter_sources(path, todo):
+                if not worker_pool_running():
+                    write(analyze_file(name, source, use_ner, tier, fields, compact))
+                    continue
+                if len(pending) >= max_pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        write(future.result())
+                pending.add(submit_to_workers(analyze_file, name, source, use_ner, tier, fields, compact))
+            for future in pending:
+                write(future.result())
+        finally:
+            os.fsync(output.fileno())
+            checkpoint.sync()
+            checkpoint.close()
+    progress.report(final=True)
+    return progress
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze a directory or .zip archive of PDF and DOCX resumes into JSONL")
+    parser.add_argument("path", help="directory (searched recursively) or .zip archive")
+    parser.add_argument("-o", "--output", default="resumes.jsonl", help="JSONL file to append results to")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: the output path plus .checkpoint)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="analysis processes (default: one per core; 1 analyzes in this process)")
+    parser.add_argument("--tier", choices=TIERS, help="text extraction tier")
+    parser.add_argument("--no-ner", action="store_true", help="skip named entity recognition")
+    parser.add_argument("--fields", help="comma-separated fields to compute, as for /api/parse-resume")
+    parser.add_argument("--compact", action="store_true", help="leave raw_text out of the results")
+    parser.add_argument("--progress-seconds", type=float, default=5.0, help="seconds between progress lines")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} does not exist")
+    fields = [field.strip() for field in args.fields.split(',') if field.strip()] if args.fields else None
+    try:
+        app.resolve_fields(fields)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        ingest(args.path, args.output, checkpoint_path=args.checkpoint, workers=args.workers,
+               use_ner=False if args.no_ner else None, tier=args.tier, fields=fields,
+               compact=args.compact, progress_seconds=args.progress_seconds)
+    except BrokenProcessPool:
+        print("A worker process died, e.g. out of memory; run the same command again to resume", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume", file=sys.stderr)
+        return 130
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
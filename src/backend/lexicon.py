@@ -0,0 +1,174 @@
+"""Compiled multi-term matcher shared by the resume analyzers.
+
+All lexicon terms are folded into a single trie-shaped regular expression that
+is compiled once. Scanning a document is then one pass of ``finditer`` instead
+of one ``re.search``/``re.findall`` per term.
+"""
+import re
+from collections import defaultdict
+
+import numpy as np
+
+# Joins the texts of an incidence scan; no term contains it, and as a non-word
+# character it keeps the \b assertions at each text's ends as they were
+_TEXT_SEPARATOR = '\0'
+
+
+def _is_word_char(ch):
+    # Mirrors the definition of \w used by the re module for str patterns
+    return ch.isalnum() or ch == '_'
+
+
+def _is_boundary(text, idx):
+    """Return True if a regex \\b assertion would hold at text[idx]"""
+    before = idx > 0 and _is_word_char(text[idx - 1])
+    after = idx < len(text) and _is_word_char(text[idx])
+    return before != after
+
+
+def _build_trie(terms):
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[''] = term
+    return trie
+
+
+def _trie_to_regex(node):
+    """Turn a character trie into a regex that prefers the longest term"""
+    alternatives = [re.escape(ch) + _trie_to_regex(child)
+                    for ch, child in sorted(node.items()) if ch != '']
+    if not alternatives:
+        return ''
+    terminal = '' in node
+    if len(alternatives) == 1 and not terminal:
+        return alternatives[0]
+    group = '(?:' + '|'.join(alternatives) + ')'
+    # Greedy optional group: try the longer terms first, backtrack to this one
+    return group + '?' if terminal else group
+
+
+class LexiconHits:
+    """Offsets of every lexicon term found in a single scan of a text"""
+
+    def __init__(self, offsets):
+        self._offsets = offsets
+
+    def __contains__(self, term):
+        return term in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def offsets(self, term):
+        """Start offsets of every occurrence of term, in document order"""
+        return self._offsets.get(term, [])
+
+    def count(self, term):
+        """Number of non-overlapping occurrences, the same as len(re.findall(...))"""
+        count = 0
+        last_end = -1
+        for start in self._offsets.get(term, []):
+            if start >= last_end:
+                count += 1
+                last_end = start + len(term)
+        return count
+
+    def found(self, terms):
+        """Terms from the given list that were seen, in the order of the list"""
+        return [term for term in terms if term in self._offsets]
+
+    def within(self, start, end):
+        """Hits restricted to the [start, end) span of the scanned text"""
+        offsets = {}
+        for term, starts in self._offsets.items():
+            inside = [s for s in starts if s >= start and s + len(term) <= end]
+            if inside:
+                offsets[term] = inside
+        return LexiconHits(offsets)
+
+
+class TermIncidence:
+    """Which terms occur in which texts, as a boolean texts x terms matrix"""
+
+    def __init__(self, matrix, terms):
+        self.matrix = matrix
+        self.terms = terms
+        self._columns = {term: col for col, term in enumerate(terms)}
+
+    def columns(self, terms):
+        """Column indices of the given terms, in the order given"""
+        return np.array([self._columns[term] for term in terms], dtype=np.intp)
+
+    def any_of(self, terms):
+        """Per text, whether any of the given terms occurs in it"""
+        return self.matrix[:, self.columns(terms)].any(axis=1)
+
+
+class Lexicon:
+    """A set of terms compiled into one pattern for single-pass matching.
+
+    With word_boundaries=True a term matches exactly where
+    re.search(r'\\b' + re.escape(term) + r'\\b', text) would; otherwise it
+    matches wherever ``term in text`` would.
+    """
+
+    def __init__(self, terms, word_boundaries=True):
+        self.terms = list(dict.fromkeys(term for term in terms if term))
+        self.word_boundaries = word_boundaries
+
+        body = _trie_to_regex(_build_trie(self.terms))
+        if word_boundaries:
+            pattern = r'\b(?=(' + body + r')\b)'
+        else:
+            pattern = r'(?=(' + body + r'))'
+        self._pattern = re.compile(pattern)
+
+        # For every term, the shorter terms that are also its prefixes. The
+        # regex only reports the longest term at each position, so these are
+        # checked separately.
+        term_set = set(self.terms)
+        self._prefixes = {
+            term: [term[:i] for i in range(len(term) - 1, 0, -1) if term[:i] in term_set]
+            for term in self.terms
+        }
+
+    def scan(self, text):
+        """Find every occurrence of every term in one pass over text"""
+        offsets = defaultdict(list)
+        if not self.terms:
+            return LexiconHits({})
+
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            longest = match.group(1)
+            offsets[longest].append(start)
+            for prefix in self._prefixes[longest]:
+                if not self.word_boundaries or _is_boundary(text, start + len(prefix)):
+                    offsets[prefix].append(start)
+
+        return LexiconHits(dict(offsets))
+
+    def incidence(self, texts):
+        """Which terms occur in which of the texts, from a single scan of them all
+
+        Row i, column j of the matrix is True where scan(texts[i]) would find
+        self.terms[j].
+        """
+        incidence = TermIncidence(np.zeros((len(texts), len(self.terms)), dtype=bool), self.terms)
+        if not texts:
+            return incidence
+
+        # Offset at which each text starts in the joined string
+        text_starts = np.cumsum([0] + [len(text) + 1 for text in texts[:-1]])
+        hits = self.scan(_TEXT_SEPARATOR.join(texts))
+        terms = list(hits)
+        offsets = np.fromiter((start for term in terms for start in hits.offsets(term)), dtype=np.intp)
+        columns = np.repeat(incidence.columns(terms), [len(hits.offsets(term)) for term in terms])
+        incidence.matrix[np.searchsorted(text_starts, offsets, side='right') - 1, columns] = True
+        return incidence
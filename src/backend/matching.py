@@ -0,0 +1,100 @@
+"""Scoring one resume against many job descriptions by their skills."""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Resume skills detected with at least this confidence count fully towards a match;
+# below it they count in proportion (see analyze_skills for the confidence values)
+FULL_MATCH_CONFIDENCE = 0.7
+
+
+class JobSkillCache:
+    """Skills found in job descriptions, keyed by a hash of the description text.
+
+    Skills are found with the same lexicon scan analyze_skills uses and stored
+    as column indices into the skill list, ready for vectorized scoring.
+    """
+
+    def __init__(self, lexicon, skills, max_entries=10000):
+        self.lexicon = lexicon
+        # Skill lists may name a skill twice; each one gets a single column
+        self.skills = list(dict.fromkeys(skills))
+        self.skill_index = {skill: i for i, skill in enumerate(self.skills)}
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+
+    def columns(self, description):
+        """Sorted skill indices found in a job description"""
+        key = hashlib.sha256(description.encode('utf-8')).hexdigest()
+        with self._lock:
+            columns = self._entries.get(key)
+            if columns is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return columns
+
+        found = self.lexicon.scan(description.lower()).found(self.skills)
+        columns = np.array(sorted(self.skill_index[skill] for skill in found), dtype=np.intp)
+        with self._lock:
+            self._counters["misses"] += 1
+            self._entries[key] = columns
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return columns
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        return stats
+
+
+def skill_weights(skills_data, skill_index):
+    """Resume skill vector: each detected technical skill weighted by its confidence"""
+    weights = np.zeros(len(skill_index), dtype=np.float64)
+    for skill, confidence in skills_data.get("technical_confidence", {}).items():
+        column = skill_index.get(skill)
+        if column is not None:
+            weights[column] = min(1.0, confidence / FULL_MATCH_CONFIDENCE)
+    return weights
+
+
+def match_jobs(skills_data, descriptions, cache, top=None):
+    """Score a resume's skills against every job description, best matches first
+
+    A job's match percentage is the confidence-weighted share of its skills the
+    resume has. Returns one dict per job (at most top) with its input index,
+    match_percentage, matching_skills, missing_skills and job_skills.
+    """
+    columns = [cache.columns(description) for description in descriptions]
+    if not columns:
+        return []
+    weights = skill_weights(skills_data, cache.skill_index)
+
+    # All jobs in one pass: sum the resume weights of each job's skills
+    counts = np.array([len(job_columns) for job_columns in columns])
+    rows = np.repeat(np.arange(len(columns)), counts)
+    flat_columns = np.concatenate(columns)
+    scores = np.bincount(rows, weights=weights[flat_columns], minlength=len(columns))
+    percentages = np.round(100 * scores / np.maximum(counts, 1))
+
+    order = np.argsort(-percentages, kind="stable")
+    if top is not None:
+        order = order[:top]
+
+    results = []
+    for i in order:
+        job_skills = [cache.skills[column] for column in columns[i]]
+        results.append({
+            "index": int(i),
+            "match_percentage": int(percentages[i]),
+            "matching_skills": [cache.skills[column] for column in columns[i] if weights[column] > 0],
+            "missing_skills": [cache.skills[column] for column in columns[i] if weights[column] == 0],
+            "job_skills": job_skills
+        })
+    return results
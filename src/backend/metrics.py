@@ -0,0 +1,199 @@
+"""Request stage timings and process-wide metrics in the Prometheus text format."""
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds, from a fast analyzer up to a slow PDF extraction
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry = []
+
+
+def _label_text(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items):
+        return [f"{self.name}{_label_text(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # One count per bucket, then +Inf, then the sum
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def _render_samples(self, items):
+        lines = []
+        for key, counts in items:
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, [('le', f'{bound:g}')])} {count}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, [('le', '+Inf')])} {counts[-2]}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {counts[-1]}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {counts[-2]}")
+        return lines
+
+
+def render_metrics():
+    """All registered metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_SECONDS = Histogram("resume_stage_seconds", "Time spent in each stage of parsing a resume", ["stage"])
+REQUEST_SECONDS = Histogram("resume_request_seconds", "Request latency by endpoint", ["endpoint"])
+REQUESTS = Counter("resume_requests_total", "Requests by endpoint and response status", ["endpoint", "status"])
+IN_FLIGHT = Gauge("resume_requests_in_flight", "Requests currently being handled", ["endpoint"])
+EXTRACTION_ERRORS = Counter("resume_extraction_errors_total", "Text extraction failures by extractor and reason",
+                            ["extractor", "reason"])
+
+
+class StageTimer:
+    """Ordered (stage, seconds) timings of one request"""
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def extend(self, stages):
+        self.stages.extend(stages)
+
+    def server_timing(self):
+        """Value of a Server-Timing header, durations in ms; repeated stages are summed"""
+        totals = {}
+        for name, seconds in self.stages:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
+
+
+_local = threading.local()
+
+
+def start_stages():
+    """Start timing stages in this thread and return the timer"""
+    _local.timer = StageTimer()
+    return _local.timer
+
+
+def current_timer():
+    return getattr(_local, "timer", None)
+
+
+def stop_stages():
+    timer = current_timer()
+    _local.timer = None
+    return timer
+
+
+@contextmanager
+def timed_stage(name):
+    """Time the block as a stage of the current thread's timer, if one was started"""
+    timer = current_timer()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def call_with_stages(fn, *args, **kwargs):
+    """Call fn with stage timing on and return (result, stages)
+
+    For work handed to another process, whose stages are merged back into
+    the caller's timer.
+    """
+    previous = current_timer()
+    timer = start_stages()
+    try:
+        return fn(*args, **kwargs), timer.stages
+    finally:
+        _local.timer = previous
+
+
+def iter_with_stages(fn, *args, **kwargs):
+    """Iterate fn(*args, **kwargs) with stage timing on, as call_with_stages calls fn
+
+    Yields ("item", item) for each item of fn, then ("stages", stages).
+    """
+    previous = current_timer()
+    timer = start_stages()
+    try:
+        for item in fn(*args, **kwargs):
+            # The caller's timer is back while the caller has control
+            _local.timer = previous
+            yield "item", item
+            _local.timer = timer
+    finally:
+        _local.timer = previous
+    yield "stages", timer.stages
@@ -0,0 +1,152 @@
+"""On-demand profiling of a single request.
+
+Two modes: "sample" records the stack of the profiled thread every few
+milliseconds from a background thread, which barely slows the request down;
+"trace" also runs cProfile for exact call counts, at the cost of a much
+slower run. Both produce collapsed stacks ("frame;frame;frame count" lines,
+the input format of flamegraph.pl and speedscope) and a top-N function table.
+Nothing here runs unless a request asks for a profile.
+"""
+import cProfile
+import hmac
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_MODES = ("sample", "trace")
+# Profiling is refused unless a token is configured and the request presents it
+PROFILE_TOKEN = os.environ.get("RESUME_PROFILE_TOKEN", "")
+SAMPLE_INTERVAL = float(os.environ.get("RESUME_PROFILE_INTERVAL_MS", "1")) / 1000
+
+
+def profiling_allowed(token):
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters
+    return bool(PROFILE_TOKEN) and token is not None and \
+        hmac.compare_digest(token.encode('utf-8'), PROFILE_TOKEN.encode('utf-8'))
+
+
+def _frame_name(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Sampler(threading.Thread):
+    """Records the stack of one thread below a given frame until stopped"""
+
+    def __init__(self, thread_id, root_frame, interval):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopping = threading.Event()
+
+    def run(self):
+        while not self._stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if self._stopping.is_set():
+                # The profiled call has returned; its thread is now in stop()
+                break
+            stack = []
+            while frame is not None and frame is not self.root_frame:
+                stack.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self):
+        self._stopping.set()
+        self.join()
+
+
+def profile_call(mode, fn, *args, **kwargs):
+    """Call fn, profiled if mode is set, and return (result, raw profile or None)
+
+    The raw profile is a plain dict, so it can be sent back from a worker
+    process and combined with others by merge_profiles.
+    """
+    if mode is None:
+        return fn(*args, **kwargs), None
+
+    sampler = _Sampler(threading.get_ident(), sys._getframe(), SAMPLE_INTERVAL)
+    tracer = cProfile.Profile() if mode == "trace" else None
+    start = time.perf_counter()
+    sampler.start()
+    if tracer is not None:
+        tracer.enable()
+    try:
+        result = fn(*args, **kwargs)
+    finally:
+        if tracer is not None:
+            tracer.disable()
+        sampler.stop()
+    seconds = time.perf_counter() - start
+
+    raw = {"seconds": seconds, "samples": sampler.samples, "stacks": dict(sampler.stacks), "functions": {}}
+    if tracer is not None:
+        for (filename, line, name), (_, calls, self_time, total_time, _) in pstats.Stats(tracer).stats.items():
+            # Built-in functions have no file
+            key = name if filename == "~" else f"{name} ({os.path.basename(filename)}:{line})"
+            raw["functions"][key] = [calls, self_time, total_time]
+    return result, raw
+
+
+def merge_profiles(*profiles):
+    """Add up raw profiles, e.g. of the extraction and the analysis of one request"""
+    merged = {"seconds": 0.0, "samples": 0, "stacks": Counter(), "functions": {}}
+    for profile in profiles:
+        if profile is None:
+            continue
+        merged["seconds"] += profile["seconds"]
+        merged["samples"] += profile["samples"]
+        merged["stacks"].update(profile["stacks"])
+        for key, values in profile["functions"].items():
+            totals = merged["functions"].setdefault(key, [0, 0.0, 0.0])
+            for i, value in enumerate(values):
+                totals[i] += value
+    return merged
+
+
+def collapsed_stacks(profile):
+    return "\n".join(f"{stack} {count}" for stack, count in sorted(profile["stacks"].items()))
+
+
+def top_functions(profile, top=25):
+    """The top functions by self time: exact ones when traced, else estimated from the samples"""
+    if profile["functions"]:
+        rows = [
+            {"function": key, "calls": calls, "self_s": round(self_time, 6), "total_s": round(total_time, 6)}
+            for key, (calls, self_time, total_time) in profile["functions"].items()
+        ]
+    else:
+        # Each sample stands for an equal share of the profiled time
+        seconds_per_sample = profile["seconds"] / profile["samples"] if profile["samples"] else 0.0
+        self_samples = Counter()
+        total_samples = Counter()
+        for stack, count in profile["stacks"].items():
+            frames = stack.split(";")
+            self_samples[frames[-1]] += count
+            for frame in set(frames):
+                total_samples[frame] += count
+        rows = [
+            {"function": frame, "samples": total_samples[frame],
+             "self_s": round(self_samples[frame] * seconds_per_sample, 6),
+             "total_s": round(total_samples[frame] * seconds_per_sample, 6)}
+            for frame in total_samples
+        ]
+    rows.sort(key=lambda row: (row["self_s"], row["total_s"]), reverse=True)
+    return rows[:top]
+
+
+def render_profile(profile, mode, top=25):
+    return {
+        "mode": mode,
+        "seconds": round(profile["seconds"], 6),
+        "samples": profile["samples"],
+        "top": top_functions(profile, top),
+        "collapsed": collapsed_stacks(profile)
+    }
@@ -0,0 +1,306 @@
+"""Persistent store of parsed resumes with an in-memory inverted index for search.
+
+Every candidate gets a small integer id. The index maps each skill, role and
+location to a bitmap of candidate ids, held in a Python int (bit i set for
+candidate i), so boolean queries are single big-integer operations that stay
+fast over hundreds of thousands of candidates. Experience years and ATS scores
+are small integers and get one bitmap per value as well. Rows live in SQLite
+and the bitmaps are rebuilt from them on startup, then updated in place as
+resumes are added.
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+# Parse result fields a candidate needs to be indexed
+SEARCH_FIELDS = ("skills", "role", "location", "experience_years", "ats_score")
+INDEXED_FIELDS = ("skill", "role", "location")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY,
+    parse_id TEXT NOT NULL UNIQUE,
+    filename TEXT,
+    skills TEXT NOT NULL,
+    role TEXT,
+    location TEXT,
+    experience_years INTEGER,
+    ats_score INTEGER,
+    created_at REAL NOT NULL
+);
+"""
+
+_QUERY_TOKEN = re.compile(r'\s*(?:(\()|(\))|(?:(\w+):)?(?:"([^"]*)"|([^\s()"]+)))')
+
+
+def _normalize(value):
+    return " ".join(str(value).lower().split())
+
+
+def _bit_ids(bitmap, limit=None):
+    """Candidate ids in a bitmap, highest (newest) first"""
+    ids = []
+    while bitmap and (limit is None or len(ids) < limit):
+        candidate_id = bitmap.bit_length() - 1
+        ids.append(candidate_id)
+        bitmap ^= 1 << candidate_id
+    return ids
+
+
+def _bitmap_from_ids(ids):
+    """Bitmap with the given bits set, built in one pass instead of one OR per id"""
+    bits = bytearray((max(ids) >> 3) + 1)
+    for candidate_id in ids:
+        bits[candidate_id >> 3] |= 1 << (candidate_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _popcount(bitmap):
+    return bin(bitmap).count("1")
+
+
+class QueryError(ValueError):
+    pass
+
+
+class _QueryParser:
+    """Boolean queries such as: python AND (react OR vue) NOT php role:"data scientist"
+
+    Adjacent terms are ANDed. Terms are skills unless prefixed with role: or
+    location:; quote terms that contain spaces.
+    """
+
+    def __init__(self, query, lookup, everything):
+        self.tokens = self._tokenize(query)
+        self.position = 0
+        self.lookup = lookup
+        self.everything = everything
+
+    @staticmethod
+    def _tokenize(query):
+        tokens = []
+        position = 0
+        query = query.strip()
+        while position < len(query):
+            match = _QUERY_TOKEN.match(query, position)
+            if not match or match.end() == position:
+                raise QueryError(f"Cannot parse the query at: {query[position:]}")
+            position = match.end()
+            open_paren, close_paren, field, quoted, bare = match.groups()
+            if open_paren:
+                tokens.append(("(", None))
+            elif close_paren:
+                tokens.append((")", None))
+            elif field is None and quoted is None and bare.upper() in ("AND", "OR", "NOT"):
+                tokens.append((bare.upper(), None))
+            else:
+                field = (field or "skill").lower()
+                if field not in INDEXED_FIELDS:
+                    raise QueryError(f"Unknown field '{field}'. Use one of: {', '.join(INDEXED_FIELDS)}.")
+                tokens.append(("TERM", (field, _normalize(quoted if quoted is not None else bare))))
+        return tokens
+
+    def _peek(self):
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def _next(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            return self.everything
+        result = self._or()
+        if self._peek() is not None:
+            raise QueryError(f"Unexpected '{self._peek()}' in the query")
+        return result
+
+    def _or(self):
+        result = self._and()
+        while self._peek() == "OR":
+            self._next()
+            result |= self._and()
+        return result
+
+    def _and(self):
+        result = self._unary()
+        while self._peek() in ("AND", "NOT", "(", "TERM"):
+            if self._peek() == "AND":
+                self._next()
+            result &= self._unary()
+        return result
+
+    def _unary(self):
+        kind = self._peek()
+        if kind == "NOT":
+            self._next()
+            return self.everything & ~self._unary()
+        if kind == "(":
+            self._next()
+            result = self._or()
+            if self._peek() != ")":
+                raise QueryError("Missing ')' in the query")
+            self._next()
+            return result
+        if kind == "TERM":
+            return self.lookup(*self._next()[1])
+        raise QueryError("Incomplete query" if kind is None else f"Unexpected '{kind}' in the query")
+
+
+class CandidateIndex:
+    """Parsed resumes stored in SQLite and indexed in memory for /api/search"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._postings = {field: {} for field in INDEXED_FIELDS}
+        self._experience = {}
+        self._ats = {}
+        self._all = 0
+        self._candidates = {}
+        self._ids_by_parse_id = {}
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            rows = conn.execute(
+                "SELECT id, parse_id, filename, skills, role, location, experience_years, ats_score FROM candidates"
+            ).fetchall()
+        members = {}
+        for row in rows:
+            candidate = {
+                "id": row[0], "parse_id": row[1], "filename": row[2], "skills": json.loads(row[3]),
+                "role": row[4], "location": row[5], "experience_years": row[6], "ats_score": row[7]
+            }
+            for bitmaps, key in self._bitmap_keys(candidate):
+                members.setdefault((id(bitmaps), key), (bitmaps, []))[1].append(candidate["id"])
+            self._candidates[candidate["id"]] = candidate
+            self._ids_by_parse_id[candidate["parse_id"]] = candidate["id"]
+        for (_, key), (bitmaps, ids) in members.items():
+            bitmaps[key] = _bitmap_from_ids(ids)
+        if self._candidates:
+            self._all = _bitmap_from_ids(list(self._candidates))
+
+    def _connect(self):
+        return closing(sqlite3.connect(self.path, timeout=30, isolation_level=None))
+
+    def _bitmap_keys(self, candidate):
+        """(bitmaps, key) pairs of every bitmap the candidate belongs to"""
+        # A parse result can list a skill twice; its bitmap is updated once
+        skills = dict.fromkeys(_normalize(skill) for skill in candidate["skills"])
+        keys = [(self._postings["skill"], skill) for skill in skills]
+        for field in ("role", "location"):
+            if candidate[field]:
+                keys.append((self._postings[field], _normalize(candidate[field])))
+        for bitmaps, value in ((self._experience, candidate["experience_years"]), (self._ats, candidate["ats_score"])):
+            if value is not None:
+                keys.append((bitmaps, value))
+        return keys
+
+    def _index(self, candidate):
+        # Caller holds the lock
+        bit = 1 << candidate["id"]
+        for bitmaps, key in self._bitmap_keys(candidate):
+            bitmaps[key] = bitmaps.get(key, 0) | bit
+        self._all |= bit
+        self._candidates[candidate["id"]] = candidate
+        self._ids_by_parse_id[candidate["parse_id"]] = candidate["id"]
+
+    def _unindex(self, candidate):
+        # Caller holds the lock
+        mask = ~(1 << candidate["id"])
+        for bitmaps, key in self._bitmap_keys(candidate):
+            remaining = bitmaps.pop(key, 0) & mask
+            if remaining:
+                bitmaps[key] = remaining
+        self._all &= mask
+
+    def add(self, parse_id, filename, info):
+        """Store and index one parse result, replacing an earlier one with the same parse_id"""
+        candidate = {
+            "parse_id": parse_id,
+            "filename": filename,
+            "skills": list(info.get("skills") or []),
+            "role": info.get("role"),
+            "location": info.get("location"),
+            "experience_years": info.get("experience_years"),
+            "ats_score": (info.get("ats_score") or {}).get("overall")
+        }
+        values = (filename, json.dumps(candidate["skills"]), candidate["role"], candidate["location"],
+                  candidate["experience_years"], candidate["ats_score"])
+        with self._lock:
+            existing = self._ids_by_parse_id.get(parse_id)
+            with self._connect() as conn:
+                if existing is None:
+                    candidate["id"] = conn.execute(
+                        "INSERT INTO candidates (parse_id, filename, skills, role, location, experience_years, "
+                        "ats_score, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (parse_id,) + values + (time.time(),)
+                    ).lastrowid
+                else:
+                    candidate["id"] = existing
+                    conn.execute(
+                        "UPDATE candidates SET filename = ?, skills = ?, role = ?, location = ?, "
+                        "experience_years = ?, ats_score = ? WHERE id = ?",
+                        values + (existing,)
+                    )
+            # The index changes only once the row is written, so the two cannot disagree
+            if existing is not None:
+                self._unindex(self._candidates[existing])
+            self._index(candidate)
+        return candidate["id"]
+
+    def _range(self, values, low, high):
+        bitmap = 0
+        for value, bits in values.items():
+            if (low is None or value >= low) and (high is None or value <= high):
+                bitmap |= bits
+        return bitmap
+
+    def search(self, query="", min_experience=None, max_experience=None, min_ats=None, top=20):
+        """Candidates matching a boolean query and the ranges, best ATS score first
+
+        Returns the total number of matches and up to top candidates; ties are
+        broken by the most recently added. Raises QueryError for invalid queries.
+        """
+        with self._lock:
+            bitmap = _QueryParser(query or "", lambda field, term: self._postings[field].get(term, 0),
+                                  self._all).parse()
+            if min_experience is not None or max_experience is not None:
+                bitmap &= self._range(self._experience, min_experience, max_experience)
+            if min_ats is not None:
+                bitmap &= self._range(self._ats, min_ats, None)
+
+            total = _popcount(bitmap)
+            # Walk the ATS score bitmaps from the highest score down until top candidates are found
+            ids = []
+            for score in sorted(self._ats, reverse=True):
+                if len(ids) >= top:
+                    break
+                ids.extend(_bit_ids(bitmap & self._ats[score], top - len(ids)))
+                bitmap &= ~self._ats[score]
+            if len(ids) < top:
+                # Candidates without a score come last
+                ids.extend(_bit_ids(bitmap, top - len(ids)))
+            results = [self._candidates[candidate_id] for candidate_id in ids]
+
+        return {"total": total, "results": results}
+
+    def get(self, parse_id):
+        """The stored candidate for a parse_id, or None"""
+        with self._lock:
+            candidate_id = self._ids_by_parse_id.get(parse_id)
+            return None if candidate_id is None else self._candidates[candidate_id]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "candidates": len(self._candidates),
+                "skills": len(self._postings["skill"]),
+                "roles": len(self._postings["role"]),
+                "locations": len(self._postings["location"])
+            }
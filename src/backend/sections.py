@@ -0,0 +1,56 @@
+"""One-pass segmentation of a resume into its titled sections."""
+import re
+
+# Canonical section name -> header lines that open it
+SECTION_HEADERS = {
+    "education": ["education", "academic background", "academic qualifications",
+                  "educational qualification", "educational qualifications"],
+    "experience": ["experience", "work experience", "employment"],
+    "skills": ["skills", "technical skills", "core competencies", "expertise",
+               "technologies", "tech stack"],
+    "projects": ["projects", "selected projects", "personal projects", "academic projects",
+                 "professional projects", "side projects", "portfolio"],
+    "certifications": ["certifications"],
+    "activities": ["activities"],
+    "interests": ["interests"],
+    "languages": ["languages"],
+    "references": ["references"],
+}
+
+_HEADER_TO_SECTION = {
+    header: section
+    for section, headers in SECTION_HEADERS.items()
+    for header in headers
+}
+
+# A header is a line holding only the header text, optionally followed by a colon
+HEADER_PATTERN = re.compile(
+    r'^[ \t]*(' +
+    '|'.join(re.escape(h) for h in sorted(_HEADER_TO_SECTION, key=len, reverse=True)) +
+    r')[ \t]*(?::|$)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def segment_sections(text):
+    """Map each section name to the (start, end) offsets of its first occurrence.
+
+    A section runs from its header line to the next header of a different
+    section, or to the end of the text. Consecutive headers of the same
+    section (e.g. "Skills" followed by "Technical Skills") are merged.
+    """
+    headers = [(match.start(), _HEADER_TO_SECTION[match.group(1).lower()])
+               for match in HEADER_PATTERN.finditer(text)]
+
+    spans = {}
+    for i, (start, section) in enumerate(headers):
+        if section in spans:
+            continue
+        end = len(text)
+        for next_start, next_section in headers[i + 1:]:
+            if next_section != section:
+                end = next_start
+                break
+        spans[section] = (start, end)
+
+    return spans
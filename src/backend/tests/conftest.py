@@ -0,0 +1,61 @@
+import io
+import os
+import sys
+import zipfile
+from xml.sax.saxutils import escape
+
+import pytest
+
+# The backend is a flat set of modules imported from its own directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tests keep every cache in memory instead of under data/
+os.environ.setdefault("RESUME_CACHE_DB", "")
+
+
+@pytest.fixture(scope="session")
+def nlp():
+    """A blank English pipeline with rule-based sentences, so no model download is needed"""
+    import spacy
+
+    model = spacy.blank("en")
+    model.add_pipe("sentencizer")
+    return model
+
+
+@pytest.fixture
+def app_module(nlp, monkeypatch):
+    """The app module analyzing with the blank pipeline"""
+    import app
+
+    monkeypatch.setattr(app, "_nlp", nlp)
+    monkeypatch.setitem(app.ANNOTATION_PIPES, "sents", ["sentencizer"])
+    return app
+
+
+def _docx(text):
+    paragraphs = "".join(f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>'
+                         for line in text.split("\n"))
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as docx:
+        docx.writestr("[Content_Types].xml",
+                      '<?xml version="1.0"?><Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                      '<Default Extension="xml" ContentType="application/xml"/></Types>')
+        docx.writestr("word/document.xml",
+                      '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                      '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                      f'<w:body>{paragraphs}</w:body></w:document>')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def make_docx():
+    """Builds a minimal DOCX with one paragraph per line of text"""
+    return _docx
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    """A test client of the app with its model ready"""
+    monkeypatch.setitem(app_module._startup, "state", "ready")
+    return app_module.app.test_client()
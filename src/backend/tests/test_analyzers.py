@@ -0,0 +1,322 @@
+import random
+import re
+from collections import Counter
+
+import pytest
+
+import app
+import bench
+from app import (GENERIC_TERMS, GROWTH_INDICATORS, PASSION_INDICATORS, SKILLS, STRONG_ACTION_VERBS, WEAK_PHRASES,
+                 _on_one_line)
+from context import AnalysisContext
+
+# The per-sentence loops that the sentence x term matrix replaced in analyze_interests,
+# analyze_growth_potential and analyze_writing_quality, kept as they were for reference
+
+
+def reference_interests(ctx):
+    """Analyze interests and passion areas with improved accuracy"""
+    interest_score = {}
+    hits = ctx.hits
+
+    # Enhanced analysis using word vectors and contextual clues
+    # Count explicit mentions of skills
+    for skill in hits.found(SKILLS):
+        interest_score[skill] = hits.count(skill)
+
+    # Look for phrases indicating passion
+    passion_contexts = [
+        r'passionate about ([\w\s]+)',
+        r'interested in ([\w\s]+)',
+        r'fascinated by ([\w\s]+)',
+        r'enjoy ([\w\s]+)',
+        r'love ([\w\s]+)',
+        r'excited by ([\w\s]+)'
+    ]
+
+    for pattern in passion_contexts:
+        matches = re.findall(pattern, ctx.lower)
+        for match in matches:
+            # Check if any skill is within the passionate context
+            for skill in SKILLS:
+                if skill in match:
+                    interest_score[skill] = interest_score.get(skill, 0) + 3
+
+    # Check for passion indicators near skills
+    for sentence_text in ctx.sentence_texts_lower:
+        has_passion = any(indicator in sentence_text for indicator in PASSION_INDICATORS)
+
+        if has_passion:
+            for skill in SKILLS:
+                if skill in sentence_text:
+                    interest_score[skill] = interest_score.get(skill, 0) + 2
+
+    # Look for personal projects or side activities
+    project_indicators = [
+        "personal project", "side project", "hobby project", "contributed to",
+        "open source", "github", "portfolio", "blog", "wrote", "created", "developed",
+        "built", "designed", "implemented", "volunteer"
+    ]
+
+    # Find sentences with project indicators
+    project_sentences = []
+    for sentence_text in ctx.sentence_texts_lower:
+        if any(indicator in sentence_text for indicator in project_indicators):
+            project_sentences.append(sentence_text)
+
+    # Check for skills in project contexts
+    for sentence in project_sentences:
+        for skill in SKILLS:
+            if skill in sentence:
+                interest_score[skill] = interest_score.get(skill, 0) + 3
+
+    # Consider skills mentioned in leadership or ownership contexts
+    ownership_indicators = ["led", "managed", "spearheaded", "initiated", "founded", "created", "started"]
+
+    for sentence_text in ctx.sentence_texts_lower:
+        has_ownership = any(indicator in sentence_text for indicator in ownership_indicators)
+
+        if has_ownership:
+            for skill in SKILLS:
+                if skill in sentence_text:
+                    interest_score[skill] = interest_score.get(skill, 0) + 1
+
+    # Normalize scores to 1-10 scale
+    max_score = max(interest_score.values()) if interest_score else 1
+    normalized_interests = {
+        skill: min(10, max(1, int(5 * score / max_score) + 3))
+        for skill, score in interest_score.items()
+    }
+
+    # Sort by score and return top interests
+    sorted_interests = sorted(normalized_interests.items(), key=lambda x: x[1], reverse=True)
+    return [{"skill": skill, "score": score} for skill, score in sorted_interests[:5]]
+
+
+def reference_growth_potential(ctx):
+    """Analyze growth potential with improved accuracy"""
+    growth_score = 0
+    growth_areas = []
+    hits = ctx.hits
+    text_lower = ctx.lower
+
+    # Check for growth indicators with weighted scoring
+    for indicator in hits.found(GROWTH_INDICATORS):
+        count = hits.count(indicator)
+        growth_score += min(3, count * 0.5)  # Cap contribution from any single indicator
+
+        # Only add unique indicators
+        if indicator not in growth_areas:
+            growth_areas.append(indicator)
+
+    # Check for learning patterns with contextual analysis
+    learning_patterns = [
+        r'(?:completed|pursuing|earned|achieved)\s+(?:a|an)\s+(?:course|certification|degree)',
+        r'(?:self|auto)-taught',
+        r'(?:continuously|actively)\s+(?:learning|developing|improving)',
+        r'enrolled in',
+        r'studying',
+        r'learning',
+        r'taking courses',
+        r'professional development'
+    ]
+
+    for pattern in learning_patterns:
+        if re.search(pattern, text_lower):
+            growth_score += 1
+
+    # Check for career progression indicators
+    progression_indicators = [
+        r'promoted',
+        r'advancement',
+        r'career growth',
+        r'progression',
+        r'moved up',
+        r'transitioned to',
+        r'increased responsibilities'
+    ]
+
+    for indicator in progression_indicators:
+        if re.search(indicator, text_lower):
+            growth_score += 1
+            if "career progression" not in growth_areas:
+                growth_areas.append("career progression")
+
+    # Check for adaptability indicators
+    adaptability_indicators = [
+        r'adapt',
+        r'flexible',
+        r'versatile',
+        r'pivot',
+        r'transition',
+        r'quick learner',
+        r'rapidly',
+        r'agile'
+    ]
+
+    adaptability_count = sum(1 for indicator in adaptability_indicators if re.search(indicator, text_lower))
+    if adaptability_count > 0:
+        growth_score += min(2, adaptability_count)
+        if "adaptability" not in growth_areas:
+            growth_areas.append("adaptability")
+
+    # Look for sentences discussing future goals
+    future_indicators = ["goal", "aim", "aspire", "future", "plan", "intend", "looking to", "seeking"]
+
+    for sentence_text in ctx.sentence_texts_lower:
+        if any(indicator in sentence_text for indicator in future_indicators):
+            growth_score += 1
+            if "future-oriented" not in growth_areas:
+                growth_areas.append("future-oriented")
+            break
+
+    # Normalize score and select top growth areas
+    final_growth_score = min(10, max(1, int(growth_score)))
+
+    # Prioritize growth areas to return the most relevant ones
+    prioritized_areas = []
+    priority_terms = ["learning", "development", "growth", "career", "leadership", "education", "adaptability"]
+
+    for term in priority_terms:
+        matching_areas = [area for area in growth_areas if term in area]
+        prioritized_areas.extend(matching_areas)
+
+    # Add any remaining areas
+    remaining_areas = [area for area in growth_areas if area not in prioritized_areas]
+    prioritized_areas.extend(remaining_areas)
+
+    return {
+        "score": final_growth_score,
+        "indicators": prioritized_areas[:3]  # Top 3 growth indicators
+    }
+
+
+def reference_writing_quality(ctx):
+    """Analyze the writing quality with improved accuracy"""
+    quality_score = 7  # Start with a baseline score
+    hits = ctx.hits
+    text_lower = ctx.lower
+
+    # Check for weak phrases
+    weak_phrase_count = len(hits.found(WEAK_PHRASES))
+
+    # Check for strong action verbs
+    action_verb_count = len(hits.found(STRONG_ACTION_VERBS))
+
+    # Check for quantifiable achievements with improved detection
+    quantifiable_patterns = [
+        r'(?<!\d)\d+%',
+        r'[\$€£][\d,]+',
+        r'(?<!\d)\d+ users',
+        r'(?<!\d)\d+ clients',
+        r'(?<!\d)\d+ projects',
+        r'(?<!\d)\d+ team members',
+        r'top \d+%'
+    ]
+    # A verb and, later on the same line, what it was measured by
+    quantifiable_phrases = [
+        ('increased ', ' by'),
+        ('decreased ', ' by'),
+        ('reduced ', ' by'),
+        ('improved ', ' by'),
+        ('generated ', r'\$[\d,]+'),
+        ('saved ', r'\$[\d,]+')
+    ]
+
+    quantifiable_count = sum(1 for pattern in quantifiable_patterns if re.search(pattern, text_lower)) + \
+        sum(1 for first, then in quantifiable_phrases if _on_one_line(text_lower, first, then))
+
+    # Check for generic terms
+    generic_count = len(hits.found(GENERIC_TERMS))
+
+    # Advanced analysis
+
+    # Check for active voice vs passive voice
+    passive_count = 0
+    active_count = 0
+
+    for sent_text in ctx.sentence_texts_lower:
+        # Simple passive voice detection (can be improved)
+        if _on_one_line(sent_text, r'\b(?:was|were|been|be|is|are)\b', r'\bby\b'):
+            passive_count += 1
+        elif any(verb in sent_text for verb in STRONG_ACTION_VERBS):
+            active_count += 1
+
+    # Calculate active/passive ratio
+    if passive_count + active_count > 0:
+        active_ratio = active_count / (passive_count + active_count)
+        # Adjust score based on active voice usage
+        quality_score += (active_ratio - 0.5) * 2  # +1 point for 100% active, -1 for 0% active
+
+    # Check for consistency in tense
+    past_tense_verbs = re.findall(r'\b(ed|created|developed|managed|led|implemented|designed)\b', text_lower)
+    present_tense_verbs = re.findall(r'\b(ing|create|develop|manage|lead|implement|design)s?\b', text_lower)
+
+    # Most resumes should use past tense consistently
+    if len(past_tense_verbs) + len(present_tense_verbs) > 0:
+        tense_consistency = len(past_tense_verbs) / (len(past_tense_verbs) + len(present_tense_verbs))
+
+        # Penalize mixed tenses (too much present tense)
+        if 0.3 < tense_consistency < 0.7:
+            quality_score -= 1
+
+    # Check for redundancy or repetition
+    word_counts = Counter(ctx.content_words)
+
+    # Find words repeated too frequently
+    repetitive_words = [word for word, count in word_counts.items() if count > 5 and word not in ["experience", "project", "skill"]]
+
+    if repetitive_words:
+        quality_score -= min(1, len(repetitive_words) * 0.2)
+
+    # Calculate final score with weighted factors
+    quality_score -= (weak_phrase_count * 0.4)  # Penalize weak phrases
+    quality_score += min(3, action_verb_count * 0.2)  # Reward action verbs (max +3)
+    quality_score += min(2, quantifiable_count * 0.4)  # Reward quantifiable achievements (max +2)
+    quality_score -= (generic_count * 0.4)  # Penalize generic terms
+
+    # Cap score between 1-10
+    return {
+        "score": max(1, min(10, round(quality_score))),
+        "weak_phrases_found": weak_phrase_count,
+        "action_verbs_found": action_verb_count,
+        "quantifiable_achievements": quantifiable_count,
+        "generic_terms_found": generic_count
+    }
+
+
+# Sentences dense in the terms the matrix covers, including terms that contain each other
+# ("java" and "javascript", "go" and "goal") and sentences ended by punctuation or line breaks
+_FRAGMENTS = (SKILLS[:40] + PASSION_INDICATORS + ["personal project", "open source", "github", "created", "built",
+              "led", "managed", "founded", "goal", "looking to", "seeking", "was built by", "is used by"]
+              + STRONG_ACTION_VERBS[:20] + ["passionate about", "interested in", "love", "enjoy"])
+
+
+def _random_document(seed):
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(rng.randint(5, 60)):
+        words = [rng.choice(_FRAGMENTS) for _ in range(rng.randint(1, 12))]
+        sentences.append(" ".join(words) + rng.choice([". ", "! ", "\n", ".\n\n", " "]))
+    return "".join(sentences).capitalize()
+
+
+def _documents():
+    for pages in (1, 3, 20):
+        for seed in range(3):
+            yield f"resume-{pages}p-{seed}", bench.generate_resume(pages, seed=seed)
+    for seed in range(60):
+        yield f"random-{seed}", _random_document(seed)
+
+
+_DOCUMENTS = dict(_documents())
+
+
+@pytest.mark.parametrize("name", list(_DOCUMENTS))
+def test_matrix_scores_match_the_per_sentence_loops(nlp, name):
+    text = _DOCUMENTS[name]
+    clean_text = app.clean_resume_text(text)
+    ctx = AnalysisContext(clean_text, app.LEXICON, nlp=nlp, sentence_lexicon=app.SENTENCE_LEXICON)
+    assert app.analyze_interests(ctx) == reference_interests(ctx)
+    assert app.analyze_growth_potential(ctx) == reference_growth_potential(ctx)
+    assert app.analyze_writing_quality(ctx) == reference_writing_quality(ctx)
@@ -0,0 +1,96 @@
+import io
+import zipfile
+
+import pytest
+
+RESUME = """{name}
+Software Engineer at Acme Corp
+Experience
+Built data pipelines in Python and Docker for five years.
+Skills
+Python, Docker, Kubernetes, PostgreSQL
+"""
+
+
+def _upload(client, files, **params):
+    data = {"files": [(io.BytesIO(content), name) for name, content in files]}
+    return client.post("/api/parse-resumes", query_string=params, data=data, content_type="multipart/form-data")
+
+
+def _archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def test_results_follow_the_upload_order(client, make_docx):
+    files = [("b.docx", make_docx(RESUME.format(name="b"))), ("notes.txt", b"plain text"),
+             ("short.docx", make_docx("too short")), ("a.docx", make_docx(RESUME.format(name="a")))]
+    response = _upload(client, files)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [result["filename"] for result in body["results"]] == ["b.docx", "notes.txt", "short.docx", "a.docx"]
+    assert "python" in body["results"][0]["result"]["skills"]
+    assert "Unsupported file format" in body["results"][1]["error"]
+    assert "sufficient text" in body["results"][2]["error"]
+    assert body["results"][3]["result"]["skills"]
+    assert (body["processed"], body["failed"]) == (2, 2)
+
+
+def test_archives_are_expanded_in_place(client, make_docx):
+    archive = _archive([("x.docx", make_docx(RESUME.format(name="x"))), ("__MACOSX/._x.docx", b"fork"),
+                        ("dir/", b""), ("dir/y.docx", make_docx(RESUME.format(name="y")))])
+    files = [("first.docx", make_docx(RESUME.format(name="first"))), ("batch.zip", archive)]
+    body = _upload(client, files).get_json()
+    assert [result["filename"] for result in body["results"]] == ["first.docx", "x.docx", "dir/y.docx"]
+    assert body["processed"] == 3
+
+
+def test_too_many_files_are_refused(client, app_module, make_docx, monkeypatch):
+    monkeypatch.setattr(app_module, "BATCH_MAX_FILES", 2)
+    docx = make_docx(RESUME.format(name="a"))
+    response = _upload(client, [("batch.zip", _archive([("a.docx", docx), ("b.docx", docx), ("c.docx", docx)]))])
+    assert response.status_code == 400
+    assert "maximum per request is 2" in response.get_json()["error"]
+
+
+def test_oversized_archives_are_refused(client, app_module, make_docx, monkeypatch):
+    docx = make_docx(RESUME.format(name="a"))
+    monkeypatch.setattr(app_module, "BATCH_MAX_ARCHIVE_BYTES", len(docx) + 1)
+    response = _upload(client, [("batch.zip", _archive([("a.docx", docx), ("b.docx", docx)]))])
+    assert response.status_code == 400
+    assert "exceed the maximum allowed size" in response.get_json()["error"]
+
+
+def test_bad_archives_are_refused(client):
+    response = _upload(client, [("batch.zip", b"not a zip")])
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("Invalid archive")
+
+
+@pytest.mark.parametrize("requested, used", [("64", 3), ("2", 2), ("0", 1)])
+def test_n_process_is_capped(client, app_module, make_docx, monkeypatch, requested, used):
+    monkeypatch.setattr(app_module, "BATCH_MAX_PROCESSES", 3)
+    calls = []
+    extract_info_batch = app_module.extract_info_batch
+
+    def recording(texts, n_process=1, **kwargs):
+        calls.append(n_process)
+        return extract_info_batch(texts, **kwargs)
+
+    monkeypatch.setattr(app_module, "extract_info_batch", recording)
+    response = _upload(client, [("a.docx", make_docx(RESUME.format(name="a")))], n_process=requested)
+    assert response.status_code == 200
+    assert calls == [used]
+
+
+def test_integer_parameters_are_checked(client, make_docx):
+    response = _upload(client, [("a.docx", make_docx(RESUME.format(name="a")))], batch_size="many")
+    assert response.status_code == 400
+
+
+def test_no_files_is_an_error(client):
+    response = client.post("/api/parse-resumes", data={}, content_type="multipart/form-data")
+    assert response.status_code == 400
@@ -0,0 +1,106 @@
+import io
+import itertools
+import sqlite3
+
+import pytest
+
+import cache
+from cache import ResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Distinct, increasing write times"""
+    ticks = itertools.count(1)
+    monkeypatch.setattr(cache.time, "time", lambda: float(next(ticks)))
+
+
+def _rows(path):
+    with sqlite3.connect(path) as conn:
+        return [row[0] for row in conn.execute("SELECT key FROM results ORDER BY created_at")]
+
+
+def test_keys_cover_the_bytes_the_options_and_the_version():
+    results = ResultCache("v1")
+    upload = io.BytesIO(b"resume bytes")
+    key = results.key(upload, {"ner": True})
+    # Streams are hashed in chunks and rewound for the extractor
+    assert upload.tell() == 0
+    assert key == results.key(b"resume bytes", {"ner": True})
+    assert key != results.key(b"resume bytes", {"ner": False})
+    assert key != results.key(b"other bytes", {"ner": True})
+    assert key != ResultCache("v2").key(b"resume bytes", {"ner": True})
+
+
+def test_memory_tier_evicts_the_least_recently_used():
+    results = ResultCache("v1", max_entries=2)
+    results.put("a", {"n": 1})
+    results.put("b", {"n": 2})
+    assert results.get("a") == {"n": 1}
+    results.put("c", {"n": 3})
+    assert results.get("b") is None
+    assert results.get("a") == {"n": 1} and results.get("c") == {"n": 3}
+    stats = results.stats()
+    assert (stats["evictions"], stats["memory_entries"], stats["max_entries"]) == (1, 2, 2)
+
+
+def test_counters_and_hit_ratio(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    ResultCache("v1", disk_path=path).put("a", {"n": 1})
+
+    results = ResultCache("v1", disk_path=path)
+    assert results.get("missing") is None
+    assert results.get("a") == {"n": 1}
+    assert results.get("a") == {"n": 1}
+    stats = results.stats()
+    assert (stats["misses"], stats["disk_hits"], stats["memory_hits"]) == (1, 1, 1)
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
+    assert ResultCache("v1").stats()["hit_ratio"] == 0.0
+
+
+def test_hits_are_fresh_objects():
+    results = ResultCache("v1")
+    results.put("a", {"skills": ["python"]})
+    results.get("a")["skills"].append("changed")
+    assert results.get("a") == {"skills": ["python"]}
+
+
+def test_a_new_version_drops_older_results(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    old = ResultCache("v1", disk_path=path)
+    old.put(old.key(b"resume"), {"n": 1})
+
+    new = ResultCache("v2", disk_path=path)
+    assert new.get(new.key(b"resume")) is None
+    assert _rows(path) == []
+
+
+def test_disk_tier_keeps_the_newest_results(tmp_path, clock):
+    path = str(tmp_path / "results.sqlite3")
+    results = ResultCache("v1", disk_path=path, max_disk_entries=10)
+    for i in range(300):
+        results.put(f"k{i}", {"n": i})
+    # Trimmed once after 256 writes, then again when opened
+    assert len(_rows(path)) == 300 - 256 + 10
+    assert results.stats()["disk_evictions"] == 246
+
+    reopened = ResultCache("v1", disk_path=path, max_disk_entries=10)
+    assert _rows(path) == [f"k{i}" for i in range(290, 300)]
+    assert reopened.stats()["disk_evictions"] == 44
+    assert reopened.get("k299") == {"n": 299} and reopened.get("k0") is None
+
+
+def test_parse_options_resolve_the_deployment_defaults(app_module, monkeypatch):
+    import extraction
+    monkeypatch.setattr(app_module, "NER_ENABLED", False)
+    monkeypatch.setattr(extraction, "DEFAULT_TIER", "fast")
+    assert app_module.parse_options(None, None, None) == app_module.parse_options(False, "fast", None)
+    assert app_module.parse_options(None, None, ["skills", "contact_info"])["fields"] == ["contact_info", "skills"]
+
+
+@pytest.mark.parametrize("setting, value", [("SENTENCE_SEGMENTER", "sentencizer"),
+                                            ("installed_model", lambda: ("en_core_web_sm", "3.5.0"))])
+def test_spacy_setup_is_part_of_the_version(app_module, monkeypatch, setting, value):
+    before = app_module.compute_analysis_version()
+    monkeypatch.setattr(app_module, setting, value)
+    assert app_module.compute_analysis_version() != before
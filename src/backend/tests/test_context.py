@@ -0,0 +1,66 @@
+from context import AnalysisContext
+from lexicon import Lexicon
+
+TEXT = """Jane Doe
+Experience
+Led a team of five engineers. Built Python services.
+
+Skills
+Python, Docker"""
+
+
+class _Counting:
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.fn(*args, **kwargs)
+
+
+def test_views_are_computed_once_and_shared(nlp):
+    parse = _Counting(nlp)
+    lexicon = Lexicon(["python", "docker"])
+    scan = _Counting(lexicon.scan)
+    lexicon.scan = scan
+    ctx = AnalysisContext(TEXT, lexicon, nlp=parse, sentence_lexicon=Lexicon(["led", "built"]))
+
+    for _ in range(3):
+        assert ctx.doc.text == TEXT.lower()
+        assert ctx.sentences is ctx.sentences
+        assert ctx.content_words is ctx.content_words
+        assert ctx.entities("PERSON") == []
+        assert ctx.sentence_terms is ctx.sentence_terms
+        assert "python" in ctx.hits
+    assert ctx.lines is ctx.lines and ctx.sections is ctx.sections
+    assert (parse.calls, scan.calls) == (1, 1)
+
+
+def test_a_doc_passed_in_is_not_parsed_again(nlp):
+    parse = _Counting(nlp)
+    doc = nlp(TEXT.lower())
+    ctx = AnalysisContext(TEXT, Lexicon([]), nlp=parse, doc=doc)
+    assert ctx.doc is doc and ctx.sentences
+    assert parse.calls == 0
+
+
+def test_extract_info_parses_each_resume_once(app_module, monkeypatch):
+    parse = _Counting(app_module.parse_doc)
+    monkeypatch.setattr(app_module, "parse_doc", parse)
+    info = app_module.extract_info(TEXT)
+    assert set(info) >= {"skills", "interests", "writing_quality", "growth_potential"}
+    assert parse.calls == 1
+
+
+def test_an_analyzer_over_its_cpu_budget_is_degraded(app_module, monkeypatch, caplog):
+    def spin(ctx):
+        while True:
+            pass
+    monkeypatch.setattr(app_module, "ANALYZER_CPU_SECONDS", 0.05)
+    monkeypatch.setattr(app_module, "analyze_interests", spin)
+    info = app_module.extract_info(TEXT, fields=["interests", "skills"])
+    assert info["interests"] == app_module.DEGRADED_RESULTS["interests"]()
+    assert info["degraded"] == ["interests"]
+    assert info["skills"]
+    assert "Analyzer for interests ran out of CPU time" in caplog.text
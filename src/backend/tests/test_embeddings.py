@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+import embeddings
+from embeddings import VectorStore
+
+WIDTH = 16
+
+
+def _vectors(count, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, WIDTH)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _fill(store, vectors, offset=0):
+    for i, vector in enumerate(vectors, start=offset):
+        store.add(f"p{i}", f"{i}.pdf", vector)
+
+
+def _brute_force(vectors, query, top):
+    scores = vectors @ query
+    return [f"p{i}" for i in np.argsort(-scores)[:top]]
+
+
+def _wait_for_rebuild(store):
+    if store._rebuild_thread is not None:
+        store._rebuild_thread.join()
+
+
+def test_exact_search_ranks_every_row(tmp_path):
+    vectors = _vectors(200)
+    store = VectorStore(str(tmp_path), WIDTH)
+    _fill(store, vectors)
+    query = _vectors(1, seed=1)[0]
+    results = store.search(query, top=5)
+    assert [parse_id for parse_id, _, _ in results] == _brute_force(vectors, query, 5)
+    assert results[0][1] == results[0][0][1:] + ".pdf"
+    assert results[0][2] == pytest.approx(float(vectors[int(results[0][0][1:])] @ query))
+    assert "p3" not in [parse_id for parse_id, _, _ in store.search(vectors[3], top=5, exclude="p3")]
+
+
+def test_rows_survive_a_reopen(tmp_path):
+    vectors = _vectors(20)
+    _fill(VectorStore(str(tmp_path), WIDTH), vectors)
+    store = VectorStore(str(tmp_path), WIDTH)
+    assert len(store) == 20
+    np.testing.assert_array_equal(store.vector("p7"), vectors[7])
+
+
+def test_approximate_search_uses_the_cluster_index(tmp_path):
+    vectors = _vectors(400)
+    store = VectorStore(str(tmp_path), WIDTH, approximate_min_rows=100, probes=2)
+    _fill(store, vectors)
+    _wait_for_rebuild(store)
+    index = store._cluster_index
+    assert index is not None and index.rows >= 200
+    for i in (0, 123, 399):
+        # A stored vector is in the cluster of its nearest centroid, which is always probed
+        assert store.search(vectors[i], top=1)[0][0] == f"p{i}"
+    query = _vectors(1, seed=1)[0]
+    approximate = [parse_id for parse_id, _, _ in store.search(query, top=5)]
+    exact = [parse_id for parse_id, _, _ in store.search(query, top=5, exact=True)]
+    assert exact == _brute_force(vectors, query, 5)
+    assert len(approximate) == 5 and set(approximate) <= {f"p{i}" for i in range(400)}
+
+
+def test_searches_never_build_the_index(tmp_path, monkeypatch):
+    vectors = _vectors(150)
+    store = VectorStore(str(tmp_path), WIDTH, approximate_min_rows=100)
+    _fill(store, vectors[:99])
+    assert store._rebuild_thread is None
+
+    def build(matrix):
+        raise AssertionError("the index was built by a search")
+    monkeypatch.setattr(embeddings, "_ClusterIndex", build)
+    # Past the threshold the build goes to a thread of its own, and searches are exact until it is done
+    monkeypatch.setattr(VectorStore, "_schedule_rebuild", lambda self: None)
+    _fill(store, vectors[99:], offset=99)
+    query = _vectors(1, seed=1)[0]
+    assert [parse_id for parse_id, _, _ in store.search(query, top=3)] == _brute_force(vectors, query, 3)
+
+
+def test_the_index_is_rebuilt_in_the_background_when_the_corpus_doubles(tmp_path):
+    vectors = _vectors(450)
+    store = VectorStore(str(tmp_path), WIDTH, approximate_min_rows=100)
+    _fill(store, vectors[:100])
+    _wait_for_rebuild(store)
+    assert store._cluster_index.rows == 100
+    _fill(store, vectors[100:150], offset=100)
+    _wait_for_rebuild(store)
+    assert store._cluster_index.rows == 100
+    # Rows added since the build are still found
+    assert store.search(vectors[140], top=1)[0][0] == "p140"
+    _fill(store, vectors[150:], offset=150)
+    _wait_for_rebuild(store)
+    assert store._cluster_index.rows >= 200
+
+
+def test_the_loader_builds_the_index_of_a_stored_corpus(tmp_path):
+    _fill(VectorStore(str(tmp_path), WIDTH), _vectors(120))
+    store = VectorStore(str(tmp_path), WIDTH, approximate_min_rows=100)
+    assert store._cluster_index is None
+    store.build_cluster_index()
+    assert store._cluster_index.rows == 120
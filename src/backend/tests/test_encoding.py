@@ -0,0 +1,99 @@
+import gzip
+import json
+
+import pytest
+from flask import Response
+
+import encoding
+
+
+@pytest.fixture
+def no_msgpack(monkeypatch):
+    monkeypatch.setattr(encoding, "msgpack", None)
+
+
+def test_compact_view_links_the_raw_text(app_module):
+    info = {"skills": ["python"], "raw_text": "Jane Doe ..."}
+    assert app_module.apply_view(info, "full", "abc") is info
+    assert app_module.apply_view(info, "compact", "abc") == {"skills": ["python"],
+                                                             "raw_text_url": "/api/results/abc/raw_text"}
+    # Degraded results are not cached, so they have nothing to link to
+    assert app_module.apply_view(info, "compact") == {"skills": ["python"]}
+    assert app_module.apply_view({"skills": []}, "compact", "abc") == {"skills": []}
+    assert "raw_text" in info
+
+
+@pytest.mark.parametrize("query, accept, expected", [
+    ("", None, "json"),
+    ("format=json", "application/msgpack", "json"),
+    ("", "application/msgpack", "msgpack"),
+    ("", "application/json, application/msgpack;q=0.5", "json"),
+])
+def test_the_format_comes_from_the_query_then_the_accept_header(app_module, monkeypatch, query, accept, expected):
+    monkeypatch.setattr(encoding, "msgpack", object())
+    headers = {"Accept": accept} if accept else {}
+    with app_module.app.test_request_context(f"/?{query}", headers=headers):
+        assert app_module.requested_format() == expected
+
+
+def test_unknown_and_unavailable_formats_are_refused(app_module, no_msgpack):
+    with app_module.app.test_request_context("/?format=xml"):
+        with pytest.raises(ValueError, match="Unknown format"):
+            app_module.requested_format()
+    with app_module.app.test_request_context("/?format=msgpack"):
+        with pytest.raises(app_module.FormatUnavailable):
+            app_module.requested_format()
+    # A preference in the Accept header is not a demand
+    with app_module.app.test_request_context("/", headers={"Accept": "application/msgpack"}):
+        assert app_module.requested_format() == "json"
+
+
+def test_msgpack_without_the_package_is_not_acceptable(client, no_msgpack):
+    response = client.get("/api/jobs/nonexistent?format=msgpack")
+    assert response.status_code == 406
+    assert "msgpack" in response.get_json()["error"]
+
+
+def _compressed(app_module, body, accept_encoding, mimetype="application/json"):
+    with app_module.app.test_request_context("/", headers={"Accept-Encoding": accept_encoding}):
+        return app_module.compress_response(Response(body, mimetype=mimetype))
+
+
+def test_large_bodies_are_gzipped(app_module, monkeypatch):
+    monkeypatch.setattr(encoding, "brotli", None)
+    body = json.dumps({"raw_text": "experience " * 500})
+    response = _compressed(app_module, body, "gzip, deflate")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.vary
+    assert gzip.decompress(response.get_data()).decode() == body
+
+
+def test_small_bodies_and_other_clients_get_the_body_as_is(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "COMPRESS_MIN_BYTES", 1024)
+    small = "x" * 1023
+    response = _compressed(app_module, small, "gzip")
+    assert "Content-Encoding" not in response.headers and response.get_data(as_text=True) == small
+    # The response still varies with Accept-Encoding: a larger one would have been compressed
+    assert "Accept-Encoding" in response.vary
+
+    response = _compressed(app_module, "x" * 1024, "identity")
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.vary
+
+    assert _compressed(app_module, "x" * 1024, "gzip").headers["Content-Encoding"] == "gzip"
+
+
+def test_event_streams_and_disabled_compression_are_left_alone(app_module, monkeypatch):
+    response = _compressed(app_module, "data: x\n\n" * 500, "gzip", mimetype="text/event-stream")
+    assert "Content-Encoding" not in response.headers and not response.vary
+    monkeypatch.setattr(app_module, "COMPRESS_LEVEL", 0)
+    response = _compressed(app_module, "x" * 5000, "gzip")
+    assert "Content-Encoding" not in response.headers
+
+
+def test_json_is_written_by_orjson_with_utf8(app_module):
+    assert encoding.orjson is not None
+    with app_module.app.app_context():
+        assert app_module.app.json.dumps({"name": "José", "n": 1}) == '{"n":1,"name":"José"}'
+        # Integers orjson cannot hold fall back to the standard encoder
+        assert json.loads(app_module.app.json.dumps({"big": 2 ** 70})) == {"big": 2 ** 70}
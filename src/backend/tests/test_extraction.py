@@ -0,0 +1,103 @@
+import io
+import tempfile
+
+import pytest
+
+import extraction
+
+RESUME = "Jane Doe\nSoftware Engineer at Acme Corp\nSkills: Python, Docker, Kubernetes, PostgreSQL\n" * 3
+
+
+def _pdf(lines):
+    """A one-page PDF showing each line of text"""
+    content = "BT /F1 12 Tf 72 720 Td " + " ".join(f"({line}) Tj 0 -14 Td" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return pdf
+
+
+class _NoWholeReads(io.BytesIO):
+    """An upload that fails the test if it is read into memory in one go"""
+
+    def read(self, size=-1):
+        # zipfile reads the end of the archive unsized, which is bounded
+        assert self.tell() > 0 or (size is not None and size >= 0), "the whole upload was read into memory"
+        return super().read(size)
+
+
+def _spooled(data):
+    upload = tempfile.SpooledTemporaryFile(max_size=16)
+    upload.write(data)
+    # Left at the end, as after the upload was received
+    return upload
+
+
+@pytest.mark.parametrize("tier", extraction.TIERS)
+def test_docx_upload_is_read_in_place(make_docx, tier):
+    upload = _NoWholeReads(make_docx(RESUME))
+    upload.seek(0, io.SEEK_END)
+    text = extraction.extract_text_from_file("resume.docx", upload, tier=tier)
+    assert "Software Engineer at Acme Corp" in text
+
+
+@pytest.mark.parametrize("tier", extraction.TIERS)
+def test_pdf_upload_is_read_in_place(tier):
+    upload = _NoWholeReads(_pdf(RESUME.splitlines()))
+    upload.seek(0, io.SEEK_END)
+    document = extraction.extract_document("resume.pdf", upload, tier=tier)
+    assert "Skills: Python, Docker, Kubernetes, PostgreSQL" in document["text"]
+    assert document["page_count"] == 1
+
+
+def test_sources_extract_the_same_text(make_docx, tmp_path):
+    data = make_docx(RESUME)
+    path = tmp_path / "resume.docx"
+    path.write_bytes(data)
+    texts = [extraction.extract_text_from_file("resume.docx", source)
+             for source in (io.BytesIO(data), _spooled(data))]
+    texts.append(extraction.get_extractor(extraction.DOCX_MIME_TYPE, "accurate")(str(path))["text"])
+    texts.append(extraction.get_extractor(extraction.DOCX_MIME_TYPE, "accurate")(data)["text"])
+    assert len(set(texts)) == 1 and texts[0]
+
+
+def test_fallback_rereads_the_upload(make_docx, monkeypatch):
+    # The fast tier finds too little text, so the accurate one reads the same upload again
+    monkeypatch.setitem(extraction._EXTRACTORS, (extraction.DOCX_MIME_TYPE, "fast"), lambda source: {"text": ""})
+    document = extraction.extract_document("resume.docx", _spooled(make_docx(RESUME)), tier="fast")
+    assert document["tier"] == "accurate" and document["fallback_from"] == "fast"
+    assert "Software Engineer at Acme Corp" in document["text"]
+
+
+def test_accurate_tier_uses_default_layout_params(monkeypatch):
+    used = []
+    default = extraction.LAParams
+
+    def layout_params(**params):
+        used.append(params)
+        return default(**params)
+
+    monkeypatch.setattr(extraction, "LAParams", layout_params)
+    pdf = _pdf(RESUME.splitlines())
+    accurate = extraction.extract_document("resume.pdf", io.BytesIO(pdf), tier="accurate")
+    thorough = extraction.extract_document("resume.pdf", io.BytesIO(pdf), tier="thorough")
+    assert used == [{}, {"detect_vertical": True, "all_texts": True}]
+    assert (accurate["tier"], thorough["tier"]) == ("accurate", "thorough")
+
+
+def test_thorough_tier_reads_docx_accurately(make_docx):
+    document = extraction.extract_document("resume.docx", io.BytesIO(make_docx(RESUME)), tier="thorough")
+    assert document["tier"] == "accurate"
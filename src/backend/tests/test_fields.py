@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+RESUME = """Jane Doe
+jane@example.com
+Software Engineer at Acme Corp
+Experience
+Built data pipelines in Python and Docker for five years.
+Education
+BSc Computer Science, State University
+Skills
+Python, Docker, Kubernetes, PostgreSQL
+"""
+
+
+def test_dependencies_come_before_the_fields_that_read_them(app_module):
+    for fields in (None, ["ats_score"], ["resume_suggestions", "skills"], ["role"]):
+        order = app_module.resolve_fields(fields)
+        assert len(order) == len(set(order))
+        for position, field in enumerate(order):
+            for dependency in app_module.ANALYSIS_FIELDS[field][1]:
+                assert dependency in order[:position], f"{dependency} after {field}"
+        assert set(fields or app_module.ANALYSIS_FIELDS) <= set(order)
+
+
+def test_only_the_requested_fields_and_their_dependencies_are_resolved(app_module):
+    assert app_module.resolve_fields(["role"]) == ["skills_data", "role"]
+    assert app_module.resolve_fields(["experience_years", "experience"]) == ["experience", "experience_years"]
+
+
+def test_unknown_fields_are_rejected(app_module, client, make_docx):
+    with pytest.raises(ValueError, match="Unknown fields: salary"):
+        app_module.resolve_fields(["skills", "salary"])
+    response = client.post("/api/parse-resume", query_string={"fields": "skills,salary"},
+                           data={"file": (io.BytesIO(make_docx(RESUME)), "resume.docx")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 400
+    assert "salary" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("fields", [["skills"], ["role", "contact_info"], ["ats_score"]])
+def test_results_hold_exactly_the_requested_fields(app_module, client, make_docx, fields):
+    assert set(app_module.extract_info(RESUME, fields=fields)) == set(fields)
+    response = client.post("/api/parse-resume", query_string={"fields": ",".join(fields)},
+                           data={"file": (io.BytesIO(make_docx(RESUME)), "resume.docx")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 200
+    # Besides the fields, a response names its cache entry and how the text was extracted
+    assert set(response.get_json()) - {"parse_id", "extraction"} == set(fields)
+
+
+def test_entity_fields_without_ner_do_not_parse(app_module, monkeypatch):
+    def parse(text, annotations):
+        raise AssertionError("parsed a doc no analyzer reads")
+    monkeypatch.setattr(app_module, "parse_doc", parse)
+    monkeypatch.setattr(app_module, "parse_docs", parse)
+    assert not app_module._needs_doc("contact_info", use_ner=False)
+    assert app_module._needs_doc("contact_info", use_ner=True)
+    assert app_module._needs_doc("ats_score", use_ner=False)
+
+    info = app_module.extract_info(RESUME, use_ner=False, fields=["contact_info", "location", "skills"])
+    assert info["contact_info"]["email"] == "jane@example.com"
+    assert info["contact_info"]["name"] == "Jane Doe"
+    [(batch_info, error)] = app_module.extract_info_batch([RESUME], use_ner=False, fields=["contact_info"])
+    assert error is None and batch_info == {"contact_info": info["contact_info"]}
@@ -0,0 +1,115 @@
+import json
+import threading
+import zipfile
+
+import pytest
+
+import ingest
+
+RESUME = """{name}
+Software Engineer at Acme Corp
+Experience
+Built data pipelines in Python and Docker for five years.
+Skills
+Python, Docker, Kubernetes, PostgreSQL
+"""
+
+
+@pytest.fixture
+def ready_app(app_module, monkeypatch):
+    """The app with its model ready, as ingest expects"""
+    done = threading.Event()
+    done.set()
+    monkeypatch.setitem(app_module._startup, "state", "ready")
+    monkeypatch.setattr(app_module, "_startup_done", done)
+    return app_module
+
+
+@pytest.fixture
+def resumes(tmp_path, make_docx):
+    directory = tmp_path / "resumes"
+    directory.mkdir()
+
+    def add(*names):
+        for name in names:
+            (directory / name).write_bytes(make_docx(RESUME.format(name=name)))
+        return directory
+    return add
+
+
+def _run(directory, output):
+    return ingest.ingest(str(directory), str(output), workers=1, progress_seconds=3600)
+
+
+def _records(output):
+    lines = output.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_every_file_gets_one_line(ready_app, resumes, tmp_path):
+    directory = resumes("a.docx", "b.docx")
+    (directory / "broken.docx").write_bytes(b"not a docx")
+    (directory / ".hidden.docx").write_bytes(b"skipped")
+    (directory / "notes.txt").write_text("skipped")
+    output = tmp_path / "out.jsonl"
+
+    progress = _run(directory, output)
+    records = {record["file"]: record for record in _records(output)}
+    assert sorted(records) == ["a.docx", "b.docx", "broken.docx"]
+    assert "python" in records["a.docx"]["result"]["skills"]
+    assert "error" in records["broken.docx"]
+    assert (progress.done, progress.errors) == (3, 1)
+
+
+def test_rerun_skips_the_files_already_done(ready_app, resumes, tmp_path):
+    output = tmp_path / "out.jsonl"
+    _run(resumes("a.docx", "b.docx"), output)
+    before = output.read_bytes()
+
+    assert _run(resumes(), output).done == 0
+    assert output.read_bytes() == before
+
+    progress = _run(resumes("c.docx"), output)
+    assert (progress.skipped, progress.done) == (2, 1)
+    assert [record["file"] for record in _records(output)] == ["a.docx", "b.docx", "c.docx"]
+
+
+def test_resume_drops_what_was_written_after_the_last_checkpoint(ready_app, resumes, tmp_path):
+    output = tmp_path / "out.jsonl"
+    checkpoint = tmp_path / "out.jsonl.checkpoint"
+    directory = resumes("a.docx", "b.docx", "c.docx")
+    _run(directory, output)
+    lines = output.read_bytes().splitlines(keepends=True)
+    entries = checkpoint.read_text(encoding="utf-8").splitlines(keepends=True)
+
+    # A crash after c's line was cut short and while its checkpoint was being written,
+    # with b's output line never flushed to disk although its checkpoint was
+    output.write_bytes(lines[0] + lines[1][:10])
+    checkpoint.write_text(entries[0] + entries[1] + entries[2][:3], encoding="utf-8")
+
+    progress = _run(directory, output)
+    assert (progress.skipped, progress.done) == (1, 2)
+    assert [record["file"] for record in _records(output)] == ["a.docx", "b.docx", "c.docx"]
+    assert checkpoint.read_text(encoding="utf-8").count("\n") == 3
+
+
+def test_output_without_checkpoint_is_refused(ready_app, resumes, tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"file": "earlier run"}\n', encoding="utf-8")
+    with pytest.raises(RuntimeError, match="has no checkpoint"):
+        _run(resumes("a.docx"), output)
+    assert output.read_text(encoding="utf-8") == '{"file": "earlier run"}\n'
+
+
+def test_archive_members_are_ingested(ready_app, make_docx, tmp_path):
+    archive = tmp_path / "resumes.zip"
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("people/a.docx", make_docx(RESUME.format(name="a")))
+        z.writestr("__MACOSX/people/._a.docx", b"resource fork")
+        z.writestr("people/", b"")
+    assert ingest.list_sources(str(archive)) == ["people/a.docx"]
+
+    output = tmp_path / "out.jsonl"
+    _run(archive, output)
+    [record] = _records(output)
+    assert record["file"] == "people/a.docx" and "result" in record
@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from jobs import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobWorkers
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_jobs_survive_a_restart(db_path):
+    job_id = JobQueue(db_path).enqueue("resume.pdf", b"%PDF", {"ner": False})
+
+    restarted = JobQueue(db_path)
+    assert restarted.get(job_id)["status"] == QUEUED
+    job = restarted.claim()
+    assert (job["id"], job["filename"], job["payload"], job["options"]) == (job_id, "resume.pdf", b"%PDF", {"ner": False})
+    assert restarted.claim() is None
+
+
+def test_oldest_job_is_claimed_first(db_path):
+    queue = JobQueue(db_path)
+    ids = [queue.enqueue(f"{i}.pdf", b"") for i in range(3)]
+    assert [queue.claim()["id"] for _ in ids] == ids
+
+
+def test_concurrent_claims_never_share_a_job(db_path):
+    ids = {JobQueue(db_path).enqueue(f"{i}.pdf", b"") for i in range(200)}
+    claimed = []
+    errors = []
+    start = threading.Barrier(8)
+
+    def claim_all():
+        # Each worker on a queue of its own, as separate processes would be
+        queue = JobQueue(db_path)
+        start.wait()
+        try:
+            while (job := queue.claim()) is not None:
+                claimed.append(job["id"])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=claim_all) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert sorted(claimed) == sorted(ids)
+
+
+def test_running_jobs_are_requeued_on_restart(db_path):
+    queue = JobQueue(db_path)
+    job_id = queue.enqueue("resume.pdf", b"data")
+    queue.claim()
+    assert queue.get(job_id)["status"] == RUNNING
+
+    # The process stopped mid-job; the next one's workers pick it up again
+    restarted = JobQueue(db_path)
+    seen = []
+    workers = JobWorkers(restarted, lambda filename, payload, options: seen.append(payload) or {"ok": True},
+                         num_workers=1, poll_interval=0.01)
+    workers.start()
+    try:
+        _wait_for(lambda: restarted.get(job_id)["status"] == DONE)
+    finally:
+        workers.stop()
+    assert seen == [b"data"]
+    assert restarted.get(job_id)["result"] == {"ok": True}
+
+
+def test_workers_record_results_and_errors_once(db_path):
+    queue = JobQueue(db_path)
+    calls = []
+
+    def handler(filename, payload, options):
+        calls.append(filename)
+        if filename == "bad.pdf":
+            raise ValueError("Unsupported file format")
+        return {"name": filename}
+
+    good, bad = queue.enqueue("good.pdf", b"1"), queue.enqueue("bad.pdf", b"2")
+    workers = JobWorkers(queue, handler, num_workers=3, poll_interval=0.01)
+    workers.start()
+    try:
+        _wait_for(lambda: queue.get(good)["status"] == DONE and queue.get(bad)["status"] == FAILED)
+        # Finished jobs are never claimed again
+        time.sleep(0.05)
+    finally:
+        workers.stop()
+    assert sorted(calls) == ["bad.pdf", "good.pdf"]
+    assert queue.get(good)["result"] == {"name": "good.pdf"}
+    assert queue.get(bad)["error"] == "Unsupported file format"
+    assert queue.requeue_interrupted() == 0
+
+
+def test_finished_jobs_drop_their_payload(db_path):
+    queue = JobQueue(db_path)
+    job_id = queue.enqueue("resume.pdf", b"secret")
+    queue.claim()
+    queue.complete(job_id, {})
+    with queue._connect() as conn:
+        assert conn.execute("SELECT payload FROM jobs WHERE id = ?", (job_id,)).fetchone()[0] is None
+
+
+def test_unknown_jobs_are_none(db_path):
+    assert JobQueue(db_path).get("missing") is None
@@ -0,0 +1,69 @@
+import re
+
+import pytest
+
+from lexicon import Lexicon
+
+TERMS = ["java", "javascript", "c", "c++", "machine learning", "learning", "node.js", "go"]
+TEXTS = [
+    "Java and JavaScript developer; java, javascript and Node.js",
+    "machine learning, deep learning and machine-learning pipelines in C++ and c",
+    "go-getter who writes Go; mongodb, golang and cargo are not go",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_scan_matches_one_search_per_term(text):
+    text = text.lower()
+    hits = Lexicon(TERMS).scan(text)
+    for term in TERMS:
+        pattern = r'\b' + re.escape(term) + r'\b'
+        assert hits.offsets(term) == [m.start() for m in re.finditer(r'(?=' + pattern + r')', text)]
+        assert hits.count(term) == len(re.findall(pattern, text))
+        assert (term in hits) == bool(re.search(pattern, text))
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_substring_scan_matches_in(text):
+    hits = Lexicon(TERMS, word_boundaries=False).scan(text.lower())
+    assert set(hits) == {term for term in TERMS if term in text.lower()}
+
+
+def test_found_keeps_the_order_of_the_list():
+    hits = Lexicon(TERMS).scan("go, then node.js, then java")
+    assert hits.found(["java", "node.js", "go", "c"]) == ["java", "node.js", "go"]
+    assert hits.found(["go", "java", "node.js"]) == ["go", "java", "node.js"]
+    assert hits.found(["javascript"]) == []
+
+
+def test_prefix_terms_are_found_with_the_longer_term():
+    hits = Lexicon(["java", "javascript", "machine learning", "machine"]).scan("javascript machine learning")
+    assert hits.found(["java", "javascript", "machine", "machine learning"]) == ["javascript", "machine", "machine learning"]
+
+
+def test_within_restricts_to_a_span():
+    text = "java here | go there"
+    hits = Lexicon(TERMS).scan(text)
+    split = text.index("|")
+    assert list(hits.within(0, split)) == ["java"]
+    assert list(hits.within(split, len(text))) == ["go"]
+    # A term that straddles the end is outside the span
+    assert "java" not in hits.within(0, 3)
+
+
+def test_duplicate_and_empty_terms_are_dropped():
+    assert Lexicon(["go", "", "go", "java"]).terms == ["go", "java"]
+    assert len(Lexicon([]).scan("go java")) == 0
+
+
+def test_incidence_matches_a_scan_per_text():
+    lexicon = Lexicon(TERMS)
+    texts = [text.lower() for text in TEXTS]
+    incidence = lexicon.incidence(texts)
+    assert incidence.matrix.shape == (len(texts), len(lexicon.terms))
+    for row, text in enumerate(texts):
+        hits = lexicon.scan(text)
+        assert {term for col, term in enumerate(lexicon.terms) if incidence.matrix[row, col]} == set(hits)
+    assert incidence.any_of(["go", "c"]).tolist() == [bool({"go", "c"} & set(lexicon.scan(t))) for t in texts]
+    assert lexicon.incidence([]).matrix.shape == (0, len(lexicon.terms))
@@ -0,0 +1,32 @@
+from lexicon import Lexicon
+from matching import JobSkillCache, match_jobs
+
+# docker and kubernetes are listed twice, as in app.SKILLS
+SKILLS = ["python", "docker", "kubernetes", "java", "docker", "kubernetes"]
+
+
+def _cache():
+    return JobSkillCache(Lexicon(SKILLS), SKILLS)
+
+
+def test_duplicate_skills_get_one_column():
+    cache = _cache()
+    columns = cache.columns("We need docker and python and kubernetes")
+    assert [cache.skills[column] for column in columns] == ["python", "docker", "kubernetes"]
+    assert len(set(columns.tolist())) == len(columns)
+
+
+def test_match_percentage_counts_each_skill_once():
+    skills_data = {"technical_confidence": {"python": 1.0, "docker": 1.0}}
+    [match] = match_jobs(skills_data, ["We need docker and python and kubernetes"], _cache())
+    assert match["job_skills"] == ["python", "docker", "kubernetes"]
+    assert match["matching_skills"] == ["python", "docker"]
+    assert match["missing_skills"] == ["kubernetes"]
+    assert match["match_percentage"] == 67
+
+
+def test_cached_columns_are_reused():
+    cache = _cache()
+    first = cache.columns("Java developer")
+    assert cache.columns("Java developer") is first
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,125 @@
+import io
+import re
+
+import pytest
+
+import metrics
+
+RESUME = """{name}
+Software Engineer at Acme Corp
+Experience
+Built data pipelines in Python and Docker for five years.
+Skills
+Python, Docker, Kubernetes, PostgreSQL
+"""
+
+# One sample line of the Prometheus text format: name, optional labels, value
+_LABEL = r'[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\\\|\\"|\\n)*"'
+_SAMPLE = re.compile(rf'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{{{_LABEL}(?:,{_LABEL})*\}})? (\S+)$')
+
+
+def _parse(text):
+    """{metric name: (type, [(sample name, labels text, value)])}, checking every line on the way"""
+    assert text.endswith("\n")
+    families = {}
+    current = None
+    for line in text[:-1].split("\n"):
+        if line.startswith("# HELP "):
+            current = line.split(" ")[2]
+            assert current not in families, f"{current} is exposed twice"
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            assert name == current and kind in ("counter", "gauge", "histogram")
+            families[name] = (kind, [])
+            continue
+        match = _SAMPLE.match(line)
+        assert match, f"not a valid sample line: {line!r}"
+        name, labels, value = match.groups()
+        kind, samples = families[current]
+        suffixes = ("_bucket", "_sum", "_count") if kind == "histogram" else ("",)
+        assert any(name == current + suffix for suffix in suffixes), f"{name} outside its family"
+        float(value)
+        samples.append((name, labels or "", value))
+    return families
+
+
+def _check_histogram(name, samples):
+    """Buckets are cumulative, end at +Inf and agree with _count, per label set"""
+    series = {}
+    for sample, labels, value in samples:
+        base = re.sub(r',?le="[^"]*"', "", labels).replace("{}", "")
+        series.setdefault(base, []).append((sample, labels, float(value)))
+    for base, lines in series.items():
+        buckets = [(labels, value) for sample, labels, value in lines if sample == name + "_bucket"]
+        assert buckets and buckets[-1][0].endswith('le="+Inf"}')
+        bounds = [float(re.search(r'le="([^"]*)"', labels).group(1).replace("+Inf", "inf")) for labels, _ in buckets]
+        assert bounds == sorted(bounds)
+        counts = [value for _, value in buckets]
+        assert counts == sorted(counts)
+        totals = {sample: value for sample, _, value in lines if sample != name + "_bucket"}
+        assert totals[name + "_count"] == counts[-1]
+        assert totals[name + "_sum"] >= 0
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Metrics created in a test are kept out of the app's registry"""
+    monkeypatch.setattr(metrics, "_registry", [])
+
+
+def test_histograms_render_cumulative_buckets_sum_and_count(registry):
+    histogram = metrics.Histogram("test_seconds", "A test histogram", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, stage="nlp")
+    text = metrics.render_metrics()
+    assert 'test_seconds_bucket{stage="nlp",le="0.1"} 1\n' in text
+    assert 'test_seconds_bucket{stage="nlp",le="1"} 3\n' in text
+    assert 'test_seconds_bucket{stage="nlp",le="+Inf"} 4\n' in text
+    assert 'test_seconds_sum{stage="nlp"} 6.05\n' in text
+    assert 'test_seconds_count{stage="nlp"} 4\n' in text
+    kind, samples = _parse(text)["test_seconds"]
+    _check_histogram("test_seconds", samples)
+
+
+def test_label_values_are_escaped(registry):
+    counter = metrics.Counter("test_total", "A test counter", ["reason"])
+    counter.inc(reason='a "quoted" \\path\nnext line')
+    text = metrics.render_metrics()
+    assert r'test_total{reason="a \"quoted\" \\path\nnext line"} 1' in text
+    _parse(text)
+
+
+def test_the_metrics_endpoint_is_valid_exposition_text(client, make_docx):
+    data = {"file": (io.BytesIO(make_docx(RESUME.format(name="Ann Lee"))), "resume.docx")}
+    client.post("/api/parse-resume", data=data, content_type="multipart/form-data")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == metrics.PROMETHEUS_CONTENT_TYPE
+    families = _parse(response.get_data(as_text=True))
+    for name in ("resume_stage_seconds", "resume_request_seconds", "resume_requests_total",
+                 "resume_requests_in_flight"):
+        assert name in families
+    for name, (kind, samples) in families.items():
+        if kind == "histogram":
+            _check_histogram(name, samples)
+    stages = {labels for _, labels, _ in families["resume_stage_seconds"][1]}
+    assert any('stage="extract"' in labels for labels in stages)
+
+
+def test_parses_carry_a_server_timing_header(client, make_docx):
+    # A resume no other test uploads, so it is not answered from the result cache
+    data = {"file": (io.BytesIO(make_docx(RESUME.format(name="Bo Park"))), "resume.docx")}
+    response = client.post("/api/parse-resume", data=data, content_type="multipart/form-data")
+    assert response.status_code == 200
+    entries = response.headers["Server-Timing"].split(", ")
+    assert all(re.fullmatch(r"[a-z_]+;dur=\d+\.\d", entry) for entry in entries)
+    stages = [entry.split(";")[0] for entry in entries]
+    assert len(stages) == len(set(stages))
+    assert {"upload", "cache", "extract", "serialize"} <= set(stages)
+
+
+def test_repeated_stages_are_summed():
+    timer = metrics.StageTimer()
+    timer.extend([("nlp", 0.001), ("skills", 0.002), ("nlp", 0.0005)])
+    assert timer.server_timing() == "nlp;dur=1.5, skills;dur=2.0"
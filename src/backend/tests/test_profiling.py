@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+import profiling
+
+RESUME = """Jane Doe
+Software Engineer at Acme Corp
+Experience
+Built data pipelines in Python and Docker for five years.
+Skills
+Python, Docker, Kubernetes, PostgreSQL
+"""
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "s3cret")
+    return "s3cret"
+
+
+def _profiled(client, make_docx, headers):
+    data = {"file": (io.BytesIO(make_docx(RESUME)), "resume.docx")}
+    return client.post("/api/parse-resume", query_string={"profile": "sample"}, data=data,
+                       headers=headers, content_type="multipart/form-data")
+
+
+def test_tokens_are_compared_exactly(token):
+    assert profiling.profiling_allowed("s3cret")
+    assert not profiling.profiling_allowed("s3cre")
+    assert not profiling.profiling_allowed(None)
+    assert not profiling.profiling_allowed("sécret")
+
+
+def test_profiling_is_off_without_a_server_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_TOKEN", "")
+    assert not profiling.profiling_allowed("")
+
+
+def test_the_token_holder_gets_a_profile(client, make_docx, token):
+    response = _profiled(client, make_docx, {"X-Profile-Token": token})
+    assert response.status_code == 200
+    assert "profile" in response.get_json()
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Profile-Token": "wrong"}, {"X-Profile-Token": "sécret"}],
+                         ids=["missing", "wrong", "non-ascii"])
+def test_other_requests_are_forbidden(client, make_docx, token, headers):
+    response = _profiled(client, make_docx, headers)
+    assert response.status_code == 403
@@ -0,0 +1,50 @@
+import pytest
+
+from search import CandidateIndex, QueryError
+
+
+def _info(skills, role="backend developer", location="Berlin", years=5, ats=70):
+    return {"skills": skills, "role": role, "location": location, "experience_years": years,
+            "ats_score": {"overall": ats}}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return CandidateIndex(str(tmp_path / "search.sqlite3"))
+
+
+def _parse_ids(result):
+    return [candidate["parse_id"] for candidate in result["results"]]
+
+
+def test_re_adding_a_parse_id_with_duplicate_skills(index):
+    # analyze_skills can list a skill twice
+    skills = ["python", "aws", "docker", "aws", "docker"]
+    first = index.add("p1", "a.pdf", _info(skills))
+    second = index.add("p1", "a.pdf", _info(skills + ["go"], ats=80))
+    assert second == first
+    assert _parse_ids(index.search("docker AND go")) == ["p1"]
+    assert index.search("aws")["total"] == 1
+    assert index.stats()["candidates"] == 1
+
+
+def test_re_adding_replaces_the_old_terms(index):
+    index.add("p1", "a.pdf", _info(["python", "java"]))
+    index.add("p1", "a.pdf", _info(["python"], role="data engineer"))
+    assert index.search("java")["total"] == 0
+    assert index.search('role:"backend developer"')["total"] == 0
+    assert _parse_ids(index.search('python role:"data engineer"')) == ["p1"]
+
+
+def test_index_is_rebuilt_from_disk(index, tmp_path):
+    index.add("p1", "a.pdf", _info(["python", "python"], ats=60))
+    index.add("p2", "b.pdf", _info(["python", "react"], location="Paris", ats=90))
+    reopened = CandidateIndex(index.path)
+    assert _parse_ids(reopened.search("python")) == ["p2", "p1"]
+    assert _parse_ids(reopened.search("python NOT location:paris", min_ats=50)) == ["p1"]
+    assert reopened.search("", min_experience=6)["total"] == 0
+
+
+def test_invalid_query(index):
+    with pytest.raises(QueryError):
+        index.search("python AND (react")
@@ -0,0 +1,47 @@
+from sections import segment_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+Experience
+Software Engineer, Acme Corp
+
+Skills
+Python, Docker
+Technical Skills:
+Kubernetes
+
+Education
+BSc Computer Science
+
+Skills
+Go
+"""
+
+
+def _sections(text):
+    return {section: text[start:end] for section, (start, end) in segment_sections(text).items()}
+
+
+def test_sections_run_to_the_next_header():
+    sections = _sections(RESUME)
+    assert list(sections) == ["experience", "skills", "education"]
+    assert sections["experience"] == "Experience\nSoftware Engineer, Acme Corp\n\n"
+    assert sections["education"] == "Education\nBSc Computer Science\n\n"
+
+
+def test_consecutive_headers_of_a_section_are_merged():
+    skills = _sections(RESUME)["skills"]
+    assert skills.startswith("Skills\nPython, Docker\nTechnical Skills:\nKubernetes")
+    # Only the first occurrence counts
+    assert "Go" not in skills
+
+
+def test_last_section_runs_to_the_end():
+    text = "Summary\nEngineer\n  PROJECTS  \nResume parser"
+    assert _sections(text) == {"projects": "  PROJECTS  \nResume parser"}
+
+
+def test_headers_must_open_their_line():
+    assert segment_sections("I have experience with education software\nand skills in Python") == {}
+    assert segment_sections("") == {}
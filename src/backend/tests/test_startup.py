@@ -0,0 +1,24 @@
+import app
+
+
+def test_import_does_not_start_loading():
+    assert app._startup["state"] == "not_started"
+
+
+def test_first_request_starts_loading(monkeypatch):
+    started = []
+    monkeypatch.setattr(app, "start_background_loading", lambda workers=0: started.append(workers))
+    app.start_loading_on_first_request()
+    assert started == [0]
+    monkeypatch.setitem(app._startup, "state", "loading")
+    app.start_loading_on_first_request()
+    assert started == [0]
+
+
+def test_bench_exits_with_the_load_error(monkeypatch, capsys):
+    import bench
+    monkeypatch.setattr(app, "load_in_foreground", lambda workers=0: False)
+    monkeypatch.setitem(app._startup, "error", "no model")
+    assert bench.main(["--repeat", "1"]) == 1
+    assert bench.main(["--fuzz"]) == 1
+    assert "no model" in capsys.readouterr().err
@@ -0,0 +1,91 @@
+import io
+import json
+
+RESUME = """{name}
+{name_lower}@example.com
+Software Engineer at Acme Corp
+Experience
+Built data pipelines in Python and Docker for five years. I led a team of four engineers.
+Education
+BSc Computer Science, State University
+Skills
+Python, Docker, Kubernetes, PostgreSQL
+"""
+
+
+def _stream(client, make_docx, name, headers=None, **params):
+    resume = RESUME.format(name=name, name_lower=name.split()[0].lower())
+    return client.post("/api/parse-resume/stream", query_string=params, headers=headers or {},
+                       data={"file": (io.BytesIO(make_docx(resume)), "resume.docx")},
+                       content_type="multipart/form-data")
+
+
+def _ndjson_events(response):
+    text = response.get_data(as_text=True)
+    assert text.endswith("\n")
+    events = [json.loads(line) for line in text[:-1].split("\n")]
+    assert all(set(event) == {"event", "data"} for event in events)
+    return [(event["event"], event["data"]) for event in events]
+
+
+def _sse_events(response):
+    text = response.get_data(as_text=True)
+    assert text.endswith("\n\n")
+    events = []
+    for block in text[:-2].split("\n\n"):
+        event_line, data_line = block.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+def test_ndjson_events_arrive_in_dependency_order(app_module, client, make_docx):
+    response = _stream(client, make_docx, "Ann Lee")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["Cache-Control"] == "no-cache"
+    events = _ndjson_events(response)
+    names = [name for name, _ in events]
+    assert names[0] == "extraction"
+    assert names[-1] == "done"
+    assert events[-1][1] == {"parse_id": events[-1][1]["parse_id"], "cached": False}
+
+    fields = names[1:-1]
+    assert set(fields) == set(app_module.ANALYSIS_FIELDS)
+    # Fields that need no doc come first, and the two summaries of every other field last
+    needs_doc = [app_module._needs_doc(field, app_module.NER_ENABLED) for field in fields]
+    assert needs_doc == sorted(needs_doc)
+    assert not needs_doc[0] and needs_doc[-1]
+    assert fields[-2:] == ["resume_suggestions", "ats_score"]
+
+
+def test_sse_framing_is_chosen_by_the_accept_header(client, make_docx):
+    response = _stream(client, make_docx, "Bo Park", headers={"Accept": "text/event-stream"})
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = _sse_events(response)
+    assert events[0][0] == "extraction"
+    assert events[-1][0] == "done"
+    assert "skills" in dict(events)
+
+
+def test_a_cached_result_is_streamed_whole(client, make_docx):
+    first = _ndjson_events(_stream(client, make_docx, "Cy Diaz"))
+    second = _ndjson_events(_stream(client, make_docx, "Cy Diaz", format="ndjson"))
+    assert second[-1] == ("done", {"parse_id": first[-1][1]["parse_id"], "cached": True})
+    assert dict(second[:-1])["skills"] == dict(first)["skills"]
+
+
+def test_a_failure_mid_stream_is_an_error_event(app_module, client, make_docx, monkeypatch):
+    def failing(text, use_ner=None, fields=None):
+        yield "skills", ["python"]
+        raise RuntimeError("analyzer crashed")
+    monkeypatch.setattr(app_module, "iter_extract_info", failing)
+    events = _ndjson_events(_stream(client, make_docx, "Di Evans"))
+    assert [name for name, _ in events] == ["extraction", "skills", "error"]
+    assert events[-1][1] == {"error": "Error processing resume: analyzer crashed"}
+
+
+def test_unknown_stream_formats_are_rejected(client, make_docx):
+    response = _stream(client, make_docx, "Ed Fox", format="xml")
+    assert response.status_code == 400
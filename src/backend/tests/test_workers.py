@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import timeouts
+import workers
+from metrics import iter_with_stages, start_stages, stop_stages, timed_stage
+from timeouts import AnalyzerTimeout, cpu_time_limit
+
+
+def _fields(count):
+    for i in range(count):
+        yield f"field{i}", i
+
+
+def _fails_after_one():
+    yield "first", 1
+    raise ValueError("analysis failed")
+
+
+def _spins_under_limit():
+    try:
+        with cpu_time_limit(0.05):
+            while True:
+                pass
+    except AnalyzerTimeout:
+        yield "timed out"
+
+
+def _die():
+    os._exit(1)
+
+
+def _yields_then_dies():
+    yield "first", 1
+    # Items are sent by a feeder thread, which a sudden death would cut off
+    time.sleep(0.2)
+    os._exit(1)
+
+
+def _timed():
+    with timed_stage("inner"):
+        yield 1
+
+
+@pytest.fixture
+def pool():
+    workers.start_worker_pool(1)
+    yield
+    workers.stop_worker_pool()
+
+
+def test_iter_in_worker_without_a_pool():
+    assert not workers.worker_pool_running()
+    assert list(workers.iter_in_worker(_fields, 3)) == [("field0", 0), ("field1", 1), ("field2", 2)]
+
+
+def test_iter_in_worker_streams_items_from_the_pool(pool):
+    assert list(workers.iter_in_worker(_fields, 50)) == list(_fields(50))
+    # Abandoned iterations do not disturb the next ones
+    first = workers.iter_in_worker(_fields, 50)
+    next(first)
+    first.close()
+    assert list(workers.iter_in_worker(_fields, 2)) == list(_fields(2))
+
+
+def test_iter_in_worker_raises_the_workers_exception(pool):
+    items = workers.iter_in_worker(_fails_after_one)
+    assert next(items) == ("first", 1)
+    with pytest.raises(ValueError, match="analysis failed"):
+        next(items)
+
+
+def test_cpu_limit_applies_in_pool_workers(pool):
+    assert list(workers.iter_in_worker(_spins_under_limit)) == ["timed out"]
+
+
+def test_pool_can_be_restarted():
+    for _ in range(2):
+        workers.start_worker_pool(1)
+        try:
+            assert list(workers.iter_in_worker(_fields, 2)) == list(_fields(2))
+        finally:
+            workers.stop_worker_pool()
+
+
+def test_a_dead_worker_fails_its_call_and_later_calls_run_here(pool):
+    with pytest.raises(BrokenProcessPool):
+        workers.run_in_worker(_die)
+    assert not workers.worker_pool_running()
+    assert workers.run_in_worker(os.getpid) == os.getpid()
+    assert list(workers.iter_in_worker(_fields, 2)) == list(_fields(2))
+
+
+def test_a_worker_dying_mid_stream_raises_after_its_items(pool):
+    items = workers.iter_in_worker(_yields_then_dies)
+    assert next(items) == ("first", 1)
+    with pytest.raises(BrokenProcessPool):
+        next(items)
+    assert workers.run_in_worker(os.getpid) == os.getpid()
+
+
+def test_a_pool_found_broken_on_submit_falls_back(pool):
+    future = workers.submit_to_workers(_die)
+    with pytest.raises(BrokenProcessPool):
+        future.result()
+    # Nothing has discarded the pool yet; the next call finds it broken
+    assert workers.worker_pool_running()
+    assert workers.run_in_worker(os.getpid) == os.getpid()
+    assert not workers.worker_pool_running()
+    assert workers.worker_count() == 0
+
+
+def test_cpu_limit_off_the_main_thread_is_logged(monkeypatch, caplog):
+    monkeypatch.setattr(timeouts, "_warned_unlimited", False)
+
+    def analyze():
+        for _ in range(2):
+            with cpu_time_limit(1):
+                pass
+
+    thread = threading.Thread(target=analyze, name="request-thread")
+    thread.start()
+    thread.join()
+    warnings = [record for record in caplog.records if record.name == "timeouts"]
+    assert len(warnings) == 1 and warnings[0].levelname == "WARNING"
+    assert "cannot be applied in thread request-thread" in warnings[0].getMessage()
+
+
+def test_iter_with_stages_keeps_the_callers_timer():
+    outer = start_stages()
+    try:
+        items = list(iter_with_stages(_timed))
+    finally:
+        stop_stages()
+    assert items[0] == ("item", 1)
+    kind, stages = items[1]
+    assert kind == "stages" and [name for name, _ in stages] == ["inner"]
+    assert outer.stages == []
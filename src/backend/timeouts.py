@@ -0,0 +1,70 @@
+"""CPU-time limits for the analyzers.
+
+A limit is a profiling interval timer: it counts the CPU time the process
+spends and, when the time runs out, its signal interrupts the running Python
+code, a long regex match included, with AnalyzerTimeout. Signals are only
+handled in the main thread, so limits apply in the worker processes, the CLI
+and the benchmarks; code called from another thread, such as a request thread
+of the development server, runs without one, and the first such call logs it.
+"""
+import logging
+import signal
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# If a bare except swallows the timeout, it is raised again this much CPU time later
+_REPEAT_SECONDS = 0.05
+
+_warned_unlimited = False
+
+
+class AnalyzerTimeout(BaseException):
+    """Not an Exception, so the handlers for analysis errors let it through"""
+
+
+def _expired(signum, frame):
+    raise AnalyzerTimeout()
+
+
+def limits_supported():
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def _warn_unlimited():
+    # Once per process: every analyzer of every resume would repeat it
+    global _warned_unlimited
+    if not _warned_unlimited:
+        _warned_unlimited = True
+        logger.warning("Analyzer CPU time limits cannot be applied in thread %s: only a main thread "
+                       "handles signals. Run the analysis in the worker pool (RESUME_WORKERS) to enforce them.",
+                       threading.current_thread().name)
+
+
+@contextmanager
+def cpu_time_limit(seconds):
+    """Raise AnalyzerTimeout in the block once it has used seconds of CPU time
+
+    No limit for seconds <= 0, where limits are not supported (which is
+    logged), or inside the block of another limit, which keeps running and
+    still applies.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    if not limits_supported():
+        _warn_unlimited()
+        yield
+        return
+    if signal.getitimer(signal.ITIMER_PROF)[0] > 0:
+        yield
+        return
+
+    previous_handler = signal.signal(signal.SIGPROF, _expired)
+    signal.setitimer(signal.ITIMER_PROF, seconds, _REPEAT_SECONDS)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, previous_handler)
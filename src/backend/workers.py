@@ -0,0 +1,203 @@
+"""Pre-forked process pool for the CPU-bound resume analysis.
+
+The pool is forked from a process that has already loaded the spaCy model and
+compiled the lexicons, so every worker shares those pages copy-on-write
+instead of loading its own copy.
+"""
+import gc
+import multiprocessing
+import os
+import queue
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_pool = None
+_pool_pid = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+# Items of generators run by iter_in_worker, sent back by the workers as
+# (token, done, item) and handed to the waiting caller by a router thread
+_events = None
+_listeners = {}
+_listeners_lock = threading.Lock()
+_router = None
+
+
+def start_worker_pool(num_workers):
+    """Fork num_workers analysis processes from the current process.
+
+    Call this once, after the model is loaded and before any other thread
+    starts: only the calling thread is copied into the workers, so a lock held
+    by another thread would stay locked there forever.
+    """
+    global _pool, _pool_pid, _pool_size, _events
+    if _pool is not None:
+        return _pool
+    others = [thread.name for thread in threading.enumerate() if thread is not threading.current_thread()]
+    if others:
+        print(f"Forking the worker pool while other threads run ({', '.join(others)}); "
+              f"a lock one of them holds would stay locked in the workers")
+
+    # Move everything loaded so far out of the collector's reach, so that
+    # collections in the workers don't write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+    context = multiprocessing.get_context("fork")
+    # Created before the workers so that they inherit it
+    _events = context.Queue()
+    _pool = ProcessPoolExecutor(max_workers=num_workers, mp_context=context)
+    # With the fork start method all workers are created on the first submit,
+    # which must happen now while the process is still single-threaded
+    _pool.submit(os.getpid).result()
+    _pool_pid = os.getpid()
+    _pool_size = num_workers
+    return _pool
+
+
+def stop_worker_pool(wait=True):
+    global _pool, _pool_size, _events, _router
+    if _pool is not None:
+        _pool.shutdown(wait=wait, cancel_futures=not wait)
+        _pool = None
+        _pool_size = 0
+    with _listeners_lock:
+        if _router is not None:
+            # Ends the router thread
+            _events.put(None)
+            _router = None
+        _events = None
+
+
+def worker_pool_running():
+    # Forked children inherit the parent's pool object but cannot use it
+    return _pool is not None and _pool_pid == os.getpid()
+
+
+def worker_count():
+    """Number of pool workers usable from this process, 0 if there is no pool"""
+    return _pool_size if worker_pool_running() else 0
+
+
+def _discard_broken_pool(pool):
+    """Stop using a pool one of whose workers died; later work runs in this process
+
+    The pool is not forked again: this process runs other threads by now, see
+    start_worker_pool.
+    """
+    with _pool_lock:
+        if _pool is not pool:
+            return
+        print("A worker process died; analysis runs in the server process until it is restarted")
+        stop_worker_pool(wait=False)
+
+
+def _submit(fn, *args, **kwargs):
+    # None once the pool is found broken
+    pool = _pool
+    try:
+        return pool.submit(fn, *args, **kwargs)
+    except BrokenProcessPool:
+        _discard_broken_pool(pool)
+        return None
+
+
+def _result(future):
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        _discard_broken_pool(_pool)
+        raise
+
+
+def submit_to_workers(fn, *args, **kwargs):
+    """Submit fn to the worker pool and return its future"""
+    if not worker_pool_running():
+        raise RuntimeError("The worker pool is not running in this process")
+    future = _submit(fn, *args, **kwargs)
+    if future is None:
+        raise BrokenProcessPool("A worker process died")
+    return future
+
+
+def run_in_worker(fn, *args, **kwargs):
+    """Run fn in the worker pool and wait for it; in this process if there is no pool
+
+    Raises BrokenProcessPool if the worker running fn dies, after which there
+    is no pool any more.
+    """
+    future = _submit(fn, *args, **kwargs) if worker_pool_running() else None
+    if future is None:
+        return fn(*args, **kwargs)
+    return _result(future)
+
+
+def _run_generator(token, fn, args, kwargs):
+    # Runs in a worker: each item goes back as soon as it is produced
+    try:
+        for item in fn(*args, **kwargs):
+            _events.put((token, False, item))
+    finally:
+        _events.put((token, True, None))
+
+
+def _route_events(events):
+    while True:
+        event = events.get()
+        if event is None:
+            return
+        token, done, item = event
+        with _listeners_lock:
+            listener = _listeners.get(token)
+        # Callers that stopped listening, e.g. a closed stream, are skipped
+        if listener is not None:
+            listener.put((done, item))
+
+
+def _start_router():
+    global _router
+    with _listeners_lock:
+        if _router is None:
+            _router = threading.Thread(target=_route_events, args=(_events,), name="worker-events", daemon=True)
+            _router.start()
+
+
+def iter_in_worker(fn, *args, **kwargs):
+    """Iterate the generator function fn in the worker pool, yielding each item as the worker produces it
+
+    Runs fn in this process if there is no pool. Exceptions raised by fn are
+    raised here once its items so far have been yielded, as is BrokenProcessPool
+    if the worker dies.
+    """
+    if not worker_pool_running():
+        yield from fn(*args, **kwargs)
+        return
+
+    _start_router()
+    token = uuid.uuid4().hex
+    listener = queue.Queue()
+    with _listeners_lock:
+        _listeners[token] = listener
+    try:
+        future = _submit(_run_generator, token, fn, args, kwargs)
+        if future is None:
+            yield from fn(*args, **kwargs)
+            return
+        while True:
+            try:
+                done, item = listener.get(timeout=0.1)
+            except queue.Empty:
+                # A worker that died never sends its end marker
+                if future.done() and future.exception() is not None:
+                    _result(future)
+                continue
+            if done:
+                break
+            yield item
+        _result(future)
+    finally:
+        with _listeners_lock:
+            _listeners.pop(token, None)